@@ -1,20 +1,43 @@
 import argparse
-from radio.image import RadioImage
-from radio.uv5r import dump_radio, upload_radio
+
+RADIO_MODES = ['dump', 'upload', 'edit', 'list', 'batch-edit', 'clear']
+LOG_MODES = ['merge-logs', 'log-import', 'log-export', 'log-query', 'log-stats', 'log-dedupe', 'log-confirm', 'log-cabrillo']
 
 def main():
     parser = argparse.ArgumentParser(description="Baofeng UV-5R CLI Tool")
-    parser.add_argument('-m', '--mode', choices=['dump', 'upload', 'edit', 'list', 'batch-edit', 'clear'], required=True)
+    parser.add_argument('-m', '--mode', choices=RADIO_MODES + LOG_MODES, required=True)
     parser.add_argument('-p', '--port', help="Serial port for radio (required for dump/upload)")
-    parser.add_argument('-f', '--file', required=True, help="Radio image file")
+    parser.add_argument('-f', '--file', help="Radio image file, or the log file to import/export/merge into")
     parser.add_argument('--edit-channel', type=int, help="Channel number to edit or clear")
     parser.add_argument('--name', help="Channel name (ASCII, max 7 chars)")
     parser.add_argument('--freq', type=float, help="RX frequency (MHz)")
     parser.add_argument('--txfreq', type=float, help="TX frequency (MHz)")
     parser.add_argument('--batch-start', type=int, help="Batch edit: start channel")
     parser.add_argument('--batch-end', type=int, help="Batch edit: end channel")
+    parser.add_argument('--inputs', nargs='+', help="merge-logs/log-confirm: xlsx/JSON/ADIF logs to merge or match against")
+    parser.add_argument('--window', type=int, help="log-confirm: time tolerance in minutes")
+    parser.add_argument('--call-column', default="Callsign", help="log-confirm: column with the worked station's call")
+    parser.add_argument('--log', help="log-*: logbook journal (default: the GUI's talasnik_journal.jsonl)")
+    parser.add_argument('--call', help="log-query/log-export: callsign prefix")
+    parser.add_argument('--band', help="log-query/log-export: band, e.g. 20m")
+    parser.add_argument('--since', help="log-query/log-export: from UTC 'YYYY-MM-DD [HH:MM]'")
+    parser.add_argument('--until', help="log-query/log-export: before UTC 'YYYY-MM-DD [HH:MM]'")
+    parser.add_argument('--replace', action='store_true', help="log-import: replace the log instead of appending")
+    parser.add_argument('--station', help="log-cabrillo: your callsign")
+    parser.add_argument('--contest', default="", help="log-cabrillo: Cabrillo contest name")
+    parser.add_argument('--dry-run', action='store_true', help="log-dedupe: only list the duplicates")
     args = parser.parse_args()
 
+    if args.mode in LOG_MODES:
+        run_log_mode(args)
+        return
+    if not args.file:
+        parser.error("-f/--file is required for radio modes")
+
+    # Radio modes need the serial stack, log modes must run without it
+    from radio.image import RadioImage
+    from radio.uv5r import dump_radio, upload_radio
+
     if args.mode == 'dump':
         if not args.port:
             print("Port required for dump.")
@@ -61,5 +84,96 @@ def main():
         img.save(args.file)
         print(f"✅ Batch edit complete for channels {args.batch_start}-{args.batch_end}.")
 
+def run_log_mode(args):
+    """Logbook modes; these never import Qt or the radio stack."""
+    if args.mode == 'merge-logs':
+        if not args.inputs or not args.file:
+            print("merge-logs mode requires -f and --inputs")
+            return
+        from logbook.merge import merge_logs
+        result = merge_logs(args.inputs, args.file)
+        print(f"✅ Merged {len(args.inputs)} logs into {args.file}: {result.written} QSOs written, "
+              f"{result.duplicates} duplicates dropped, {result.rejected} invalid rows rejected.")
+        return
+
+    from logbook import commands
+    if args.mode in ('log-import', 'log-export', 'log-cabrillo') and not args.file:
+        print(f"{args.mode} mode requires -f")
+        return
+    try:
+        since = commands.parse_when(args.since) if args.since else None
+        until = commands.parse_when(args.until) if args.until else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    read_only = args.mode in ('log-export', 'log-query', 'log-stats', 'log-cabrillo') or (
+        args.mode == 'log-dedupe' and args.dry_run)
+    try:
+        store, journal = commands.open_log(args.log or commands.JOURNAL_FILE, read_only=read_only)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+    try:
+        if args.mode == 'log-import':
+            result = commands.import_log(store, args.file, replace=args.replace)
+            print(f"✅ Imported {result.added} QSOs from {args.file}, {result.duplicates} duplicates skipped, "
+                  f"{result.rejected} invalid rows rejected.")
+
+        elif args.mode == 'log-export':
+            rids = commands.iter_qsos(store, args.call, args.band, since, until)
+            count = commands.export_log(store, args.file, rids)
+            print(f"✅ Exported {count} QSOs to {args.file}.")
+
+        elif args.mode == 'log-query':
+            print("\t".join(store.columns))
+            for rid in commands.iter_qsos(store, args.call, args.band, since, until):
+                print("\t".join(str(value) for value in store.record(rid).values()), flush=True)
+
+        elif args.mode == 'log-stats':
+            from logbook.stats import LogStats, RATE_WINDOWS
+            from logbook.maidenhead import GridIndex
+            stats = LogStats(store)
+            print(f"QSOs: {stats.total}")
+            print(f"Unique calls: {stats.unique_calls}")
+            print(f"Worked grids: {len(GridIndex(store))}")
+            for minutes in RATE_WINDOWS:
+                print(f"Last {minutes} min: {stats.rate(minutes)}")
+            for band, count in stats.bands.most_common():
+                print(f"Band {band or '?'}: {count}")
+            for hour, count in sorted(stats.hours.items()):
+                print(f"Hour {hour:02d}:00 UTC: {count}")
+
+        elif args.mode == 'log-confirm':
+            if not args.inputs:
+                print("log-confirm mode requires --inputs")
+                return
+            from logbook.confirm import confirm_log, CONFIRM_WINDOW
+            window = args.window if args.window is not None else CONFIRM_WINDOW
+            confirmed, total = confirm_log(store, args.inputs, window, args.call_column)
+            print(f"✅ Confirmed {confirmed} of {total} QSOs.")
+
+        elif args.mode == 'log-cabrillo':
+            if not args.station:
+                print("log-cabrillo mode requires --station")
+                return
+            from logbook.contest import Contest, write_cabrillo
+            contest = Contest(store, args.station, args.contest.upper())
+            count = write_cabrillo(args.file, contest)
+            print(f"✅ Exported {count} QSOs to {args.file}: {contest.points} points x {len(contest.mults)} mults = {contest.score}.")
+
+        elif args.mode == 'log-dedupe':
+            dupes = []
+            for rid in commands.find_duplicates(store):
+                dupes.append(rid)
+                print("\t".join(str(value) for value in store.record(rid).values()), flush=True)
+            if not args.dry_run:
+                store.remove(dupes)
+            action = "Found" if args.dry_run else "Removed"
+            print(f"✅ {action} {len(dupes)} duplicate QSOs.")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+    finally:
+        journal.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,7 @@
-import requests
 from PyQt5.QtWidgets import QDialog, QFormLayout, QComboBox, QLineEdit, QSpinBox, QPushButton, QLabel
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QPen, QPalette
 from PyQt5.QtCore import Qt
+from propagation.httpcache import http_cache
 
 class AntennaCalculatorDialog(QDialog):
     def __init__(self, parent=None, dark_mode=False):
@@ -227,8 +227,8 @@ class AntennaCalculatorDialog(QDialog):
 
             # --- Price calculation for all antennas ---
             try:
-                r = requests.get("https://metals-api.com/api/latest?access_key=demo&base=USD&symbols=ALUMINUM", timeout=3)
-                price = r.json()["rates"]["ALUMINUM"]
+                data = http_cache().get_json("https://metals-api.com/api/latest?access_key=demo&base=USD&symbols=ALUMINUM", timeout=3)
+                price = data["rates"]["ALUMINUM"]
             except Exception:
                 price = 2.5
             weight = total_al_m * 0.5  # 0.5 kg per meter
@@ -1,6 +1,9 @@
-from PyQt5.QtWidgets import QStyledItemDelegate, QLineEdit
-from PyQt5.QtCore import QRegExp
-from PyQt5.QtGui import QRegExpValidator
+from PyQt5.QtWidgets import QStyledItemDelegate, QLineEdit, QCompleter
+from PyQt5.QtCore import Qt, QRegExp, QStringListModel
+from PyQt5.QtGui import QRegExpValidator, QValidator
+
+# setData role carrying (text, parsed value) so the model never re-parses what an editor validated
+TYPED_ROLE = Qt.UserRole + 1
 
 class TimeDelegate(QStyledItemDelegate):
     """Delegate to only allow HH:MM 24-hour time format in the Time column."""
@@ -12,6 +15,14 @@ class TimeDelegate(QStyledItemDelegate):
         editor.setPlaceholderText("HH:MM")
         return editor
 
+    def setModelData(self, editor, model, index):
+        text = editor.text()
+        minutes = None
+        if editor.validator().validate(text, 0)[0] == QValidator.Acceptable:
+            hours, mins = text.split(":")
+            minutes = int(hours) * 60 + int(mins)
+        model.setData(index, (text, minutes), TYPED_ROLE)
+
 class LettersOnlyDelegate(QStyledItemDelegate):
     """Delegate to only allow letters (and optionally spaces) in a cell."""
     def createEditor(self, parent, option, index):
@@ -20,4 +31,36 @@ class LettersOnlyDelegate(QStyledItemDelegate):
         validator = QRegExpValidator(regex, editor)
         editor.setValidator(validator)
         editor.setPlaceholderText("Letters only")
-        return editor
\ No newline at end of file
+        return editor
+
+class CallsignDelegate(QStyledItemDelegate):
+    """Callsign editor with super check partial suggestions as you type."""
+    def __init__(self, scp=None, parent=None):
+        super().__init__(parent)
+        self.scp = scp
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        regex = QRegExp(r"^[A-Za-z0-9/]+$")
+        editor.setValidator(QRegExpValidator(regex, editor))
+        editor.setPlaceholderText("Callsign")
+        if self.scp is not None:
+            suggestions = QStringListModel(editor)
+            completer = QCompleter(suggestions, editor)
+            # The index already did the matching, show its results as they are
+            completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            editor.setCompleter(completer)
+            editor.textEdited.connect(lambda text: self.suggest(completer, suggestions, text))
+        return editor
+
+    def suggest(self, completer, suggestions, text):
+        calls = self.scp.search(text)
+        suggestions.setStringList(calls)
+        if calls:
+            completer.complete()
+        else:
+            completer.popup().hide()
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text().upper(), Qt.EditRole)
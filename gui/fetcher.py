@@ -0,0 +1,70 @@
+"""Run blocking network fetches and other long jobs off the GUI thread.
+
+Work goes to one shared thread pool; results come back as Qt signals,
+which Qt queues onto the GUI thread, so slots can touch widgets directly.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+
+MAX_WORKERS = 4
+_pool = None
+
+
+def pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="talasnik-fetch")
+    return _pool
+
+
+def shutdown():
+    """Drop queued fetches at exit; running ones end at their own timeout."""
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Fetcher(QObject):
+    """Keyed background jobs for one window.
+
+    ``done(key, result)`` or ``failed(key, message)`` is emitted for the
+    latest job of each key only; a newer job for the same key, or
+    ``cancel()``, drops the older result.
+    """
+    done = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._futures = {}
+
+    def submit(self, key, fn, *args):
+        old = self._futures.get(key)
+        if old is not None:
+            old.cancel()
+        future = pool().submit(fn, *args)
+        self._futures[key] = future
+        future.add_done_callback(lambda f: self._deliver(key, f))
+        return future
+
+    def busy(self, key):
+        future = self._futures.get(key)
+        return future is not None and not future.done()
+
+    def cancel(self):
+        """Drop pending results, e.g. when the window closes; later submits still work."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+    def _deliver(self, key, future):
+        # Runs on a pool thread
+        if future.cancelled() or self._futures.get(key) is not future:
+            return
+        try:
+            error = future.exception()
+            if error is not None:
+                self.failed.emit(key, str(error))
+            else:
+                self.done.emit(key, future.result())
+        except RuntimeError:
+            pass  # the window was deleted while the fetch ran
@@ -1,21 +1,315 @@
-from PyQt5.QtWidgets import QTableWidget, QHeaderView
-from PyQt5.QtGui import QFont
-from .delegates import TimeDelegate, LettersOnlyDelegate
-
-class HamLogBook(QTableWidget):
-    def __init__(self, rows, font_family, font_size, parent=None):
-        super().__init__(rows, 4, parent)
-        self.setHorizontalHeaderLabels(["Name", "Time", "Callsign", "Place"])
+from PyQt5.QtWidgets import QTableView, QHeaderView
+from PyQt5.QtGui import QFont, QColor, QBrush
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+import time
+import numpy as np
+from logbook.store import LogStore
+from logbook.fields import normalize_callsign
+from logbook.dupes import DupeIndex
+from logbook.search import SearchIndex
+from logbook.dxcc import DETAIL_COLUMNS
+from logbook.scp import SuperCheckPartial
+from logbook.maidenhead import GridIndex, GRID_COLUMN, locate_from
+from logbook.contest import Contest, SENT_COLUMN, RCVD_COLUMN
+from .delegates import TimeDelegate, LettersOnlyDelegate, CallsignDelegate, TYPED_ROLE
+
+DUPE_COLOR = QColor(255, 112, 67)
+HIDDEN_COLUMNS = set(DETAIL_COLUMNS)
+
+class LogTableModel(QAbstractTableModel):
+    """Qt model over a LogStore. The store stays the single source of truth."""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.dupes = None
+        self.search = None
+        self.resolver = None
+        self.contest = None
+        self.on_check = None  # called with (call, status) when a contest call is entered
+        self.qth = ""
+        self.query = ""
+        self._rows = list(store.order)
+        self._pos = None
+        store.add_listener(self)
+
+    def rid(self, row):
+        return self._rows[row]
+
+    def row_of(self, rid):
+        if self._pos is None:
+            self._pos = {rid: row for row, rid in enumerate(self._rows)}
+        return self._pos.get(rid)
+
+    def _shift(self, start):
+        """Renumber cached rows from ``start`` on, so appending stays O(1) per row."""
+        if self._pos is not None:
+            rows = self._rows
+            for row in range(start, len(rows)):
+                self._pos[rows[row]] = row
+
+    def set_query(self, text):
+        """Show only the rows matching a search query, empty shows everything."""
+        self.query = text.strip()
+        self.on_reset()
+
+    def _visible_rows(self):
+        if self.search is None or not self.query:
+            return list(self.store.order)
+        positions = self.store.positions()
+        rids = [rid for rid in self.search.query(self.query) if rid in positions]
+        rids.sort(key=positions.__getitem__)
+        return rids
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rid = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.store.get(rid, self.store.columns[index.column()])
+        if role == Qt.ToolTipRole and self.qth and self.store.columns[index.column()] == GRID_COLUMN:
+            tip = self.grid_tip(self.store.get(rid, GRID_COLUMN))
+            if tip:
+                return tip
+        if self.contest is not None and self.contest.is_dupe(rid):
+            if role == Qt.BackgroundRole:
+                return QBrush(DUPE_COLOR)
+            if role == Qt.ToolTipRole:
+                return "Contest dupe on this band"
+        if self.dupes is not None and self.dupes.is_dupe(rid):
+            if role == Qt.BackgroundRole:
+                return QBrush(DUPE_COLOR)
+            if role == Qt.ToolTipRole:
+                return "Duplicate QSO"
+        return None
+
+    def grid_tip(self, locator):
+        (distance,), (bearing,) = locate_from(self.qth, [locator])
+        if np.isnan(distance):
+            return None
+        return f"{distance:.0f} km, {bearing:.0f}° from {self.qth.upper()}"
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        rid = self._rows[index.row()]
+        column = self.store.columns[index.column()]
+        if role == TYPED_ROLE:
+            text, typed = value
+            self.store.set(rid, column, text, typed=typed)
+        elif role != Qt.EditRole:
+            return False
+        elif column == "Callsign":
+            self.check_call(rid, str(value))
+            with self.store.transaction():
+                self.store.set(rid, column, str(value))
+                if str(value).strip():
+                    self.stamp(rid)
+                if self.resolver is not None:
+                    self.enrich(rid)
+                if self.contest is not None and str(value).strip() and not self.store.get(rid, SENT_COLUMN):
+                    self.store.set(rid, SENT_COLUMN, f"{self.contest.next_serial():03d}")
+        else:
+            self.store.set(rid, column, str(value))
+        return True
+
+    def check_call(self, rid, call):
+        """Report a contest dupe or new multiplier before the call is logged."""
+        if self.contest is None or self.on_check is None or not call.strip():
+            return
+        if normalize_callsign(call) == normalize_callsign(self.store.get(rid, "Callsign")):
+            return
+        status = self.contest.check(call, self.contest.band_of(rid))
+        if status:
+            self.on_check(normalize_callsign(call), status)
+
+    def stamp(self, rid):
+        """Log the current UTC date and time on a new QSO, so it counts toward the rate."""
+        if self.store.get(rid, "Date") or self.store.get(rid, "Time"):
+            return
+        now = time.gmtime()
+        for column, fmt in (("Date", "%Y-%m-%d"), ("Time", "%H:%M")):
+            if column in self.store.columns:
+                self.store.set(rid, column, time.strftime(fmt, now))
+
+    def enrich(self, rid):
+        """Auto-fill entity, continent, zones and position from the callsign."""
+        record = self.resolver.enrich({
+            "Callsign": self.store.get(rid, "Callsign"),
+            "Place": self.store.get(rid, "Place"),
+        })
+        for column, value in record.items():
+            if column != "Callsign":
+                self.store.set(rid, column, value)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.store.columns[section] if section < len(self.store.columns) else None
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if 0 <= column < len(self.store.columns):
+            self.store.sort([(self.store.columns[column], order == Qt.DescendingOrder)])
+
+    def refresh_row(self, rid):
+        row = self.row_of(rid)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        if self.query:
+            self.on_reset()
+            return
+        self.beginInsertRows(QModelIndex(), pos, pos + len(rids) - 1)
+        self._rows[pos:pos] = rids
+        self._shift(pos)
+        self.endInsertRows()
+
+    def on_update(self, rid, column, old):
+        row = self.row_of(rid)
+        if row is not None:
+            index = self.index(row, self.store.column_index(column))
+            self.dataChanged.emit(index, index)
+
+    def on_remove(self, rids, positions):
+        row = self.row_of(rids[0]) if len(rids) == 1 else None
+        if row is None:
+            self.on_reset()
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        if self._pos is not None:
+            del self._pos[rids[0]]
+            self._shift(row)
+        self.endRemoveRows()
+
+    def on_restore(self, rids, positions):
+        if len(rids) == 1 and not self.query:
+            self.on_insert(positions[0], rids)
+        else:
+            self.on_reset()
+
+    def on_add_column(self, name):
+        self.on_reset()
+
+    def on_reorder(self, keys):
+        self.layoutAboutToBeChanged.emit()
+        self._rows = self._visible_rows()
+        self._pos = None
+        self.layoutChanged.emit()
+
+    def on_reset(self):
+        self.beginResetModel()
+        self._rows = self._visible_rows()
+        self._pos = None
+        self.endResetModel()
+
+class ArchiveTableModel(QAbstractTableModel):
+    """Read-only Qt model over a memory-mapped LogArchive.
+
+    Cells are decoded only when Qt asks for them, so scrolling a
+    multi-million row archive touches just the pages on screen.
+    """
+    def __init__(self, archive, parent=None):
+        super().__init__(parent)
+        self.archive = archive
+        self.query = ""
+        self._rows = np.arange(len(archive))
+
+    def set_query(self, text):
+        self.query = text.strip()
+        self.beginResetModel()
+        self._rows = self.archive.query(self.query)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.archive.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.archive.get(self._rows[index.row()], self.archive.columns[index.column()])
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.archive.columns[section] if section < len(self.archive.columns) else None
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not 0 <= column < len(self.archive.columns):
+            return
+        key = self.archive.sort_key(self.archive.columns[column], self._rows, order == Qt.DescendingOrder)
+        self.layoutAboutToBeChanged.emit()
+        self._rows = self._rows[np.argsort(key, kind="stable")]
+        self.layoutChanged.emit()
+
+class HamLogBook(QTableView):
+    def __init__(self, rows, font_family, font_size, parent=None, dark_mode=False):
+        super().__init__(parent)
+        self.store = LogStore(rows=rows)
+        # Indexes listen before the model, so they are current when rows repaint
+        self.dupes = DupeIndex(self.store)
+        self.search = SearchIndex(self.store)
+        self.scp = SuperCheckPartial(store=self.store)
+        self.grids = GridIndex(self.store)
+        self.log_model = LogTableModel(self.store, self)
+        self.log_model.dupes = self.dupes
+        self.log_model.search = self.search
+        self.resolver = None
+        self.archive_model = None
+        self.dupes.on_flag = self.log_model.refresh_row
+        self.setModel(self.log_model)
         self.verticalHeader().setVisible(True)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.setAlternatingRowColors(True)
-        self.setEditTriggers(QTableWidget.AllEditTriggers)
-        self.setFont(QFont(font_family, font_size))
+        self.setEditTriggers(QTableView.AllEditTriggers)
+        self.apply_prefs({
+            "rows": rows,
+            "font_family": font_family,
+            "font_size": font_size,
+            "dark_mode": dark_mode,
+        })
+        self.setSortingEnabled(True)
+        self.time_delegate = TimeDelegate(self)
+        self.letters_delegate = LettersOnlyDelegate(self)
+        self.callsign_delegate = CallsignDelegate(self.scp, self)
+        self.apply_delegates()
+        self.log_model.modelReset.connect(self.apply_delegates)
+
+    def apply_prefs(self, prefs):
+        """Restyle in place. Only the look changes, the logged data is never touched."""
+        font_size = prefs["font_size"]
+        self.setFont(QFont(prefs["font_family"], font_size))
+        background = "#23272e" if prefs.get("dark_mode") else "#fff"
         self.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 font-size: {font_size + 2}px;
                 border-radius: 8px;
-                background: #23272e if self.prefs.get("dark_mode") else "#fff;
+                background: {background};
             }}
             QHeaderView::section {{
                 padding: 8px;
@@ -23,9 +317,84 @@ class HamLogBook(QTableWidget):
                 border-radius: 8px;
             }}
         """)
-        self.setSortingEnabled(True)
-        self.setItemDelegateForColumn(1, TimeDelegate(self))
-        letters_delegate = LettersOnlyDelegate(self)
-        self.setItemDelegateForColumn(0, letters_delegate)
-        self.setItemDelegateForColumn(2, letters_delegate)
-        self.setItemDelegateForColumn(3, letters_delegate)
\ No newline at end of file
+        self.log_model.qth = prefs.get("qth_locator", "")
+        self.ensure_rows(prefs["rows"])
+
+    def ensure_rows(self, rows):
+        """Pad the log with blank rows up to ``rows``; rows are never dropped."""
+        missing = rows - len(self.store)
+        if missing > 0:
+            with self.store.transaction(undoable=False):
+                self.store.extend([{}] * missing)
+
+    def set_query(self, text):
+        (self.archive_model or self.log_model).set_query(text)
+
+    def open_archive(self, archive):
+        """Show a read-only LogArchive in place of the live log."""
+        self.close_archive()
+        self.archive_model = ArchiveTableModel(archive, self)
+        self.setModel(self.archive_model)
+        self.apply_delegates()
+
+    def close_archive(self):
+        """Go back to the live log."""
+        if self.archive_model is None:
+            return
+        # Detach the view before the archive drops its arrays
+        model, self.archive_model = self.archive_model, None
+        self.setModel(self.log_model)
+        self.apply_delegates()
+        model.archive.close()
+
+    def set_resolver(self, resolver):
+        """Use a DxccResolver to fill in entity details as callsigns are entered."""
+        self.resolver = self.log_model.resolver = resolver
+        if resolver is not None:
+            for col in DETAIL_COLUMNS:
+                self.store.add_column(col)
+
+    def start_contest(self, mycall, name=""):
+        """Number, dupe check and score QSOs as a contest log."""
+        self.stop_contest()
+        for col in ("Mode", SENT_COLUMN, RCVD_COLUMN):
+            self.store.add_column(col)
+        self.log_model.contest = Contest(self.store, mycall, name, self.resolver, on_flag=self.log_model.refresh_row)
+        self.viewport().update()
+        return self.log_model.contest
+
+    def stop_contest(self):
+        if self.log_model.contest is not None:
+            self.store.remove_listener(self.log_model.contest)
+            self.log_model.contest = None
+            self.viewport().update()
+
+    def insert_row(self):
+        """Insert a blank row above the current one, or at the end."""
+        if self.archive_model is not None:
+            return
+        # The view may be filtered or sorted: insert above the current row's store position
+        row = self.currentIndex().row()
+        pos = self.store.positions()[self.log_model.rid(row)] if row >= 0 else len(self.store)
+        self.store.insert(pos)
+
+    def delete_selected_rows(self):
+        if self.archive_model is not None:
+            return
+        rows = {index.row() for index in self.selectionModel().selectedIndexes()}
+        if not rows and self.currentIndex().isValid():
+            rows = {self.currentIndex().row()}
+        self.store.remove(self.log_model.rid(row) for row in sorted(rows))
+
+    def apply_delegates(self):
+        """Attach editors and hide detail columns by name, imported logs may reorder the columns."""
+        delegates = {
+            "Name": self.letters_delegate,
+            "Time": self.time_delegate,
+            "Callsign": self.callsign_delegate,
+            "Place": self.letters_delegate,
+        }
+        columns = self.store.columns if self.archive_model is None else self.archive_model.archive.columns
+        for col, name in enumerate(columns):
+            self.setItemDelegateForColumn(col, delegates.get(name))
+            self.setColumnHidden(col, name in HIDDEN_COLUMNS)
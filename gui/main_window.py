@@ -2,27 +2,54 @@ import os
 import json
 import pandas as pd
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QAction, QVBoxLayout, QWidget, QLabel, QFileDialog, QMessageBox, QTableWidgetItem, QHBoxLayout, QPushButton, QDialog
+    QApplication, QMainWindow, QAction, QVBoxLayout, QWidget, QLabel, QFileDialog, QMessageBox, QHBoxLayout, QPushButton, QDialog,
+    QLineEdit, QDockWidget, QInputDialog
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont, QKeySequence
 from PyQt5.QtGui import QPalette, QColor
+from logbook.store import COLUMNS
+from logbook.dupes import unique_rows
+from logbook.dxcc import DxccResolver, DETAIL_COLUMNS
+from logbook.scp import load_master
+from logbook.validate import validate_frame, format_report
+from logbook.journal import Journal, JOURNAL_FILE
+from logbook.history import UndoStack
+from logbook.stats import LogStats
+from logbook.io import LOG_FILTER, read_frame
+from logbook.merge import merge_logs
+from logbook.confirm import apply_matches, match_files, store_columns
+from logbook.archive import ARCHIVE_FILTER, LogArchive, write_archive
+from logbook.contest import CONTEST_FILTER, write_cabrillo
 from .hamlog import HamLogBook
 from .preferences import PreferencesDialog
 from .antenna_calc import AntennaCalculatorDialog
 from .dump_dialog import DumpDialog
-from .propagation_info import PropagationInfoDialog
+from .propagation_info import PropagationInfoDialog, PropagationMapDialog, prewarm
+from . import fetcher, webprofile
 from .upload_dialog import UploadDialog
 from .propagation_settings import PropagationSettingsDialog
 from .morse_practicer import MorsePracticerDialog
 from .morse_translator import MorseTranslatorDialog
+from .stats_panel import StatsPanel
 
 PREFS_FILE = "talasnik_prefs.json"
+JOURNAL_SYNC_MS = 2000
+SEARCH_DELAY_MS = 120
+CONTEST_REFRESH_MS = 1000
+CONTEST_CHECK_MS = 5000  # how long a dupe / new mult notice stays in the status bar
+PREWARM_DELAY_MS = 1500  # start the web engine this long after startup
 DEFAULT_PREFS = {
     "dark_mode": False,
     "rows": 20,
     "font_family": "Arial",
     "font_size": 15,
+    "cty_file": "cty.dat",
+    "scp_file": "MASTER.SCP",
+    "qth_locator": "",
+    "station_call": "",
+    "cluster_host": "telnet.reversebeacon.net",
+    "cluster_port": 7000,
     "solar_widgets": [
         "https://www.hamqsl.com/solar101vhfper.php"
     ]
@@ -38,6 +65,22 @@ def save_prefs(prefs):
     with open(PREFS_FILE, "w") as f:
         json.dump(prefs, f)
 
+def read_import(path, resolver=None):
+    """Parse, validate and dedupe a log file; runs on a worker thread.
+
+    Returns (columns, rows, skipped, report) ready for ``store.reset``.
+    """
+    df = read_frame(path)
+    rows, report = validate_frame(df)
+    columns = [str(col) for col in df.columns]
+    columns += [col for col in COLUMNS if col not in columns]
+    if resolver is not None:
+        columns += [col for col in DETAIL_COLUMNS if col not in columns]
+        rows = [resolver.enrich(row) for row in rows]
+    # Drop QSOs the file logs more than once
+    unique = list(unique_rows(rows))
+    return columns, unique, len(rows) - len(unique), report
+
 def show_dark_messagebox(parent, title, text, icon=QMessageBox.Information):
     box = QMessageBox(parent)
     box.setWindowTitle(title)
@@ -143,6 +186,10 @@ class MainWindow(QMainWindow):
         self.init_menu()
         self.init_ui()
         self.add_custom_titlebar()
+        # Propagation dialogs are kept once opened and shown again
+        self.propagation_info_dlg = None
+        self.propagation_map_dlg = None
+        QTimer.singleShot(PREWARM_DELAY_MS, prewarm)
 
     def setStyle(self):
         if self.prefs["dark_mode"]:
@@ -175,6 +222,7 @@ class MainWindow(QMainWindow):
     def init_menu(self):
         menubar = self.menuBar()
         settings_menu = menubar.addMenu("Settings")
+        edit_menu = menubar.addMenu("Edit")
         tools_menu = menubar.addMenu("Tools")
         export_menu = menubar.addMenu("Export")
         import_menu = menubar.addMenu("Import")
@@ -184,6 +232,26 @@ class MainWindow(QMainWindow):
         pref_action.triggered.connect(self.open_preferences)
         settings_menu.addAction(pref_action)
 
+        undo_action = QAction("Undo", self)
+        undo_action.setShortcut(QKeySequence.Undo)
+        undo_action.triggered.connect(lambda: self.undo_stack.undo())
+        edit_menu.addAction(undo_action)
+
+        redo_action = QAction("Redo", self)
+        redo_action.setShortcut(QKeySequence.Redo)
+        redo_action.triggered.connect(lambda: self.undo_stack.redo())
+        edit_menu.addAction(redo_action)
+
+        insert_row_action = QAction("Insert Row", self)
+        insert_row_action.setShortcut(QKeySequence("Ctrl+Ins"))
+        insert_row_action.triggered.connect(lambda: self.logbook.insert_row())
+        edit_menu.addAction(insert_row_action)
+
+        delete_rows_action = QAction("Delete Rows", self)
+        delete_rows_action.setShortcut(QKeySequence("Ctrl+Del"))
+        delete_rows_action.triggered.connect(lambda: self.logbook.delete_selected_rows())
+        edit_menu.addAction(delete_rows_action)
+
         dump_action = QAction("Dump Radio Memory...", self)
         dump_action.triggered.connect(self.open_dump_dialog)
         tools_menu.addAction(dump_action)
@@ -204,18 +272,56 @@ class MainWindow(QMainWindow):
         morse_translator_action.triggered.connect(self.open_morse_translator)
         tools_menu.addAction(morse_translator_action)
 
+        self.stats_action = QAction("Statistics", self)
+        self.stats_action.setCheckable(True)
+        self.stats_action.toggled.connect(lambda checked: self.stats_dock.setVisible(checked))
+        tools_menu.addAction(self.stats_action)
+
+        self.contest_action = QAction("Contest Mode", self)
+        self.contest_action.setCheckable(True)
+        self.contest_action.toggled.connect(self.toggle_contest)
+        tools_menu.addAction(self.contest_action)
+
+        self.merge_action = QAction("Merge Logs...", self)
+        self.merge_action.triggered.connect(self.merge_logs)
+        tools_menu.addAction(self.merge_action)
+
+        self.confirm_action = QAction("Match Confirmations...", self)
+        self.confirm_action.triggered.connect(self.match_confirmations)
+        tools_menu.addAction(self.confirm_action)
+
         export_action = QAction("Export Log...", self)
         export_action.triggered.connect(self.export_log)
         export_menu.addAction(export_action)
 
-        import_action = QAction("Import Log...", self)
-        import_action.triggered.connect(self.import_log)
-        import_menu.addAction(import_action)
+        export_cabrillo_action = QAction("Export Cabrillo...", self)
+        export_cabrillo_action.triggered.connect(self.export_cabrillo)
+        export_menu.addAction(export_cabrillo_action)
+
+        export_archive_action = QAction("Export Archive...", self)
+        export_archive_action.triggered.connect(self.export_archive)
+        export_menu.addAction(export_archive_action)
+
+        self.import_action = QAction("Import Log...", self)
+        self.import_action.triggered.connect(self.import_log)
+        import_menu.addAction(self.import_action)
+
+        open_archive_action = QAction("Open Archive...", self)
+        open_archive_action.triggered.connect(self.open_archive)
+        import_menu.addAction(open_archive_action)
+
+        close_archive_action = QAction("Close Archive", self)
+        close_archive_action.triggered.connect(lambda: self.logbook.close_archive())
+        import_menu.addAction(close_archive_action)
 
         propagation_info_action = QAction("Show Propagation Info...", self)
         propagation_info_action.triggered.connect(self.open_propagation_info)
         propagation_info_menu.addAction(propagation_info_action)
 
+        propagation_map_action = QAction("Show Propagation Map...", self)
+        propagation_map_action.triggered.connect(self.open_propagation_map)
+        propagation_info_menu.addAction(propagation_map_action)
+
         propagation_settings_action = QAction("Propagation Settings...", self)
         propagation_settings_action.triggered.connect(self.open_propagation_settings)
         propagation_info_menu.addAction(propagation_settings_action)
@@ -231,15 +337,59 @@ class MainWindow(QMainWindow):
         welcome = QLabel("Welcome to Talasnik\nHam Log Book below:")
         welcome.setAlignment(Qt.AlignCenter)
         layout.addWidget(welcome)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search log: YU1  call:YT  place:Beograd  name:Pera")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(lambda: self.logbook.set_query(self.search_edit.text()))
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        layout.addWidget(self.search_edit)
         self.logbook = HamLogBook(
             self.prefs["rows"],
             self.prefs["font_family"],
-            self.prefs["font_size"]
+            self.prefs["font_size"],
+            dark_mode=self.prefs.get("dark_mode", False)
         )
+        self.logbook.log_model.qth = self.prefs.get("qth_locator", "")
         layout.addWidget(self.logbook)
         central.setLayout(layout)
+
+        # Recover the log from the edit journal, then journal every change
+        self.journal = Journal(JOURNAL_FILE)
+        try:
+            self.journal.recover(self.logbook.store)
+        except Exception as e:
+            QMessageBox.critical(self, "Journal Error", f"Could not recover the log journal:\n{e}")
+        for col in COLUMNS:
+            self.logbook.store.add_column(col)
+        self.logbook.ensure_rows(self.prefs["rows"])
+        self.stats = LogStats(self.logbook.store)
+        self.load_resolver()
+        self.load_scp()
+        self.undo_stack = UndoStack(self.logbook.store)
+        self.journal_timer = QTimer(self)
+        self.journal_timer.timeout.connect(self.journal.sync)
+        self.journal_timer.timeout.connect(self.journal.compact)
+        self.journal_timer.start(JOURNAL_SYNC_MS)
         self.setCentralWidget(central)
 
+        self.stats_dock = QDockWidget("Statistics", self)
+        self.stats_dock.setWidget(StatsPanel(self.stats, self.logbook.grids))
+        self.stats_dock.visibilityChanged.connect(self.stats_action.setChecked)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.stats_dock)
+        self.stats_dock.hide()
+
+        self.contest_label = QLabel()
+        self.statusBar().addPermanentWidget(self.contest_label)
+        self.contest_timer = QTimer(self)
+        self.contest_timer.timeout.connect(self.refresh_contest)
+        # Long jobs such as merging logs run on the shared pool
+        self.jobs = fetcher.Fetcher(self)
+        self.jobs.done.connect(self.on_job_done)
+        self.jobs.failed.connect(self.on_job_failed)
+
         color = "#23272e" if not self.prefs.get("dark_mode") else "white"
         welcome.setStyleSheet(
             f"font-family: 'Segoe UI', 'Arial', sans-serif; font-size: 22px; font-weight: 600; margin-bottom: 12px; color: {color} !important;"
@@ -319,40 +469,41 @@ class MainWindow(QMainWindow):
             self.showFullScreen()
             self._is_fullscreen = True
 
+    def load_resolver(self):
+        """Load the offline DXCC country file, if there is one."""
+        path = self.prefs.get("cty_file")
+        if not path or not os.path.exists(path):
+            return
+        try:
+            resolver = DxccResolver.load(path)
+            self.logbook.set_resolver(resolver)
+            self.stats.set_resolver(resolver)
+        except Exception as e:
+            QMessageBox.critical(self, "Country File Error", f"Could not load {path}:\n{e}")
+
+    def load_scp(self):
+        """Load the super check partial call list, if there is one."""
+        path = self.prefs.get("scp_file")
+        if not path or not os.path.exists(path):
+            return
+        try:
+            self.logbook.scp.master = load_master(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Call List Error", f"Could not load {path}:\n{e}")
+
+    def closeEvent(self, event):
+        self.journal.close()
+        fetcher.shutdown()
+        webprofile.shutdown()
+        super().closeEvent(event)
+
     def open_preferences(self):
         dlg = PreferencesDialog(self.prefs, self)
         if dlg.exec_():
             self.prefs = dlg.get_prefs()
             save_prefs(self.prefs)
             self.setStyle()
-            # --- Save current data ---
-            old_data = []
-            for row in range(self.logbook.rowCount()):
-                row_data = []
-                for col in range(self.logbook.columnCount()):
-                    item = self.logbook.item(row, col)
-                    row_data.append(item.text() if item else "")
-                old_data.append(row_data)
-            columns = [self.logbook.horizontalHeaderItem(i).text() for i in range(self.logbook.columnCount())]
-            # --- Rebuild logbook with new settings ---
-            self.centralWidget().layout().removeWidget(self.logbook)
-            self.logbook.deleteLater()
-            self.logbook = HamLogBook(
-                self.prefs["rows"],
-                self.prefs["font_family"],
-                self.prefs["font_size"]
-            )
-            self.centralWidget().layout().addWidget(self.logbook)
-            # --- Restore data (truncate or pad as needed) ---
-            for row_idx, row_data in enumerate(old_data):
-                if row_idx >= self.logbook.rowCount():
-                    self.logbook.insertRow(row_idx)
-                for col_idx, value in enumerate(row_data):
-                    if col_idx < self.logbook.columnCount():
-                        item = QTableWidgetItem(value)
-                        if self.prefs.get("dark_mode"):
-                            item.setForeground(QColor(Qt.white))
-                        self.logbook.setItem(row_idx, col_idx, item)
+            self.logbook.apply_prefs(self.prefs)
 
     def open_dump_dialog(self):
         dlg = DumpDialog(self)
@@ -392,16 +543,8 @@ class MainWindow(QMainWindow):
         elif selected_filter.startswith("JSON") and not path.lower().endswith(".json"):
             path += ".json"
 
-        # Gather data from table
-        data = []
-        for row in range(self.logbook.rowCount()):
-            row_data = []
-            for col in range(self.logbook.columnCount()):
-                item = self.logbook.item(row, col)
-                row_data.append(item.text() if item else "")
-            data.append(row_data)
-        columns = [self.logbook.horizontalHeaderItem(i).text() for i in range(self.logbook.columnCount())]
-        df = pd.DataFrame(data, columns=columns)
+        store = self.logbook.store
+        df = pd.DataFrame(store.rows(), columns=store.columns)
         if path.endswith(".xlsx"):
             df.to_excel(path, index=False)
         else:
@@ -413,32 +556,166 @@ class MainWindow(QMainWindow):
             self,
             "Import Log",
             "",
-            "Excel Files (*.xlsx);;JSON Files (*.json)",
+            LOG_FILTER,
             options=options
         )
         if not path:
             return
 
+        self.import_action.setEnabled(False)
+        self.statusBar().showMessage(f"Importing {path}...")
+        self.importing = path
+        self.jobs.submit("import", read_import, path, self.logbook.resolver)
+
+    def import_done(self, result):
+        columns, unique, skipped, report = result
+        self.import_action.setEnabled(True)
+        self.statusBar().clearMessage()
+        self.logbook.store.reset(unique, columns=columns)
+        msg = f"Imported {len(unique)} rows from: {self.importing}"
+        if skipped:
+            msg += f"\nSkipped {skipped} duplicate QSOs."
+        if len(report):
+            box = QMessageBox(QMessageBox.Warning, "Import", msg + f"\nRejected {report['Row'].nunique()} invalid rows.", parent=self)
+            box.setDetailedText(format_report(report))
+            box.exec_()
+        else:
+            QMessageBox.information(self, "Import", msg)
+
+    def export_archive(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Archive", "", ARCHIVE_FILTER)
+        if not path:
+            return
+        if not path.lower().endswith(".tla"):
+            path += ".tla"
+        try:
+            count = write_archive(path, self.logbook.store)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Failed to write archive: {e}")
+            return
+        QMessageBox.information(self, "Export Archive", f"Archived {count} QSOs to: {path}")
+
+    def open_archive(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Archive", "", ARCHIVE_FILTER)
+        if not path:
+            return
+        try:
+            self.logbook.open_archive(LogArchive(path))
+        except Exception as e:
+            QMessageBox.critical(self, "Archive Error", f"Failed to open archive: {e}")
+            return
+        self.logbook.set_query(self.search_edit.text())
+
+    def toggle_contest(self, checked):
+        if not checked:
+            self.logbook.stop_contest()
+            self.contest_timer.stop()
+            self.contest_label.clear()
+            return
+        mycall, ok = QInputDialog.getText(self, "Contest Mode", "Your callsign:", text=self.prefs.get("station_call", ""))
+        if not ok or not mycall.strip():
+            self.contest_action.setChecked(False)
+            return
+        name, ok = QInputDialog.getText(self, "Contest Mode", "Contest name (Cabrillo CONTEST:):")
+        if not ok:
+            self.contest_action.setChecked(False)
+            return
+        self.prefs["station_call"] = mycall.strip().upper()
+        save_prefs(self.prefs)
+        self.logbook.start_contest(mycall, name.strip().upper())
+        self.logbook.log_model.on_check = self.show_contest_check
+        self.contest_timer.start(CONTEST_REFRESH_MS)
+        self.refresh_contest()
+
+    def show_contest_check(self, call, status):
+        self.statusBar().showMessage(f"{call}: {status}", CONTEST_CHECK_MS)
+
+    def refresh_contest(self):
+        contest = self.logbook.log_model.contest
+        if contest is None:
+            return
+        self.contest_label.setText(
+            f"{contest.name or 'Contest'}: {contest.qsos} QSOs   {contest.points} pts   "
+            f"{len(contest.mults)} mults   Score {contest.score}   Next nr {contest.last_serial + 1:03d}"
+        )
+
+    def export_cabrillo(self):
+        contest = self.logbook.log_model.contest
+        if contest is None:
+            QMessageBox.warning(self, "Export Cabrillo", "Turn on Tools > Contest Mode first.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Cabrillo", "", CONTEST_FILTER)
+        if not path:
+            return
         try:
-            if path.endswith(".xlsx"):
-                df = pd.read_excel(path)
-            else:
-                df = pd.read_json(path)
-            # Clear current table
-            self.logbook.setRowCount(0)
-            self.logbook.setColumnCount(len(df.columns))
-            self.logbook.setHorizontalHeaderLabels([str(col) for col in df.columns])
-            # Fill table with imported data
-            for row_idx, row in df.iterrows():
-                self.logbook.insertRow(row_idx)
-                for col_idx, value in enumerate(row):
-                    item = QTableWidgetItem(str(value))
-                    if self.prefs.get("dark_mode"):
-                        item.setForeground(QColor(Qt.white))
-                    self.logbook.setItem(row_idx, col_idx, item)
-            QMessageBox.information(self, "Import", f"Imported {len(df)} rows from: {path}")
+            count = write_cabrillo(path, contest)
         except Exception as e:
-            QMessageBox.critical(self, "Import Error", f"Failed to import: {e}")
+            QMessageBox.critical(self, "Export Error", f"Failed to write Cabrillo log: {e}")
+            return
+        QMessageBox.information(self, "Export Cabrillo", f"Exported {count} QSOs to: {path}")
+
+    def match_confirmations(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Match Confirmations", "", LOG_FILTER)
+        if not paths:
+            return
+        store = self.logbook.store
+        rids = [rid for rid in store.order if store.get(rid, "Callsign")]
+        self.confirm_action.setEnabled(False)
+        self.statusBar().showMessage(f"Matching {len(rids)} QSOs against {len(paths)} logs...")
+        self.confirming = rids
+        self.jobs.submit("confirm", match_files, store_columns(store, rids), paths)
+
+    def confirm_done(self, matches):
+        self.confirm_action.setEnabled(True)
+        self.statusBar().clearMessage()
+        confirmed, total = apply_matches(self.logbook.store, self.confirming, matches)
+        QMessageBox.information(self, "Match Confirmations", f"Confirmed {confirmed} of {total} QSOs.")
+
+    def merge_logs(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Merge Logs", "", LOG_FILTER)
+        if not paths:
+            return
+        out_path, _ = QFileDialog.getSaveFileName(self, "Save Merged Log", "", LOG_FILTER)
+        if not out_path:
+            return
+
+        self.merge_action.setEnabled(False)
+        self.statusBar().showMessage(f"Merging {len(paths)} logs...")
+        self.merging = (paths, out_path)
+        self.jobs.submit("merge", merge_logs, paths, out_path)
+
+    def on_job_done(self, key, result):
+        if key == "merge":
+            self.merge_done(result)
+        elif key == "import":
+            self.import_done(result)
+        elif key == "confirm":
+            self.confirm_done(result)
+
+    def on_job_failed(self, key, message):
+        if key == "merge":
+            self.merge_action.setEnabled(True)
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Merge Error", f"Failed to merge logs: {message}")
+        elif key == "import":
+            self.import_action.setEnabled(True)
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Import Error", f"Failed to import: {message}")
+        elif key == "confirm":
+            self.confirm_action.setEnabled(True)
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Confirmation Error", f"Failed to match confirmations: {message}")
+
+    def merge_done(self, result):
+        paths, out_path = self.merging
+        self.merge_action.setEnabled(True)
+        self.statusBar().clearMessage()
+        msg = f"Merged {len(paths)} logs into: {out_path}\n{result.written} QSOs written."
+        if result.duplicates:
+            msg += f"\nDropped {result.duplicates} duplicate QSOs."
+        if result.rejected:
+            msg += f"\nRejected {result.rejected} invalid rows."
+        QMessageBox.information(self, "Merge Logs", msg)
 
     def show_message(self, title, msg):
         if self.prefs.get("dark_mode"):
@@ -450,14 +727,22 @@ class MainWindow(QMainWindow):
             box.exec_()
 
     def open_propagation_info(self):
-        dlg = PropagationInfoDialog(self)
-        dlg.exec_()
+        if self.propagation_info_dlg is None:
+            self.propagation_info_dlg = PropagationInfoDialog(self)
+        self.propagation_info_dlg.exec_()
+
+    def open_propagation_map(self):
+        if self.propagation_map_dlg is None:
+            self.propagation_map_dlg = PropagationMapDialog(self)
+        self.propagation_map_dlg.exec_()
 
     def open_propagation_settings(self):
         dlg = PropagationSettingsDialog(self.prefs.get("solar_widgets", []), self)
         if dlg.exec_():
             self.prefs["solar_widgets"] = dlg.get_selected_urls()
             save_prefs(self.prefs)
+            if self.propagation_info_dlg is not None:
+                self.propagation_info_dlg.set_widgets(self.prefs["solar_widgets"])
 
     def show_about(self):
         dlg = AboutDialog(self)
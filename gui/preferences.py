@@ -1,5 +1,6 @@
-from PyQt5.QtWidgets import QDialog, QFormLayout, QCheckBox, QSpinBox, QFontComboBox, QHBoxLayout, QPushButton, QComboBox, QLabel
-from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QDialog, QFormLayout, QCheckBox, QSpinBox, QFontComboBox, QHBoxLayout, QPushButton, QComboBox, QLabel, QLineEdit
+from PyQt5.QtCore import QRegExp
+from PyQt5.QtGui import QFont, QRegExpValidator
 
 class PreferencesDialog(QDialog):
     def __init__(self, prefs, parent=None):
@@ -30,6 +31,19 @@ class PreferencesDialog(QDialog):
         self.font_size.setValue(self.prefs["font_size"])
         layout.addRow("Font size:", self.font_size)
 
+        # Station section
+        station_label = QLabel("<b>Station</b>")
+        layout.addRow(station_label)
+
+        self.station_call = QLineEdit(self.prefs.get("station_call", ""))
+        self.station_call.setValidator(QRegExpValidator(QRegExp(r"^[A-Za-z0-9/]*$"), self.station_call))
+        layout.addRow("Callsign:", self.station_call)
+
+        self.qth_locator = QLineEdit(self.prefs.get("qth_locator", ""))
+        self.qth_locator.setValidator(QRegExpValidator(QRegExp(r"^[A-Ra-r]{2}(\d\d([A-Xa-x]{2}(\d\d)?)?)?$"), self.qth_locator))
+        self.qth_locator.setPlaceholderText("e.g. KN04FS")
+        layout.addRow("QTH locator:", self.qth_locator)
+
         # Morse section
         morse_label = QLabel("<b>Morse</b>")
         layout.addRow(morse_label)
@@ -85,11 +99,15 @@ class PreferencesDialog(QDialog):
             """)
 
     def get_prefs(self):
+        # Keep prefs this dialog does not edit (files, widgets)
         return {
+            **self.prefs,
             "dark_mode": self.dark_mode.isChecked(),
             "rows": self.rows.value(),
             "font_family": self.font_family.currentFont().family(),
             "font_size": self.font_size.value(),
             "morse_mode": self.morse_mode.currentText(),
-            "show_morse_alphabet": self.show_morse_alphabet.isChecked()
+            "show_morse_alphabet": self.show_morse_alphabet.isChecked(),
+            "station_call": self.station_call.text().upper(),
+            "qth_locator": self.qth_locator.text().upper(),
         }
\ No newline at end of file
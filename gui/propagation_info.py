@@ -1,10 +1,175 @@
-import tempfile
+import json
+import re
+import time
+from collections import deque
 import folium
-import requests
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QComboBox, QMessageBox, QSizePolicy, QHBoxLayout, QWidget
+import numpy as np
+from folium.plugins import HeatMap, MarkerCluster
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QComboBox, QMessageBox, QSizePolicy, QHBoxLayout, QWidget, QCheckBox
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtCore import QUrl, QTimer, Qt
 from PyQt5.QtGui import QPalette, QColor
+from propagation.httpcache import http_cache
+from propagation.cluster import ClusterClient, Spot, CLUSTER_HOST, CLUSTER_PORT
+from propagation.spots import SpotStore
+from propagation.heatmap import grid_geojson, heat_points
+from propagation.solar import solar_history, sparkline
+from propagation.muf import openings_geojson, predict
+from propagation.sun import grayline_geojson
+from logbook.maidenhead import from_locators, is_locator
+from .fetcher import Fetcher
+from . import webprofile
+
+SPOTS_URL = "https://reversebeacon.net/spots.php?format=json"
+INDICES_URL = "https://www.hamqsl.com/solarjson.php"
+LIVE_PUSH_MS = 1000
+PREDICTION_REFRESH_MS = 60 * 1000  # predictions change on the hour
+GRAYLINE_REFRESH_MS = 10 * 1000  # the grayline moves each minute
+MAX_MARKERS = 2000  # newest spots kept as individual markers
+CLUSTER_ZOOM = 7  # individual markers from this zoom in, clusters below
+MAP_VIEWS = ["Heatmap", "Grid squares"]
+HISTORY_DAYS = 30  # daily SFI shown in the indices panel
+HISTORY_HOURS = 48  # hourly K shown in the indices panel
+MAP_BASE_URL = "https://talasnik.local/"  # origin of the in-memory map page, so it may load the CDN scripts
+CALL_JUNK_RE = re.compile(r"[^A-Za-z0-9/]")
+# Last data fetched, shown at once when a dialog opens while fresh data loads
+_last = {}
+# Map-side API: the page is loaded once, spots arrive as data through runJavaScript.
+# setSpots replaces the aggregate and cluster layers; the live feed adds and
+# removes markers by spot id. Spot rows are [id, lat, lon, spotter, dx, kHz].
+MAP_JS = """<script>
+var aggregateLayer = null;
+var clusterLayer = null;
+var noDataPopup = null;
+var liveMarkers = {};
+var liveLayer = null;
+var predictionLayer = null;
+var PREDICTION_COLORS = {open: "green", marginal: "orange"};
+var graylineLayer = null;
+var GRAYLINE_STYLES = {
+    twilight: {color: "#333", weight: 1, fillColor: "#000", fillOpacity: 0.12},
+    night: {stroke: false, fillColor: "#000", fillOpacity: 0.18}
+};
+function spotMarker(s, color) {
+    return L.circleMarker([s[1], s[2]], {radius: 4, color: color, fill: true, fillOpacity: 0.7})
+        .bindPopup("RX: " + s[3] + "<br>Heard: " + s[4] + "<br>" + s[5] + " kHz");
+}
+function setSpots(data) {
+    [aggregateLayer, clusterLayer, noDataPopup].forEach(function (layer) {
+        if (layer) { %(map)s.removeLayer(layer); }
+    });
+    aggregateLayer = clusterLayer = noDataPopup = null;
+    if (!data.rows.length) {
+        noDataPopup = L.popup().setLatLng([20, 0]).setContent("No propagation data available.").openOn(%(map)s);
+        return;
+    }
+    if (data.squares) {
+        aggregateLayer = L.geoJSON(data.squares, {
+            style: function (f) {
+                return {fillColor: "red", color: "red", weight: 0.5, fillOpacity: 0.15 * f.properties.level};
+            }
+        }).bindTooltip(function (layer) {
+            var p = layer.feature.properties;
+            return "Square: " + p.square + "<br>Spots: " + p.count;
+        });
+    } else {
+        aggregateLayer = L.heatLayer(data.heat, {radius: 20, blur: 15, minOpacity: 0.3});
+    }
+    aggregateLayer.addTo(%(map)s);
+    clusterLayer = L.markerClusterGroup({disableClusteringAtZoom: %(cluster_zoom)d});
+    clusterLayer.addLayers(data.rows.map(function (s) { return spotMarker(s, "blue"); }));
+    clusterLayer.addTo(%(map)s);
+}
+function setPrediction(data) {
+    if (predictionLayer) { %(map)s.removeLayer(predictionLayer); predictionLayer = null; }
+    if (!data) { return; }
+    predictionLayer = L.geoJSON(data, {
+        interactive: false,
+        style: function (f) { return {stroke: false, fillColor: PREDICTION_COLORS[f.properties.state], fillOpacity: 0.25}; }
+    }).addTo(%(map)s);
+    predictionLayer.bringToBack();
+}
+function setGrayline(data) {
+    if (!graylineLayer) {
+        graylineLayer = L.geoJSON(null, {
+            interactive: false,
+            style: function (f) { return GRAYLINE_STYLES[f.properties.kind]; },
+            pointToLayer: function (f, latlng) {
+                return L.circleMarker(latlng, {radius: 6, color: "orange", fillColor: "yellow", fillOpacity: 0.9});
+            }
+        }).addTo(%(map)s);
+    }
+    graylineLayer.clearLayers();
+    if (data) { graylineLayer.addData(data); }
+}
+function addSpots(spots) {
+    if (!liveLayer) {
+        liveLayer = L.markerClusterGroup({disableClusteringAtZoom: %(cluster_zoom)d}).addTo(%(map)s);
+    }
+    liveLayer.addLayers(spots.map(function (s) { return liveMarkers[s[0]] = spotMarker(s, "red"); }));
+    // Ids are increasing integers, so the keys come oldest first
+    var ids = Object.keys(liveMarkers);
+    if (ids.length > %(max_markers)d) { removeSpots(ids.slice(0, ids.length - %(max_markers)d)); }
+}
+function setLiveSpots(spots) {
+    if (liveLayer) { liveLayer.clearLayers(); }
+    liveMarkers = {};
+    addSpots(spots);
+}
+function removeSpots(ids) {
+    var gone = [];
+    ids.forEach(function (id) {
+        if (liveMarkers[id]) { gone.push(liveMarkers[id]); delete liveMarkers[id]; }
+    });
+    if (gone.length) { liveLayer.removeLayers(gone); }
+}
+</script>"""
+
+def map_page():
+    """HTML of the empty map page: tiles, Leaflet plugins and MAP_JS, no spots."""
+    m = folium.Map(location=[20, 0], zoom_start=2, tiles="CartoDB positron")
+    header = m.get_root().header
+    for name, url in HeatMap.default_js + MarkerCluster.default_js:
+        header.add_child(folium.JavascriptLink(url), name=name)
+    for name, url in MarkerCluster.default_css:
+        header.add_child(folium.CssLink(url), name=name)
+    m.get_root().html.add_child(folium.Element(MAP_JS % {"map": m.get_name(), "cluster_zoom": CLUSTER_ZOOM, "max_markers": MAX_MARKERS}))
+    return m.get_root().render()
+
+def prewarm():
+    """Start the web engine on the map page while the app is idle."""
+    webprofile.prewarm(map_page(), QUrl(MAP_BASE_URL))
+
+def parse_spots(data):
+    """SpotStore of the RBN spots with a receiver position, placed at the receiver."""
+    now = time.time()
+    spots = []
+    for spot in data.get("spots", []):
+        rx_lat = spot.get("lat")
+        rx_lon = spot.get("lon")
+        if rx_lat is not None and rx_lon is not None:
+            rx_call = CALL_JUNK_RE.sub("", str(spot.get("decall", ""))) or "Unknown"
+            tx_call = CALL_JUNK_RE.sub("", str(spot.get("dxcall", ""))) or "Unknown"
+            spots.append(Spot(now, rx_call, tx_call, float(spot.get("freq") or 0),
+                              spot.get("band", ""), "", None, rx_lat, rx_lon))
+    return SpotStore.from_spots(spots)
+
+def fetch_spots():
+    return parse_spots(http_cache().get_json(SPOTS_URL, timeout=20))
+
+def fetch_indices():
+    return http_cache().get_json(INDICES_URL, timeout=10).get("solar", {})
+
+def load_cached():
+    """Seed the last data from the disk cache, without any network access."""
+    for key, url, parse in (("spots", SPOTS_URL, parse_spots), ("indices", INDICES_URL, lambda data: data.get("solar", {}))):
+        entry = http_cache().peek(url)
+        if key in _last or entry is None:
+            continue
+        try:
+            _last[key] = parse(json.loads(entry.body))
+        except ValueError:
+            pass
 
 def show_dark_messagebox(parent, title, text, icon=QMessageBox.Information):
     box = QMessageBox(parent)
@@ -34,10 +199,30 @@ class PropagationMapDialog(QDialog):
         layout.addWidget(band_label)
         layout.addWidget(self.band_combo)
 
+        self.view_combo = QComboBox()
+        self.view_combo.addItems(MAP_VIEWS)
+        layout.addWidget(QLabel("Show spots as:"))
+        layout.addWidget(self.view_combo)
+
         self.refresh_btn = QPushButton("Refresh Map")
-        self.refresh_btn.clicked.connect(self.update_map)
+        self.refresh_btn.clicked.connect(self.refresh)
         layout.addWidget(self.refresh_btn)
 
+        self.live_check = QCheckBox("Live RBN spots")
+        self.live_check.toggled.connect(self.toggle_live)
+        layout.addWidget(self.live_check)
+
+        self.predict_check = QCheckBox("Predicted band openings from my QTH")
+        self.predict_check.toggled.connect(lambda _: self.update_prediction())
+        layout.addWidget(self.predict_check)
+
+        self.grayline_check = QCheckBox("Grayline (day/night terminator)")
+        self.grayline_check.toggled.connect(lambda _: self.update_grayline())
+        layout.addWidget(self.grayline_check)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
         self.indices_label = QLabel()
         self.indices_label.setWordWrap(True)
         layout.addWidget(self.indices_label)
@@ -46,18 +231,229 @@ class PropagationMapDialog(QDialog):
         self.back_btn.clicked.connect(self.close)
         layout.addWidget(self.back_btn)
 
-        self.webview = QWebEngineView()
+        self.webview = webprofile.use_profile(QWebEngineView())
+        self.webview.loadFinished.connect(self.on_map_loaded)
         layout.addWidget(self.webview, stretch=1)
 
         self.setLayout(layout)
 
-        # Detect dark mode from parent if possible
-        dark_mode = False
-        if parent and hasattr(parent, "prefs"):
-            dark_mode = parent.prefs.get("dark_mode", False)
-        self.apply_style(dark_mode)
-        self.update_map()
+        self.sync_prefs()
+
+        # Live feed: the cluster thread queues spots, a timer moves them to the map
+        self.resolver = getattr(getattr(parent, "logbook", None), "resolver", None)
+        self.live = SpotStore()
+        self.live_queue = deque()
+        self.live_messages = deque()
+        self.skimmers = {}  # spotter -> (lat, lon) learned from the RBN spot feed
+        self.client = None
+        self._map_ready = False
+        self.live_timer = QTimer(self)
+        self.live_timer.timeout.connect(self.drain_live)
+        self._prediction = None
+        self.prediction_timer = QTimer(self)
+        self.prediction_timer.timeout.connect(self.update_prediction)
+        self._grayline = None
+        self.grayline_timer = QTimer(self)
+        self.grayline_timer.timeout.connect(self.update_grayline)
+
+        # Show what we already have, then fetch fresh data in the background
+        self.fetcher = Fetcher(self)
+        self.fetcher.done.connect(self.on_fetched)
+        self.fetcher.failed.connect(self.on_fetch_failed)
+        self.band_combo.currentTextChanged.connect(lambda _: (self.update_map(), self.push_spots(), self.update_prediction()))
+        self.view_combo.currentTextChanged.connect(lambda _: self.update_map())
+        load_cached()
+        if "spots" in _last:
+            self.skimmers = _last["spots"].spotter_positions()
+        self.webview.setHtml(map_page(), QUrl(MAP_BASE_URL))
         self.update_indices_panel()
+        self.refresh()
+        self._opened = False
+
+    def sync_prefs(self):
+        # The main window replaces its prefs dict when preferences are saved
+        parent = self.parent()
+        self.prefs = parent.prefs if parent and hasattr(parent, "prefs") else {}
+        self.apply_style(self.prefs.get("dark_mode", False))
+
+    def showEvent(self, event):
+        # The main window keeps this dialog and shows it again: the page stays
+        # loaded, so only the data is refreshed
+        super().showEvent(event)
+        if self._opened:
+            self.sync_prefs()
+            self.refresh()
+            self.update_prediction()
+            self.update_grayline()
+        self._opened = True
+
+    def refresh(self):
+        self.fetcher.submit("spots", fetch_spots)
+        self.fetcher.submit("indices", fetch_indices)
+        self.refresh_btn.setEnabled(False)
+        self.status_label.setText("Fetching propagation data...")
+
+    def on_fetched(self, key, result):
+        _last[key] = result
+        if key == "spots":
+            self.skimmers = result.spotter_positions()
+            self.update_map()
+        else:
+            solar_history().add(result)
+            self.update_indices_panel()
+            self.update_prediction()
+        self._fetch_finished()
+
+    def on_fetch_failed(self, key, message):
+        self._fetch_finished()
+        if key == "indices":
+            self.indices_label.setText(f"<span style='color:red'>Error fetching indices: {message}</span>")
+            return
+        # Use parent's dark mode if available
+        dark_mode = False
+        if self.parent() and hasattr(self.parent(), "prefs"):
+            dark_mode = self.parent().prefs.get("dark_mode", False)
+        if dark_mode:
+            show_dark_messagebox(self, "Propagation Map Error", f"Could not fetch propagation data:\n{message}", QMessageBox.Critical)
+        else:
+            QMessageBox.critical(self, "Propagation Map Error", f"Could not fetch propagation data:\n{message}")
+
+    def _fetch_finished(self):
+        if not (self.fetcher.busy("spots") or self.fetcher.busy("indices")):
+            self.refresh_btn.setEnabled(True)
+            self.status_label.clear()
+
+    def toggle_live(self, checked):
+        if not checked:
+            self.stop_live()
+            return
+        call = self.prefs.get("station_call", "")
+        if not call:
+            self.status_label.setText("Set your callsign in Preferences to log in to the spot cluster.")
+        elif self.resolver is None and not self.skimmers:
+            self.status_label.setText("Live spots need the country file (cty.dat) to place the spotters.")
+        else:
+            self.client = ClusterClient(
+                call, self.prefs.get("cluster_host", CLUSTER_HOST), self.prefs.get("cluster_port", CLUSTER_PORT),
+                on_spot=self.live_queue.append, on_status=self.live_messages.append,
+            )
+            self.client.start()
+            self.live_timer.start(LIVE_PUSH_MS)
+            self.status_label.setText("Connecting to the spot cluster...")
+            return
+        self.live_check.setChecked(False)
+
+    def stop_live(self):
+        if self.client is not None:
+            self.client.stop()
+            self.client = None
+        self.live_timer.stop()
+
+    def drain_live(self):
+        """Move queued spots onto the map and drop the expired ones, one JavaScript call each."""
+        while self.live_messages:
+            self.status_label.setText(self.live_messages.popleft())
+        band = self.band_combo.currentText()
+        added = []
+        while self.live_queue:
+            spot = self.live_queue.popleft()
+            where = self.locate_spotter(spot)
+            if where is None:
+                continue
+            seq = self.live.add(spot._replace(lat=where[0], lon=where[1]))
+            if spot.band == band:
+                added.append(seq)
+        expired = list(self.live.expire(time.time()))
+        if expired:
+            self.run_js(f"removeSpots({json.dumps(expired)})")
+        if added:
+            self.run_js(f"addSpots({json.dumps(self.live.rows(added))})")
+
+    def locate_spotter(self, spot):
+        """(lat, lon) of a skimmer: its grid, else its RBN position, else its DXCC entity."""
+        if spot.grid:
+            (lat,), (lon,) = from_locators([spot.grid])
+            if not np.isnan(lat):
+                return float(lat), float(lon)
+        if spot.spotter in self.skimmers:
+            return self.skimmers[spot.spotter]
+        entity = self.resolver.resolve(spot.spotter) if self.resolver is not None else None
+        return None if entity is None else (entity.lat, entity.lon)
+
+    def push_spots(self):
+        """Redraw the live markers: the newest live spots of the band still inside the window."""
+        seqs = self.live.select(self.band_combo.currentText(), since=time.time() - self.live.window)
+        self.run_js(f"setLiveSpots({json.dumps(self.live.rows(seqs[-MAX_MARKERS:]))})")
+
+    def run_js(self, script):
+        # Calls made before the page loads are replayed by on_map_loaded
+        if self._map_ready:
+            self.webview.page().runJavaScript(script)
+
+    def on_map_loaded(self, ok):
+        self._map_ready = ok
+        if ok:
+            self.update_map()
+            self.push_spots()
+            self._prediction = None
+            self.update_prediction()
+            self._grayline = None
+            self.update_grayline()
+
+    def update_prediction(self):
+        """Overlay where the selected band is predicted open from the QTH this hour."""
+        if not self.predict_check.isChecked():
+            self.prediction_timer.stop()
+            if self._prediction is not None:
+                self._prediction = None
+                self.run_js("setPrediction(null)")
+            return
+        qth = self.prefs.get("qth_locator", "")
+        indices = _last.get("indices") or {}
+        if not is_locator(qth):
+            self.status_label.setText("Set your QTH locator in Preferences to predict band openings.")
+            self.predict_check.setChecked(False)
+            return
+        try:
+            sfi, k = float(indices.get("solarflux")), float(indices.get("kindex"))
+        except (TypeError, ValueError):
+            self.status_label.setText("Band openings need the solar indices; waiting for them to load.")
+            return
+        (lat,), (lon,) = from_locators([qth])
+        prediction = predict(lat, lon, sfi, k, self.band_combo.currentText(), time.time())
+        self.prediction_timer.start(PREDICTION_REFRESH_MS)
+        if prediction is not self._prediction:
+            self._prediction = prediction
+            self.run_js(f"setPrediction({json.dumps(openings_geojson(prediction))})")
+
+    def update_grayline(self):
+        """Move the grayline overlay to the current minute, one layer update when it changed."""
+        if not self.grayline_check.isChecked():
+            self.grayline_timer.stop()
+            if self._grayline is not None:
+                self._grayline = None
+                self.run_js("setGrayline(null)")
+            return
+        if not self.grayline_timer.isActive():
+            self.grayline_timer.start(GRAYLINE_REFRESH_MS)
+        data = grayline_geojson(time.time())
+        if data is not self._grayline:
+            self._grayline = data
+            self.run_js(f"setGrayline({json.dumps(data)})")
+
+    def done(self, result):
+        self.fetcher.cancel()
+        self.live_check.setChecked(False)
+        self.prediction_timer.stop()
+        self.grayline_timer.stop()
+        super().done(result)
+
+    def closeEvent(self, event):
+        self.fetcher.cancel()
+        self.live_check.setChecked(False)
+        self.prediction_timer.stop()
+        self.grayline_timer.stop()
+        super().closeEvent(event)
 
     def apply_style(self, dark_mode):
         if dark_mode:
@@ -105,62 +501,30 @@ class PropagationMapDialog(QDialog):
             """)
 
     def update_map(self):
+        """Send the last fetched spots for the selected band to the loaded page.
+
+        Spots are drawn as one aggregate layer (heatmap or grid squares) plus
+        a cluster layer of the newest spots that only splits into single
+        markers when zoomed in. Only this data crosses to the page; the map,
+        tiles and scripts stay loaded across band switches and refreshes.
+        """
         band = self.band_combo.currentText()
-        url = "https://reversebeacon.net/spots.php?format=json"
-        try:
-            r = requests.get(url, timeout=20)
-            if r.status_code != 200 or not r.text.strip():
-                raise Exception(f"HTTP {r.status_code} or empty response")
-            data = r.json()
-            spots = []
-            for spot in data.get("spots", []):
-                if spot.get("band") != band:
-                    continue
-                rx_lat = spot.get("lat")
-                rx_lon = spot.get("lon")
-                rx_call = spot.get("decall", "Unknown")
-                tx_call = spot.get("dxcall", "Unknown")
-                if rx_lat is not None and rx_lon is not None:
-                    spots.append((rx_lat, rx_lon, rx_call, tx_call))
-        except Exception as e:
-            # Use parent's dark mode if available
-            dark_mode = False
-            if self.parent() and hasattr(self.parent(), "prefs"):
-                dark_mode = self.parent().prefs.get("dark_mode", False)
-            if dark_mode:
-                show_dark_messagebox(self, "Propagation Map Error", f"Could not fetch propagation data:\n{e}", QMessageBox.Critical)
+        store = _last.get("spots")
+        seqs = store.select(band) if store is not None else []
+        data = {"rows": []}
+        if len(seqs):
+            lat, lon = store.positions(seqs)
+            if self.view_combo.currentText() == "Grid squares":
+                data["squares"] = grid_geojson(lat, lon)
             else:
-                QMessageBox.critical(self, "Propagation Map Error", f"Could not fetch propagation data:\n{e}")
-            spots = []
-        m = folium.Map(location=[20, 0], zoom_start=2, tiles="CartoDB positron")
-        if not spots:
-            folium.Marker(location=[20, 0], popup="No propagation data available.").add_to(m)
-        for rx_lat, rx_lon, rx_call, tx_call in spots:
-            folium.CircleMarker(
-                location=[rx_lat, rx_lon],
-                radius=4,
-                popup=f"RX: {rx_call}<br>Heard: {tx_call}",
-                color="blue",
-                fill=True,
-                fill_opacity=0.7
-            ).add_to(m)
-        tmp = tempfile.NamedTemporaryFile(suffix=".html", delete=False)
-        m.save(tmp.name)
-        self.webview.setUrl(QUrl.fromLocalFile(tmp.name))
-
-    def fetch_propagation_indices(self):
-        url = "https://www.hamqsl.com/solarjson.php"
-        try:
-            r = requests.get(url, timeout=10)
-            data = r.json().get("solar", {})
-            return data
-        except Exception as e:
-            return {"error": str(e)}
+                data["heat"] = heat_points(lat, lon)
+            data["rows"] = store.rows(seqs[-MAX_MARKERS:])
+        self.run_js(f"setSpots({json.dumps(data)})")
 
     def update_indices_panel(self):
-        data = self.fetch_propagation_indices()
-        if "error" in data:
-            self.indices_label.setText(f"<span style='color:red'>Error fetching indices: {data['error']}</span>")
+        data = _last.get("indices")
+        if data is None:
+            self.indices_label.setText("Loading solar indices...")
             return
         html = (
             f"<b>Updated:</b> {data.get('updated','')}<br>"
@@ -173,11 +537,29 @@ class PropagationMapDialog(QDialog):
             f"<b>Mag Field:</b> {data.get('magneticfield','')} nT<br>"
             f"<b>Signal/Noise:</b> {data.get('signalnoise','')}"
         )
-        self.indices_label.setText(html)
+        self.indices_label.setText(html + self.history_html())
+
+    def history_html(self):
+        """Sparklines of daily SFI and hourly K from the local history rollups."""
+        history = solar_history()
+        lines = []
+        for label, field, resolution, count, stat in (
+            (f"SFI, {HISTORY_DAYS} days", "SFI", "day", HISTORY_DAYS, "mean"),
+            (f"K, {HISTORY_HOURS} hours", "K", "hour", HISTORY_HOURS, "max"),
+        ):
+            lows, highs, means = history.series(field, resolution, count)
+            line = sparkline(highs if stat == "max" else means)
+            if line.strip():
+                lines.append(
+                    f"<b>{label}:</b> <span style='font-family:monospace'>{line}</span> "
+                    f"{np.nanmin(lows):g}&ndash;{np.nanmax(highs):g}"
+                )
+        return "".join("<br>" + line for line in lines)
 
 class ZoomableWebView(QWebEngineView):
     def __init__(self, url):
         super().__init__()
+        webprofile.use_profile(self)
         self.setUrl(QUrl(url))
         self.zoom = 1.0
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -223,15 +605,8 @@ class PropagationInfoDialog(QDialog):
         widgets = []
         if parent and hasattr(parent, "prefs"):
             widgets = parent.prefs.get("solar_widgets", [])
-        if not widgets:
-            widgets = ["https://www.hamqsl.com/solar101vhfper.php"]
-
         self.webviews = []
-        for url in widgets[:3]:
-            webview = ZoomableWebView(url)
-            webview.setMinimumHeight(260)  # Tiny bit smaller
-            layout.addWidget(webview, stretch=2)
-            self.webviews.append(webview)
+        self.set_widgets(widgets)
 
         # Button row (side by side, slightly bigger)
         btn_row = QHBoxLayout()
@@ -253,6 +628,35 @@ class PropagationInfoDialog(QDialog):
         if parent and hasattr(parent, "prefs"):
             dark_mode = parent.prefs.get("dark_mode", False)
         self.apply_style(dark_mode)
+        self._opened = False
+
+    def set_widgets(self, urls):
+        """Show up to 3 widget URLs, reusing the existing views."""
+        urls = urls[:3] or ["https://www.hamqsl.com/solar101vhfper.php"]
+        layout = self.layout()
+        while len(self.webviews) > len(urls):
+            webview = self.webviews.pop()
+            layout.removeWidget(webview)
+            webview.deleteLater()
+        for i, url in enumerate(urls):
+            if i < len(self.webviews):
+                if self.webviews[i].url() != QUrl(url):
+                    self.webviews[i].setUrl(QUrl(url))
+                continue
+            webview = ZoomableWebView(url)
+            webview.setMinimumHeight(260)  # Tiny bit smaller
+            layout.insertWidget(i, webview, stretch=2)
+            self.webviews.append(webview)
+
+    def showEvent(self, event):
+        # Shown again by the main window: reload the kept views instead of new ones
+        super().showEvent(event)
+        parent = self.parent()
+        if self._opened:
+            self.apply_style(parent.prefs.get("dark_mode", False) if parent and hasattr(parent, "prefs") else False)
+            for webview in self.webviews:
+                webview.reload()
+        self._opened = True
 
     def apply_style(self, dark_mode):
         if dark_mode:
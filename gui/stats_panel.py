@@ -0,0 +1,66 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtCore import Qt, QTimer
+from logbook.stats import RATE_WINDOWS
+
+REFRESH_MS = 1000
+
+
+class StatsPanel(QWidget):
+    """Live QSO statistics over a LogStats.
+
+    The counters are kept up to date by the store, so a refresh only reads
+    them; the tables are redrawn when the stats version changes and the
+    rates every tick, as they move with the clock.
+    """
+
+    def __init__(self, stats, grids=None, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.grids = grids
+        self._version = None
+        layout = QVBoxLayout(self)
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+        tables = QHBoxLayout()
+        self.band_table = self._table("Band")
+        self.hour_table = self._table("Hour (UTC)")
+        self.entity_table = self._table("Entity")
+        for table in (self.band_table, self.hour_table, self.entity_table):
+            tables.addWidget(table)
+        layout.addLayout(tables)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_MS)
+        self.refresh()
+
+    def _table(self, title):
+        table = QTableWidget(0, 2)
+        table.setHorizontalHeaderLabels([title, "QSOs"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        return table
+
+    def _fill(self, table, items):
+        table.setRowCount(len(items))
+        for row, (key, count) in enumerate(items):
+            table.setItem(row, 0, QTableWidgetItem(str(key) if key != "" else "?"))
+            count_item = QTableWidgetItem(str(count))
+            count_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            table.setItem(row, 1, count_item)
+
+    def refresh(self):
+        stats = self.stats
+        rates = "   ".join(f"Last {m} min: {stats.rate(m)}" for m in RATE_WINDOWS)
+        grids = f"Worked grids: {len(self.grids)}   " if self.grids is not None else ""
+        self.summary.setText(f"QSOs: {stats.total}   Unique calls: {stats.unique_calls}   {grids}{rates}")
+        if stats.version == self._version or not self.isVisible():
+            return
+        self._version = stats.version
+        self._fill(self.band_table, stats.bands.most_common())
+        self._fill(self.hour_table, [(f"{hour:02d}:00", n) for hour, n in sorted(stats.hours.items())])
+        self._fill(self.entity_table, stats.entities.most_common())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
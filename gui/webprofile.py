@@ -0,0 +1,50 @@
+"""One QtWebEngine profile for every web view in the app.
+
+All views share a named profile with a persistent disk HTTP cache, so
+Leaflet, map tiles and the solar widgets load from disk after the first
+run. ``prewarm()`` loads a page in a hidden view once the main window is
+idle, so Chromium and its renderer are already running when the first
+propagation dialog opens.
+"""
+import os
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEnginePage, QWebEngineView
+
+PROFILE_NAME = "talasnik"
+CACHE_DIR = "talasnik_web_cache"
+CACHE_SIZE = 200 * 1024 * 1024  # bytes
+_profile = None
+_warm = None
+
+
+def profile():
+    global _profile
+    if _profile is None:
+        _profile = QWebEngineProfile(PROFILE_NAME, QApplication.instance())
+        _profile.setCachePath(os.path.abspath(os.path.join(CACHE_DIR, "cache")))
+        _profile.setPersistentStoragePath(os.path.abspath(os.path.join(CACHE_DIR, "storage")))
+        _profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        _profile.setHttpCacheMaximumSize(CACHE_SIZE)
+    return _profile
+
+
+def use_profile(view):
+    """Give ``view`` a page on the shared profile; returns the view."""
+    view.setPage(QWebEnginePage(profile(), view))
+    return view
+
+
+def prewarm(html, base_url):
+    """Load ``html`` in a hidden view, starting the engine and filling the cache."""
+    global _warm
+    if _warm is None:
+        _warm = use_profile(QWebEngineView())
+        _warm.setHtml(html, base_url)
+
+
+def shutdown():
+    """Drop the hidden view; pages must go before the profile they use."""
+    global _warm
+    if _warm is not None:
+        _warm.deleteLater()
+        _warm = None
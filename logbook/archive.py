@@ -0,0 +1,221 @@
+"""Memory-mapped columnar archive format for large, finished logs.
+
+An archive is one file: a magic line, a JSON header, then 64-byte aligned
+raw arrays. Timestamps, frequencies and band codes are stored as NumPy
+arrays and every text column is dictionary encoded: an int32 code per row
+into a sorted dictionary kept as UTF-8 bytes plus offsets. Rows are stored
+in time order.
+
+Opening maps the file and reads only the header; a cell costs two array
+reads and one decode, so only the pages actually displayed or queried are
+ever loaded. Because the dictionaries are sorted, codes sort like their
+strings and a prefix query is a bisect over the dictionary followed by one
+vectorized range test over the codes.
+"""
+import json
+import struct
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+from .fields import BANDS, NO_BAND, normalize_callsign
+from .search import FIELDS, WORD_COLUMNS, tokenize
+from .typed import NO_TIME
+
+MAGIC = b"TALASNIK-ARCHIVE\n"
+VERSION = 1
+ALIGN = 64
+ARCHIVE_FILTER = "Talasnik Archive (*.tla)"
+
+
+class Dictionary:
+    """Sorted strings stored as one UTF-8 blob plus offsets, decoded on access."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+        self._words = None
+        self._upper = None  # every string uppercased, for substring queries
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return bytes(self.blob[self.offsets[code]:self.offsets[code + 1]]).decode("utf-8")
+
+    def prefix_range(self, prefix):
+        """Codes [lo, hi) of the strings starting with ``prefix``."""
+        lo = bisect_left(self, prefix, 0, len(self))
+        hi = bisect_left(self, prefix + "\U0010ffff", lo, len(self))
+        return lo, hi
+
+    def substring_codes(self, text):
+        """Codes of the strings containing ``text``, ignoring case."""
+        if self._upper is None:
+            self._upper = np.char.upper(np.array([self[code] for code in range(len(self))], dtype=str))
+        return np.flatnonzero(np.char.find(self._upper, text.upper()) >= 0)
+
+    def word_index(self):
+        """(words, codes): every lowercase word of every string, sorted, with its string's code."""
+        if self._words is None:
+            pairs = sorted((word, code) for code in range(len(self)) for word in tokenize(self[code]))
+            words = np.array([word for word, _ in pairs], dtype=str)
+            self._words = words, np.array([code for _, code in pairs], dtype=np.int32)
+        return self._words
+
+    def word_codes(self, prefix):
+        """Codes of the strings with a word starting with ``prefix`` (lowercase)."""
+        words, codes = self.word_index()
+        lo = np.searchsorted(words, prefix, "left")
+        hi = np.searchsorted(words, prefix + "\U0010ffff", "left")
+        return np.unique(codes[lo:hi])
+
+
+def _encode_strings(values):
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+    encoded = [value.encode("utf-8") for value in uniques]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return codes.astype(np.int32), offsets, blob
+
+
+def write_archive(path, store):
+    """Write the non-blank rows of a LogStore to an archive, in time order."""
+    rids = np.array([rid for rid in store.order if not store.is_blank(rid)], dtype=np.int64)
+    order = rids[np.argsort(store.typed.ts[rids], kind="stable")]
+    arrays = {
+        "ts": store.typed.ts[order],
+        "freq": store.typed.freq[order],
+        "band": store.typed.band[order],
+    }
+    snap = store.snapshot()
+    for col in store.columns:
+        values = snap["data"][col]
+        codes, offsets, blob = _encode_strings([values[rid] for rid in order])
+        arrays[f"{col}:codes"] = codes
+        arrays[f"{col}:offsets"] = offsets
+        arrays[f"{col}:bytes"] = blob
+
+    header = {"version": VERSION, "rows": len(order), "columns": list(store.columns), "arrays": {}}
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": len(array), "offset": offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    text = json.dumps(header).encode("utf-8")
+    start = -(-(len(MAGIC) + 8 + len(text)) // ALIGN) * ALIGN
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(text)) + text)
+        for name, array in arrays.items():
+            f.seek(start + header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(start + offset)
+    return len(order)
+
+
+class LogArchive:
+    """Read-only, memory-mapped view of an archive file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a Talasnik archive: {path}")
+            size = struct.unpack("<Q", f.read(8))[0]
+            header = json.loads(f.read(size))
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported archive version {header['version']}")
+        start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+        self.columns = header["columns"]
+        self.size = header["rows"]
+        self._arrays = {}
+        for name, spec in header["arrays"].items():
+            if spec["shape"]:
+                self._arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r",
+                                               offset=start + spec["offset"], shape=(spec["shape"],))
+            else:
+                self._arrays[name] = np.zeros(0, dtype=spec["dtype"])
+        self.ts = self._arrays["ts"]
+        self.freq = self._arrays["freq"]
+        self.band = self._arrays["band"]
+        self.codes = {col: self._arrays[f"{col}:codes"] for col in self.columns}
+        self.dictionaries = {
+            col: Dictionary(self._arrays[f"{col}:offsets"], self._arrays[f"{col}:bytes"]) for col in self.columns
+        }
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        """Drop every array; the file is unmapped once no view of it is left."""
+        self.ts = self.freq = self.band = None
+        self.codes = self.dictionaries = None
+        self._arrays = {}
+
+    def get(self, row, column):
+        if self.codes is None:
+            raise ValueError(f"Archive is closed: {self.path}")
+        if column not in self.codes:
+            return ""
+        return self.dictionaries[column][self.codes[column][row]]
+
+    def record(self, row):
+        return {col: self.get(row, col) for col in self.columns}
+
+    def time_range(self, start, end):
+        """Rows with start <= timestamp < end (epoch seconds); rows are in time order."""
+        return np.arange(np.searchsorted(self.ts, start), np.searchsorted(self.ts, end))
+
+    def prefix_rows(self, column, prefix):
+        """Rows whose ``column`` starts with ``prefix``."""
+        if column not in self.codes:
+            return np.zeros(0, dtype=np.int64)
+        lo, hi = self.dictionaries[column].prefix_range(prefix)
+        codes = self.codes[column]
+        return np.flatnonzero((codes >= lo) & (codes < hi))
+
+    def substring_rows(self, column, text):
+        """Rows whose ``column`` contains ``text``."""
+        if column not in self.codes:
+            return np.zeros(0, dtype=np.int64)
+        matching = self.dictionaries[column].substring_codes(text)
+        return np.flatnonzero(np.isin(self.codes[column], matching))
+
+    def word_rows(self, column, prefix):
+        """Rows with a word in ``column`` starting with ``prefix`` (lowercase)."""
+        if column not in self.codes:
+            return np.zeros(0, dtype=np.int64)
+        matching = self.dictionaries[column].word_codes(prefix)
+        return np.flatnonzero(np.isin(self.codes[column], matching))
+
+    def query(self, text):
+        """Rows matching a search query, in the syntax of logbook.search.SearchIndex."""
+        result = None
+        for term in str(text or "").split():
+            field, _, value = term.rpartition(":")
+            if not value:
+                continue
+            column = FIELDS.get(field.lower())
+            if column == "Callsign":
+                rows = self.prefix_rows("Callsign", normalize_callsign(value))
+            elif column in WORD_COLUMNS:
+                rows = self.word_rows(column, value.lower())
+            else:
+                parts = [self.substring_rows("Callsign", normalize_callsign(value))]
+                parts += [self.word_rows(col, value.lower()) for col in WORD_COLUMNS]
+                rows = np.unique(np.concatenate(parts))
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return np.arange(self.size) if result is None else result
+
+    def sort_key(self, column, rows, descending=False):
+        """Sort key array for ``rows`` of a column; missing values sort last either way."""
+        if column in ("Date", "Time"):
+            key = self.ts[rows]
+            return np.where(key == NO_TIME, NO_TIME, -key) if descending else key
+        if column == "Freq":
+            key = self.freq[rows]
+            return -key if descending else key
+        if column == "Band":
+            band = self.band[rows].astype(np.int16)
+            return np.where(band == NO_BAND, len(BANDS), -band if descending else band)
+        codes = self.codes[column][rows].astype(np.int64)
+        return -codes if descending else codes
@@ -0,0 +1,124 @@
+"""Headless logbook operations behind the ``log-*`` CLI modes.
+
+Everything here works on the same journal the GUI keeps its log in and
+never imports Qt. Row producers are generators, so the CLI can print or
+write results as they are found.
+"""
+from collections import namedtuple
+from .dupes import DupeIndex, row_band, unique_rows
+from .fields import BAND_CODES, normalize_band, normalize_callsign, parse_date, parse_time, qso_minutes
+from .io import read_chunks, write_log
+from .journal import Journal, JOURNAL_FILE
+from .store import COLUMNS, LogStore
+from .typed import NO_TIME
+from .validate import validate_frame
+
+ImportResult = namedtuple("ImportResult", "added duplicates rejected")
+
+
+def open_log(path=JOURNAL_FILE, read_only=False):
+    """Recover the log from its journal; further changes are journaled.
+
+    ``read_only`` replays the journal without locking or rewriting it, so
+    queries can run while the GUI has the log open. Returns (store,
+    journal); close the journal when done.
+    """
+    store = LogStore()
+    journal = Journal(path)
+    journal.recover(store, checkpoint=not read_only)
+    for col in COLUMNS:
+        store.add_column(col)
+    return store, journal
+
+
+def parse_when(text):
+    """Parse "YYYY-MM-DD" or "YYYY-MM-DD HH:MM" (UTC) into epoch seconds."""
+    days = parse_date(text)
+    if days is None:
+        raise ValueError(f"Invalid date: {text}")
+    rest = text.strip()[10:].lstrip("T ")
+    minutes = parse_time(rest) if rest else 0
+    if minutes is None:
+        raise ValueError(f"Invalid time: {text}")
+    return (days * 1440 + minutes) * 60
+
+
+def iter_qsos(store, call=None, band=None, since=None, until=None):
+    """Yield the rids of non-blank rows matching every given filter, in log order.
+
+    ``call`` is a callsign prefix, ``band`` a band label, ``since``/``until``
+    epoch seconds (``until`` exclusive).
+    """
+    prefix = normalize_callsign(call) if call else None
+    code = None
+    if band:
+        code = BAND_CODES.get(normalize_band(band))
+        if code is None:
+            raise ValueError(f"Unknown band: {band}")
+    ts = store.typed.ts
+    bands = store.typed.band
+    for rid in store.order:
+        if store.is_blank(rid):
+            continue
+        if prefix is not None and not normalize_callsign(store.get(rid, "Callsign")).startswith(prefix):
+            continue
+        if code is not None and bands[rid] != code:
+            continue
+        if since is not None or until is not None:
+            stamp = ts[rid]
+            if stamp == NO_TIME or (since is not None and stamp < since) or (until is not None and stamp >= until):
+                continue
+        yield rid
+
+
+def import_log(store, path, replace=False):
+    """Import a log file, dropping invalid rows and duplicate QSOs.
+
+    By default the QSOs are appended, skipping any that duplicate a QSO
+    already in the log; ``replace`` swaps the whole log like the GUI import.
+    """
+    rows, rejected = [], 0
+    for chunk in read_chunks(path):
+        valid, report = validate_frame(chunk)
+        rows += valid
+        rejected += report["Row"].nunique()
+        for col in chunk.columns.astype(str):
+            if col not in store.columns and not replace:
+                store.add_column(col)
+    unique = list(unique_rows(rows))
+    duplicates = len(rows) - len(unique)
+    if replace:
+        columns = list(dict.fromkeys(COLUMNS + [col for row in unique for col in row]))
+        store.reset(unique, columns=columns)
+        return ImportResult(len(unique), duplicates, rejected)
+    index = DupeIndex(store)
+    fresh = [
+        row for row in unique
+        if not index.matches(row.get("Callsign"), qso_minutes(row.get("Date"), row.get("Time")), row_band(row))
+    ]
+    store.remove_listener(index)
+    # New QSOs go after the last logged one, before the GUI's blank padding rows
+    pos = len(store.order)
+    while pos and store.is_blank(store.order[pos - 1]):
+        pos -= 1
+    store.insert_rows(pos, fresh)
+    return ImportResult(len(fresh), duplicates + len(unique) - len(fresh), rejected)
+
+
+def export_log(store, path, rids):
+    """Stream the given rows to a log file; returns the number written."""
+    columns = store.columns
+    return write_log(path, columns, (store.record(rid) for rid in rids))
+
+
+def find_duplicates(store):
+    """Rids of QSOs that duplicate an earlier QSO of the log, in log order."""
+    index = DupeIndex()
+    for rid in store.order:
+        call = store.get(rid, "Callsign")
+        minutes = qso_minutes(store.get(rid, "Date"), store.get(rid, "Time"))
+        band = store.typed.band[rid]
+        if index.matches(call, minutes, band):
+            yield rid
+        else:
+            index.add(rid, call, minutes, band)
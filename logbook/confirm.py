@@ -0,0 +1,155 @@
+"""Match the log against other stations' logs or a confirmations export.
+
+A QSO is confirmed by a record with the same callsign, band and mode
+(a blank band or mode matches anything) logged within ``window`` minutes.
+Undated QSOs on either side count as that time of day on day 0, the rule
+the store's typed timestamps use, so two undated records can still match.
+Callsigns are joined by hashing both sides into shared integer codes;
+each side is then sorted by (code, time), so the candidates for a QSO are
+one searchsorted window and the whole match runs as NumPy array passes.
+"""
+import numpy as np
+import pandas as pd
+from .fields import NO_BAND, band_codes, parse_dates, parse_freqs, parse_times, normalize_callsign
+from .io import read_chunks
+from .typed import NO_TIME
+from .validate import validate_frame
+
+CONFIRM_WINDOW = 15  # minutes
+KEY_SPAN = 1 << 27  # minutes, ~255 years: room for every epoch minute per callsign code
+STATUS_COLUMN = "QSL"
+CONFIRMED = "Y"
+UNCONFIRMED = "N"
+
+
+def _normalize_calls(calls):
+    codes, uniques = pd.factorize(pd.Series(calls, dtype=object).fillna(""))
+    normalized = np.array([normalize_callsign(call) for call in uniques] + [""], dtype=object)
+    return normalized[codes]
+
+
+def _modes(modes):
+    return pd.Series(modes, dtype=object).fillna("").astype(str).str.strip().str.upper().to_numpy(dtype=object)
+
+
+def match_qsos(ours, theirs, window=CONFIRM_WINDOW):
+    """For each of our QSOs, the index of the closest matching record of theirs, or -1.
+
+    ``ours`` and ``theirs`` are dicts of equal-length arrays: "call"
+    (normalized callsigns), "minutes" (epoch minutes, NaN if unknown),
+    "band" (band codes) and "mode" (uppercase text).
+    """
+    n = len(ours["call"])
+    result = np.full(n, -1, dtype=np.int64)
+    if not n or not len(theirs["call"]):
+        return result
+    # Hash join: one code per callsign shared by both sides
+    codes, _ = pd.factorize(np.concatenate([ours["call"], theirs["call"]]))
+    our_code, their_code = codes[:n], codes[n:]
+    their_ok = ~np.isnan(theirs["minutes"]) & (theirs["call"] != "")
+    their_idx = np.flatnonzero(their_ok)
+    their_key = their_code[their_idx] * KEY_SPAN + theirs["minutes"][their_idx].astype(np.int64)
+    order = np.argsort(their_key, kind="stable")
+    their_idx, their_key = their_idx[order], their_key[order]
+
+    our_ok = np.flatnonzero(~np.isnan(ours["minutes"]) & (ours["call"] != ""))
+    our_key = our_code[our_ok] * KEY_SPAN + ours["minutes"][our_ok].astype(np.int64)
+    lo = np.searchsorted(their_key, our_key - window, side="left")
+    hi = np.searchsorted(their_key, our_key + window, side="right")
+    counts = hi - lo
+    if not counts.sum():
+        return result
+
+    # Expand every (our QSO, candidate) pair, then filter by band and mode
+    pair_our = np.repeat(our_ok, counts)
+    starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+    pair_their = their_idx[np.arange(counts.sum()) + starts]
+    ob, tb = ours["band"][pair_our], theirs["band"][pair_their]
+    om, tm = ours["mode"][pair_our], theirs["mode"][pair_their]
+    ok = ((ob == tb) | (ob == NO_BAND) | (tb == NO_BAND)) & ((om == tm) | (om == "") | (tm == ""))
+    pair_our, pair_their = pair_our[ok], pair_their[ok]
+    if not len(pair_our):
+        return result
+
+    # Closest record in time wins
+    gap = np.abs(ours["minutes"][pair_our] - theirs["minutes"][pair_their])
+    best = np.lexsort((gap, pair_our))
+    first = np.ones(len(best), dtype=bool)
+    first[1:] = pair_our[best][1:] != pair_our[best][:-1]
+    result[pair_our[best][first]] = pair_their[best][first]
+    return result
+
+
+def store_columns(store, rids):
+    """Match arrays for the given rows of a LogStore."""
+    rids = np.asarray(rids, dtype=np.int64)
+    ts = store.typed.ts[rids]
+    return {
+        "call": _normalize_calls([store.get(rid, "Callsign") for rid in rids]),
+        "minutes": np.where(ts == NO_TIME, np.nan, ts // 60),
+        "band": store.typed.band[rids],
+        "mode": _modes([store.get(rid, "Mode") for rid in rids]),
+    }
+
+
+def read_records(paths, call_column="Callsign"):
+    """Match arrays for every valid record of the given log files.
+
+    ``call_column`` names the column holding the worked station's call; for
+    another station's own log that is its station callsign column.
+    """
+    parts = []
+    for path in paths:
+        for chunk in read_chunks(path):
+            rows, _ = validate_frame(chunk)
+            if not rows:
+                continue
+            df = pd.DataFrame(rows)
+            get = lambda col: df[col] if col in df else pd.Series([""] * len(df), dtype=object)
+            minutes = parse_times(get("Time"))
+            days = parse_dates(get("Date"))
+            parts.append({
+                "call": _normalize_calls(get(call_column)),
+                "minutes": np.nan_to_num(days) * 1440 + minutes,
+                "band": band_codes(get("Band"), parse_freqs(get("Freq"))),
+                "mode": _modes(get("Mode")),
+            })
+    if not parts:
+        return {"call": np.array([], dtype=object), "minutes": np.array([]),
+                "band": np.array([], dtype=np.int8), "mode": np.array([], dtype=object)}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def match_files(ours, paths, window=CONFIRM_WINDOW, call_column="Callsign"):
+    """match_qsos of ``ours`` against the records of the given log files.
+
+    Touches only the arrays it is given, so the GUI runs it on a worker
+    thread with a ``store_columns`` snapshot.
+    """
+    return match_qsos(ours, read_records(paths, call_column), window)
+
+
+def apply_matches(store, rids, matches):
+    """Write the statuses for ``match_files`` results; returns (confirmed, total).
+
+    The column and the statuses are written in one store transaction, so
+    they are journaled as one record and undone as a single step. Rows
+    removed since the snapshot was taken are skipped.
+    """
+    live = set(store.order)
+    pairs = [(rid, match) for rid, match in zip(rids, matches) if rid in live]
+    with store.transaction():
+        store.add_column(STATUS_COLUMN)
+        for rid, match in pairs:
+            store.set(rid, STATUS_COLUMN, CONFIRMED if match >= 0 else UNCONFIRMED)
+    return sum(1 for _, match in pairs if match >= 0), len(pairs)
+
+
+def confirm_log(store, paths, window=CONFIRM_WINDOW, call_column="Callsign"):
+    """Mark every QSO of the log confirmed or not in the status column.
+
+    Returns (confirmed, total).
+    """
+    rids = [rid for rid in store.order if store.get(rid, "Callsign")]
+    matches = match_files(store_columns(store, rids), paths, window, call_column)
+    return apply_matches(store, rids, matches)
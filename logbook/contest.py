@@ -0,0 +1,205 @@
+"""Contest mode: serial numbers, per-band dupes, running score and Cabrillo export.
+
+The score is kept by a LogStore listener that moves one QSO in or out of
+its counters per change, so logging QSO 3000 costs the same as QSO 1.
+A QSO scores one point unless it duplicates an earlier (call, band);
+multipliers are the distinct (band, entity) pairs, where the entity is the
+DXCC entity when a resolver is set and the callsign prefix otherwise.
+"""
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from .fields import BANDS, normalize_callsign
+from .typed import NO_TIME
+
+SENT_COLUMN = "Sent"
+RCVD_COLUMN = "Rcvd"
+CONTEST_COLUMNS = ("Callsign", "Band", "Freq", SENT_COLUMN)
+CONTEST_FILTER = "Cabrillo Files (*.log *.cbr)"
+PREFIX_RE = re.compile(r"^(?:[A-Z0-9]+/)?([A-Z0-9]*?\d+)")
+CABRILLO_MODES = {"CW": "CW", "SSB": "PH", "AM": "PH", "FM": "FM", "RTTY": "RY"}
+DEFAULT_RST = {"CW": "599", "RY": "599", "DG": "599"}
+
+
+def call_prefix(call):
+    """WPX style prefix: the callsign up to its last leading digit ("YU1ABC" -> "YU1")."""
+    call = normalize_callsign(call)
+    match = PREFIX_RE.match(call)
+    return match.group(1) if match else call
+
+
+class Contest:
+    """Score, multipliers, dupes and serials of a contest log, kept current as a store listener."""
+
+    def __init__(self, store, mycall="", name="", resolver=None, on_flag=None):
+        self.store = store
+        self.mycall = normalize_callsign(mycall)
+        self.name = name
+        self.resolver = resolver
+        self.on_flag = on_flag  # called with each rid whose dupe status may have changed
+        self.version = 0
+        store.add_listener(self)
+        self.on_reset()
+
+    def _clear(self):
+        self.keys = {}  # (call, band) -> rids in log order, the first one scores
+        self.mults = Counter()  # (band, entity) -> scoring QSOs
+        self.last_serial = 0
+        self._entries = {}  # rid -> (call, band, entity)
+
+    @property
+    def qsos(self):
+        return len(self._entries)
+
+    @property
+    def points(self):
+        return len(self.keys)
+
+    @property
+    def score(self):
+        return self.points * len(self.mults)
+
+    def entity(self, call):
+        if self.resolver is not None:
+            found = self.resolver.resolve(call)
+            if found is not None:
+                return found.name
+        return call_prefix(call)
+
+    def check(self, call, band):
+        """Status of a call about to be logged: "dupe", "new mult" or ""."""
+        call = normalize_callsign(call)
+        if (call, band) in self.keys:
+            return "dupe"
+        if (band, self.entity(call)) not in self.mults:
+            return "new mult"
+        return ""
+
+    def is_dupe(self, rid):
+        entry = self._entries.get(rid)
+        return entry is not None and self.keys[entry[:2]][0] != rid
+
+    def next_serial(self):
+        self.last_serial += 1
+        return self.last_serial
+
+    def band_of(self, rid):
+        code = int(self.store.typed.band[rid])
+        return BANDS[code][0] if code >= 0 else ""
+
+    def _add(self, rid):
+        call = normalize_callsign(self.store.get(rid, "Callsign"))
+        serial = str(self.store.get(rid, SENT_COLUMN)).strip()
+        if serial.isdigit():
+            self.last_serial = max(self.last_serial, int(serial))
+        if not call:
+            return
+        band = self.band_of(rid)
+        entity = self.entity(call)
+        self._entries[rid] = (call, band, entity)
+        rids = self.keys.setdefault((call, band), [])
+        if not rids:
+            self.mults[(band, entity)] += 1
+        rids.append(rid)
+        if len(rids) > 1:
+            # Only dupes pay for this: keep log order so the earliest QSO scores
+            positions = self.store.positions()
+            rids.sort(key=lambda r: positions.get(r, len(positions)))
+            self._flag(rids)
+        self.version += 1
+
+    def _discard(self, rid):
+        entry = self._entries.pop(rid, None)
+        if entry is None:
+            return
+        call, band, entity = entry
+        rids = self.keys[(call, band)]
+        rids.remove(rid)
+        self._flag(rids)
+        if not rids:
+            del self.keys[(call, band)]
+            self.mults[(band, entity)] -= 1
+            if not self.mults[(band, entity)]:
+                del self.mults[(band, entity)]
+        self.version += 1
+
+    def _flag(self, rids):
+        if self.on_flag is not None:
+            for rid in rids:
+                self.on_flag(rid)
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._add(rid)
+
+    def on_update(self, rid, column, old):
+        if column in CONTEST_COLUMNS:
+            self._discard(rid)
+            self._add(rid)
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self._discard(rid)
+
+    def on_restore(self, rids, positions):
+        self.on_insert(None, rids)
+
+    def on_reorder(self, keys):
+        positions = self.store.positions()
+        for rids in self.keys.values():
+            if len(rids) > 1:
+                rids.sort(key=positions.__getitem__)
+        self.version += 1
+
+    def on_reset(self):
+        self._clear()
+        for rid in self.store.order:
+            self._add(rid)
+        self.version += 1
+
+
+def _cabrillo_freq(store, rid):
+    freq = store.typed.freq[rid]
+    if freq == freq and freq > 0:
+        return f"{freq * 1000:.0f}" if freq < 30 else f"{freq:.0f}"
+    code = int(store.typed.band[rid])
+    if code < 0:
+        return "0"
+    lower = BANDS[code][1]
+    return f"{lower * 1000:.0f}" if lower < 30 else f"{lower:.0f}"
+
+
+def cabrillo_lines(contest, operator_class="SINGLE-OP"):
+    """Yield the lines of a Cabrillo 3.0 log, one QSO at a time."""
+    store = contest.store
+    yield "START-OF-LOG: 3.0"
+    yield f"CALLSIGN: {contest.mycall}"
+    yield f"CONTEST: {contest.name}"
+    yield f"CATEGORY-OPERATOR: {operator_class}"
+    yield f"CLAIMED-SCORE: {contest.score}"
+    yield "CREATED-BY: Talasnik"
+    for rid in store.order:
+        call = normalize_callsign(store.get(rid, "Callsign"))
+        if not call:
+            continue
+        ts = store.typed.ts[rid]
+        when = datetime.fromtimestamp(int(ts), timezone.utc).strftime("%Y-%m-%d %H%M") if ts != NO_TIME else "0000-00-00 0000"
+        logged_mode = str(store.get(rid, "Mode")).strip().upper()
+        mode = CABRILLO_MODES.get(logged_mode, "DG" if logged_mode else "PH")
+        rst = DEFAULT_RST.get(mode, "59")
+        sent = str(store.get(rid, SENT_COLUMN)).strip().zfill(3)
+        rcvd = str(store.get(rid, RCVD_COLUMN)).strip()  # the received serial; the RST is assumed
+        yield f"QSO: {_cabrillo_freq(store, rid):>5} {mode} {when} {contest.mycall:<13} {rst} {sent:<6} {call:<13} {rst} {rcvd:<6}".rstrip()
+    yield "END-OF-LOG:"
+
+
+def write_cabrillo(path, contest, operator_class="SINGLE-OP"):
+    """Stream the contest log to a Cabrillo file; returns the number of QSOs written."""
+    count = 0
+    with open(path, "w", encoding="ascii", errors="replace", newline="\r\n") as f:
+        for line in cabrillo_lines(contest, operator_class):
+            count += line.startswith("QSO:")
+            f.write(line + "\n")
+    return count
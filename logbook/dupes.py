@@ -0,0 +1,156 @@
+"""Real-time duplicate QSO detection."""
+from .fields import normalize_callsign, band_code, parse_freq, qso_minutes
+
+DUPE_WINDOW = 10  # minutes
+DAY_MINUTES = 1440
+KEY_COLUMNS = ("Callsign", "Date", "Time", "Band", "Freq")
+
+
+def row_band(row):
+    """Band code of a row (dict), from its Band or else its Freq, like the store's typed band."""
+    return band_code(row.get("Band"), parse_freq(row.get("Freq", "")))
+
+
+def _band(band):
+    return band_code(band) if isinstance(band, str) or band is None else int(band)
+
+
+class DupeIndex:
+    """Hash index over normalized (callsign, band code, time bucket) keys.
+
+    Times are bucketed by the dupe window, so finding the QSOs within the
+    window of an entry only looks at three buckets: O(1) per QSO however large
+    the log grows. QSOs without a callsign or a valid time are not indexed.
+    Undated QSOs carry minutes of the day, so their window wraps at midnight.
+    Bands are band codes (a label is converted), so a QSO with only a
+    frequency is on the band that frequency falls in.
+
+    When ``store`` is given the index registers itself as a store listener and
+    follows inserts, edits and deletes. ``on_flag`` is called with the rid of
+    every QSO whose dupe status changed.
+    """
+
+    def __init__(self, store=None, window=DUPE_WINDOW, on_flag=None):
+        self.window = window
+        self.on_flag = on_flag
+        self.store = store
+        self._buckets = {}   # (call, band, bucket) -> {rid: minutes}
+        self._entries = {}   # rid -> (call, band, bucket)
+        self._partners = {}  # rid -> rids it duplicates
+        if store is not None:
+            store.add_listener(self)
+            self.on_reset()
+
+    def __len__(self):
+        return len(self._partners)
+
+    def matches(self, call, minutes, band, exclude=None):
+        """Return the rids of indexed QSOs within the window of the given one."""
+        call = normalize_callsign(call)
+        band = _band(band)
+        if not call or minutes is None:
+            return set()
+        found = set()
+        # An undated 23:58 and 00:03 are five minutes apart, not a day
+        shifts = (0, -DAY_MINUTES, DAY_MINUTES) if minutes < DAY_MINUTES else (0,)
+        for shifted in (minutes + shift for shift in shifts):
+            bucket = shifted // self.window
+            for b in (bucket - 1, bucket, bucket + 1):
+                for rid, logged in self._buckets.get((call, band, b), {}).items():
+                    if rid != exclude and abs(logged - shifted) <= self.window:
+                        found.add(rid)
+        return found
+
+    def add(self, rid, call, minutes, band):
+        self.discard(rid)
+        call = normalize_callsign(call)
+        band = _band(band)
+        if not call or minutes is None:
+            return
+        partners = self.matches(call, minutes, band)
+        key = (call, band, minutes // self.window)
+        self._buckets.setdefault(key, {})[rid] = minutes
+        self._entries[rid] = key
+        if not partners:
+            return
+        self._partners[rid] = partners
+        self._flag(rid)
+        for other in partners:
+            peers = self._partners.setdefault(other, set())
+            peers.add(rid)
+            if len(peers) == 1:
+                self._flag(other)
+
+    def discard(self, rid):
+        key = self._entries.pop(rid, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        del bucket[rid]
+        if not bucket:
+            del self._buckets[key]
+        partners = self._partners.pop(rid, ())
+        if partners:
+            self._flag(rid)
+        for other in partners:
+            peers = self._partners[other]
+            peers.discard(rid)
+            if not peers:
+                del self._partners[other]
+                self._flag(other)
+
+    def clear(self):
+        self._buckets.clear()
+        self._entries.clear()
+        self._partners.clear()
+
+    def is_dupe(self, rid):
+        return rid in self._partners
+
+    def dupes_of(self, rid):
+        return set(self._partners.get(rid, ()))
+
+    def _flag(self, rid):
+        if self.on_flag is not None:
+            self.on_flag(rid)
+
+    # --- LogStore listener ---
+
+    def _index_row(self, rid):
+        get = self.store.get
+        minutes = qso_minutes(get(rid, "Date"), get(rid, "Time"))
+        self.add(rid, get(rid, "Callsign"), minutes, self.store.typed.band[rid])
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._index_row(rid)
+
+    def on_update(self, rid, column, old):
+        if column in KEY_COLUMNS:
+            self._index_row(rid)
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self.discard(rid)
+
+    def on_restore(self, rids, positions):
+        for rid in rids:
+            self._index_row(rid)
+
+    def on_reset(self):
+        self.clear()
+        for rid in self.store.order:
+            self._index_row(rid)
+
+
+def unique_rows(rows, window=DUPE_WINDOW):
+    """Yield the rows (dicts) that do not duplicate an earlier row of the batch."""
+    index = DupeIndex(window=window)
+    for n, row in enumerate(rows):
+        call = row.get("Callsign")
+        minutes = qso_minutes(row.get("Date"), row.get("Time"))
+        band = row_band(row)
+        if index.matches(call, minutes, band):
+            continue
+        index.add(n, call, minutes, band)
+        yield row
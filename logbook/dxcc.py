@@ -0,0 +1,176 @@
+"""Offline callsign to DXCC entity resolver using a cty.dat country file.
+
+The country file (as published at country-files.com) lists every entity
+followed by its prefixes. Each prefix can override the entity's zones,
+position or continent, and entries starting with "=" are exact callsigns.
+"""
+import json
+import os
+from collections import namedtuple
+from .fields import normalize_callsign
+
+CACHE_VERSION = 2
+DETAIL_COLUMNS = ["Continent", "CQ", "ITU", "Lat", "Lon"]
+
+Entity = namedtuple("Entity", "name cq itu continent lat lon prefix")
+
+
+def _parse_alias(alias, entity):
+    """Split a prefix entry into (prefix, exact, Entity with its overrides)."""
+    overrides = {}
+    for open_, close, field in (("(", ")", "cq"), ("[", "]", "itu"), ("<", ">", "latlon"), ("{", "}", "continent"), ("~", "~", None)):
+        start = alias.find(open_)
+        if start < 0:
+            continue
+        end = alias.find(close, start + 1)
+        if end < 0:
+            end = len(alias)
+        if field:
+            overrides[field] = alias[start + 1:end]
+        alias = alias[:start] + alias[end + 1:]
+    if "latlon" in overrides:
+        lat, lon = overrides.pop("latlon").split("/")
+        overrides["lat"], overrides["lon"] = float(lat), -float(lon)
+    for field in ("cq", "itu"):
+        if field in overrides:
+            overrides[field] = int(overrides[field])
+    exact = alias.startswith("=")
+    return alias.lstrip("=").strip().upper(), exact, entity._replace(**overrides)
+
+
+def parse_cty(text):
+    """Parse cty.dat text into (prefixes, exact calls) dicts mapping to Entity."""
+    prefixes, exact = {}, {}
+    entity, aliases = None, ""
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if not line[0].isspace():
+            fields = [f.strip() for f in line.split(":")]
+            entity = Entity(
+                name=fields[0], cq=int(fields[1]), itu=int(fields[2]), continent=fields[3],
+                lat=float(fields[4]), lon=-float(fields[5]), prefix=fields[7].lstrip("*"),
+            )
+            aliases = ""
+            continue
+        aliases += line.strip()
+        if not aliases.endswith(";"):
+            continue
+        for alias in aliases.rstrip(";").split(","):
+            if alias.strip():
+                key, is_exact, info = _parse_alias(alias.strip(), entity)
+                (exact if is_exact else prefixes)[key] = info
+        aliases = ""
+    return prefixes, exact
+
+
+def encode_tables(prefixes, exact):
+    """JSON-ready tables: each distinct Entity once, prefixes and calls by index."""
+    entities, index = [], {}
+    def ref(entity):
+        if entity not in index:
+            index[entity] = len(entities)
+            entities.append(list(entity))
+        return index[entity]
+    return {
+        "entities": entities,
+        "prefixes": {key: ref(entity) for key, entity in prefixes.items()},
+        "exact": {key: ref(entity) for key, entity in exact.items()},
+    }
+
+
+def decode_tables(data):
+    entities = [Entity(*values) for values in data["entities"]]
+    return (
+        {key: entities[n] for key, n in data["prefixes"].items()},
+        {key: entities[n] for key, n in data["exact"].items()},
+    )
+
+
+class DxccResolver:
+    """Longest-prefix match of callsigns against a compiled prefix table.
+
+    The table is a trie flattened into one hash per prefix, so a lookup walks
+    from the longest possible prefix down with one dict probe per length.
+    Results are memoized per callsign.
+    """
+
+    def __init__(self, prefixes, exact):
+        self.prefixes = prefixes
+        self.exact = exact
+        self.max_len = max((len(p) for p in prefixes), default=0)
+        self._memo = {}
+
+    @classmethod
+    def load(cls, path, cache_path=None):
+        """Load a cty.dat file through a JSON cache, recompiling when it changes."""
+        cache_path = cache_path or path + ".cache"
+        stat = os.stat(path)
+        stamp = [CACHE_VERSION, stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached["stamp"] == stamp:
+                return cls(*decode_tables(cached))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            prefixes, exact = parse_cty(f.read())
+        try:
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"stamp": stamp, **encode_tables(prefixes, exact)}, f, separators=(",", ":"))
+        except OSError:
+            pass
+        return cls(prefixes, exact)
+
+    def resolve(self, call):
+        """Return the Entity for a callsign, or None."""
+        call = normalize_callsign(call)
+        if call in self._memo:
+            return self._memo[call]
+        entity = self.exact.get(call)
+        if entity is None:
+            entity = self._longest_prefix(self._prefix_part(call))
+        self._memo[call] = entity
+        return entity
+
+    def resolve_many(self, calls):
+        return [self.resolve(call) for call in calls]
+
+    def _prefix_part(self, call):
+        # "DL/YU1ABC" and "YU1ABC/DL" operate from DL; one-character suffixes are ignored
+        if "/" not in call:
+            return call
+        parts = [part for part in call.split("/") if len(part) > 1]
+        if not parts:
+            return call
+        return min(parts, key=len) if len(parts) > 1 else parts[0]
+
+    def _longest_prefix(self, call):
+        for n in range(min(len(call), self.max_len), 0, -1):
+            entity = self.prefixes.get(call[:n])
+            if entity is not None:
+                return entity
+        return None
+
+    def details(self, call):
+        """Return the auto-filled column values for a callsign."""
+        entity = self.resolve(call)
+        if entity is None:
+            return dict.fromkeys(DETAIL_COLUMNS, "")
+        return {
+            "Continent": entity.continent,
+            "CQ": str(entity.cq),
+            "ITU": str(entity.itu),
+            "Lat": f"{entity.lat:.2f}",
+            "Lon": f"{entity.lon:.2f}",
+        }
+
+    def enrich(self, record):
+        """Fill the entity columns of a record dict in place; Place only if blank."""
+        call = record.get("Callsign")
+        record.update(self.details(call))
+        entity = self.resolve(call)
+        if entity is not None and not record.get("Place"):
+            record["Place"] = entity.name
+        return record
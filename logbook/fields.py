@@ -0,0 +1,165 @@
+"""Parsing and normalization helpers for logbook fields."""
+import re
+from datetime import date
+import numpy as np
+import pandas as pd
+
+CALL_SUFFIXES = ("/QRP", "/MM", "/AM", "/P", "/M")
+TIME_RE = re.compile(r"^\s*([01]?\d|2[0-3]):?([0-5]\d)(?::?[0-5]\d)?\s*$")
+DATE_RE = re.compile(r"^\s*(\d{4})-?(\d{2})-?(\d{2})")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NO_BAND = -1
+
+# Amateur bands as (label, lower edge MHz, upper edge MHz), lowest first.
+# The position in this list is the band's categorical code.
+BANDS = [
+    ("2190m", 0.1357, 0.1378),
+    ("630m", 0.472, 0.479),
+    ("160m", 1.8, 2.0),
+    ("80m", 3.5, 4.0),
+    ("60m", 5.06, 5.45),
+    ("40m", 7.0, 7.3),
+    ("30m", 10.1, 10.15),
+    ("20m", 14.0, 14.35),
+    ("17m", 18.068, 18.168),
+    ("15m", 21.0, 21.45),
+    ("12m", 24.89, 24.99),
+    ("10m", 28.0, 29.7),
+    ("6m", 50.0, 54.0),
+    ("4m", 70.0, 71.0),
+    ("2m", 144.0, 148.0),
+    ("1.25m", 222.0, 225.0),
+    ("70cm", 420.0, 450.0),
+    ("33cm", 902.0, 928.0),
+    ("23cm", 1240.0, 1300.0),
+]
+BAND_CODES = {label: code for code, (label, _, _) in enumerate(BANDS)}
+BAND_LOWER = np.array([lower for _, lower, _ in BANDS])
+BAND_UPPER = np.array([upper for _, _, upper in BANDS])
+
+
+def normalize_callsign(call):
+    """Uppercase a callsign and drop portable/mobile suffixes."""
+    call = str(call or "").strip().upper()
+    for suffix in CALL_SUFFIXES:
+        if call.endswith(suffix):
+            return call[:-len(suffix)]
+    return call
+
+
+def normalize_band(band):
+    """Return a band label in the "20m" / "70cm" form used by the logbook."""
+    return str(band or "").strip().lower().replace(" ", "")
+
+
+def parse_time(text):
+    """Parse "HH:MM", "HHMM" or "HHMMSS" into minutes after midnight, or None."""
+    match = TIME_RE.match(str(text or ""))
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def parse_date(text):
+    """Parse "YYYY-MM-DD" or "YYYYMMDD" into days since 1970-01-01, or None."""
+    match = DATE_RE.match(str(text or ""))
+    if not match:
+        return None
+    try:
+        day = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def qso_minutes(date_text, time_text):
+    """Minutes since the epoch for a QSO, or minutes of the day if it has no date."""
+    minutes = parse_time(time_text)
+    if minutes is None:
+        return None
+    days = parse_date(date_text)
+    return minutes if days is None else days * 1440 + minutes
+
+
+def parse_freq(text):
+    """Parse a frequency in MHz, or None."""
+    try:
+        freq = float(str(text).strip().replace(",", "."))
+    except ValueError:
+        return None
+    return freq if freq > 0 else None
+
+
+def band_for_freq(freq):
+    """Return the band label a frequency in MHz falls in, or ""."""
+    code = int(band_codes_for_freqs(np.array([freq if freq is not None else np.nan]))[0])
+    return BANDS[code][0] if code != NO_BAND else ""
+
+
+def band_code(band, freq=None):
+    """Categorical band code from a band label, falling back to the frequency."""
+    code = BAND_CODES.get(normalize_band(band))
+    if code is None:
+        code = BAND_CODES.get(band_for_freq(freq), NO_BAND) if freq is not None else NO_BAND
+    return code
+
+
+# --- Vectorized versions over whole columns ---
+
+def _by_unique(values, parse):
+    """Apply a column parser to the distinct values only, then broadcast back.
+
+    Log columns repeat heavily (a day has 1440 distinct HH:MM times), so this
+    turns a per-row regex pass into a per-distinct-value one.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+    parsed = parse(pd.Series(uniques, dtype=object))
+    return parsed[codes] if len(parsed) else np.full(len(codes), np.nan)
+
+
+def _times(text):
+    parts = text.str.extract(TIME_RE)
+    return (pd.to_numeric(parts[0]) * 60 + pd.to_numeric(parts[1])).to_numpy(dtype=float)
+
+
+def _dates(text):
+    parts = text.str.extract(DATE_RE)
+    days = pd.to_datetime({"year": parts[0], "month": parts[1], "day": parts[2]}, errors="coerce")
+    return (days - pd.Timestamp("1970-01-01")).dt.days.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _freqs(text):
+    freqs = pd.to_numeric(text.str.strip().str.replace(",", "."), errors="coerce").to_numpy(dtype=float)
+    return np.where(freqs > 0, freqs, np.nan)
+
+
+def parse_times(values):
+    """Minutes after midnight for a column of times, NaN where invalid."""
+    return _by_unique(values, _times)
+
+
+def parse_dates(values):
+    """Days since 1970-01-01 for a column of dates, NaN where invalid."""
+    return _by_unique(values, _dates)
+
+
+def parse_freqs(values):
+    """Frequencies in MHz for a column, NaN where invalid."""
+    return _by_unique(values, _freqs)
+
+
+def band_codes_for_freqs(freqs):
+    """Band codes for an array of frequencies in MHz, NO_BAND outside the bands."""
+    freqs = np.asarray(freqs, dtype=float)
+    idx = np.searchsorted(BAND_LOWER, freqs, side="right") - 1
+    valid = (idx >= 0) & (freqs <= BAND_UPPER[np.clip(idx, 0, None)])
+    return np.where(valid, idx, NO_BAND).astype(np.int8)
+
+
+def band_codes(bands, freqs):
+    """Band codes for a column of band labels, derived from ``freqs`` where blank."""
+    codes = _by_unique(bands, lambda labels: np.array(
+        [BAND_CODES.get(normalize_band(label), np.nan) for label in labels], dtype=float
+    ))
+    from_freq = band_codes_for_freqs(freqs)
+    return np.where(np.isnan(codes), from_freq, codes).astype(np.int8)
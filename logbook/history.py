@@ -0,0 +1,116 @@
+"""Multi-level undo/redo for the logbook."""
+
+UNDO_LIMIT = 200
+
+
+class UndoStack:
+    """Records LogStore mutations as inverse operations.
+
+    Undoing a step applies its inverse through the normal store API, so the
+    journal and every index see an undo like any other edit. The mutations an
+    undo makes are themselves recorded, and become the redo step.
+    """
+
+    def __init__(self, store, limit=UNDO_LIMIT):
+        self.store = store
+        self.limit = limit
+        self.undo_steps = []
+        self.redo_steps = []
+        self._recording = None
+        self._group = None
+        self._before_reset = None
+        self._before_reorder = None
+        self._paused = False
+        store.add_listener(self)
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+    def undo(self):
+        if self.undo_steps:
+            self.redo_steps.append(self._revert(self.undo_steps.pop()))
+
+    def redo(self):
+        if self.redo_steps:
+            self.undo_steps.append(self._revert(self.redo_steps.pop()))
+
+    def _revert(self, step):
+        self._recording = []
+        try:
+            for op in reversed(step):
+                kind = op[0]
+                if kind == "set":
+                    self.store.set(op[1], op[2], op[3])
+                elif kind == "ins":
+                    self.store.remove(op[2])
+                elif kind == "del":
+                    self.store.restore(op[1], op[2])
+                elif kind == "order":
+                    self.store.reorder(op[1])
+                elif kind == "reset":
+                    self.store.load_snapshot(op[1])
+            return self._recording
+        finally:
+            self._recording = None
+
+    def _record(self, op):
+        if self._recording is not None:
+            self._recording.append(op)
+            return
+        if self._paused:
+            return
+        if self._group is not None:
+            self._group.append(op)
+            return
+        self._push([op])
+
+    def _push(self, step):
+        self.undo_steps.append(step)
+        del self.undo_steps[:-self.limit]
+        self.redo_steps.clear()
+
+    # --- LogStore listener ---
+
+    def on_begin(self, undoable=True):
+        if self._recording is None:
+            self._group = []
+            self._paused = not undoable
+
+    def on_end(self):
+        step, self._group = self._group, None
+        self._paused = False
+        if step:
+            self._push(step)
+
+    def on_insert(self, pos, rids):
+        self._record(("ins", pos, rids))
+
+    def on_update(self, rid, column, old):
+        self._record(("set", rid, column, old))
+
+    def on_remove(self, rids, positions):
+        self._record(("del", rids, positions))
+
+    def on_restore(self, rids, positions):
+        self._record(("ins", positions, rids))
+
+    def on_before_reorder(self):
+        self._before_reorder = list(self.store.order)
+
+    def on_reorder(self, keys):
+        self._record(("order", self._before_reorder))
+        self._before_reorder = None
+
+    def on_before_reset(self):
+        self._before_reset = self.store.snapshot()
+
+    def on_reset(self):
+        self._record(("reset", self._before_reset))
+        self._before_reset = None
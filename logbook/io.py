@@ -0,0 +1,212 @@
+"""Streaming readers and writers for xlsx, JSON and ADIF logs.
+
+Readers yield the log in DataFrame chunks of raw cells, so a caller can
+validate and process a file larger than memory one chunk at a time.
+Writers take an iterable of row dicts and stream it to disk.
+"""
+import json
+import os
+import re
+import pandas as pd
+from .store import COLUMNS
+from .dxcc import DETAIL_COLUMNS
+
+CHUNK_ROWS = 50000
+LOG_FILTER = "Excel Files (*.xlsx);;JSON Files (*.json *.jsonl);;ADIF Files (*.adi *.adif)"
+ADIF_FIELDS = {
+    "CALL": "Callsign",
+    "QSO_DATE": "Date",
+    "TIME_ON": "Time",
+    "FREQ": "Freq",
+    "BAND": "Band",
+    "MODE": "Mode",
+    "NAME": "Name",
+    "QTH": "Place",
+    "GRIDSQUARE": "Grid",
+}
+ADIF_NAMES = {col: field for field, col in ADIF_FIELDS.items()}
+ADIF_APP_PREFIX = "APP_TALASNIK_"
+PROVENANCE_COLUMNS = ["Source", "Source Row"]
+ADIF_TAG_RE = re.compile(r"<([A-Za-z0-9_]+)(?::(\d+))?(?::[^>]*)?>")
+READ_BLOCK = 1 << 20
+
+
+def log_format(path):
+    """Return "xlsx", "json", "jsonl" or "adif" from a file name."""
+    ext = os.path.splitext(path)[1].lower()
+    formats = {".xlsx": "xlsx", ".json": "json", ".jsonl": "jsonl", ".adi": "adif", ".adif": "adif"}
+    if ext not in formats:
+        raise ValueError(f"Unsupported log format: {path}")
+    return formats[ext]
+
+
+def _app_name(column):
+    return ADIF_APP_PREFIX + re.sub(r"\W+", "_", column).upper()
+
+
+APP_COLUMNS = {_app_name(col): col for col in COLUMNS + DETAIL_COLUMNS + PROVENANCE_COLUMNS}
+
+
+# --- Reading ---
+
+def _batches(records, chunk_rows, columns=None):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= chunk_rows:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+
+def _read_xlsx(path, chunk_rows):
+    from openpyxl import load_workbook
+    book = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = book.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col) for col in header]
+        yield from _batches((row[:len(columns)] for row in rows), chunk_rows, columns)
+    finally:
+        book.close()
+
+
+def _read_json(path, chunk_rows):
+    # A JSON array has to be parsed whole; JSON lines are streamed
+    df = pd.read_json(path, dtype=False)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _read_jsonl(path, chunk_rows):
+    with pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False) as reader:
+        yield from reader
+
+
+def read_adif(path):
+    """Yield the QSO records of an ADIF file as dicts of logbook columns.
+
+    The file is tokenized a block at a time. Known fields are renamed to
+    logbook columns, fields we wrote ourselves get their names back and any
+    other field keeps its ADIF name.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        buf = f.read(READ_BLOCK)
+        pos = 0
+        record = {}
+        in_header = not buf.lstrip().startswith("<")
+        while True:
+            match = ADIF_TAG_RE.search(buf, pos)
+            end = match.end() + int(match.group(2) or 0) if match else None
+            if match is None or end > len(buf):
+                more = f.read(READ_BLOCK)
+                if not more:
+                    break
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            name = match.group(1).upper()
+            pos = end
+            if name == "EOH":
+                in_header = False
+                record = {}
+            elif name == "EOR":
+                if not in_header and record:
+                    yield record
+                record = {}
+            elif match.group(2) is not None:
+                value = buf[match.end():end]
+                if name in APP_COLUMNS:
+                    column = APP_COLUMNS[name]
+                elif name.startswith(ADIF_APP_PREFIX):
+                    column = name[len(ADIF_APP_PREFIX):].replace("_", " ").title()
+                else:
+                    column = ADIF_FIELDS.get(name, name)
+                record[column] = value
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the rows of a log file as DataFrames of at most ``chunk_rows``."""
+    fmt = log_format(path)
+    if fmt == "xlsx":
+        return _read_xlsx(path, chunk_rows)
+    if fmt == "json":
+        return _read_json(path, chunk_rows)
+    if fmt == "jsonl":
+        return _read_jsonl(path, chunk_rows)
+    return _batches(read_adif(path), chunk_rows)
+
+
+def read_frame(path):
+    """Read a whole log file into one DataFrame."""
+    chunks = list(read_chunks(path))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+# --- Writing ---
+
+def _write_xlsx(path, columns, rows):
+    from openpyxl import Workbook
+    book = Workbook(write_only=True)
+    sheet = book.create_sheet()
+    sheet.append(columns)
+    count = 0
+    for row in rows:
+        sheet.append([row.get(col, "") for col in columns])
+        count += 1
+    book.save(path)
+    return count
+
+
+def _write_json(path, columns, rows, lines=False):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if not lines:
+            f.write("[")
+        for row in rows:
+            text = json.dumps({col: row.get(col, "") for col in columns}, ensure_ascii=False)
+            if lines:
+                f.write(text + "\n")
+            else:
+                f.write(("," if count else "") + "\n  " + text)
+            count += 1
+        if not lines:
+            f.write("\n]\n")
+    return count
+
+
+def _adif_value(column, value):
+    if column == "Date":
+        return value.replace("-", "")
+    if column == "Time":
+        return value.replace(":", "")
+    return value
+
+
+def _write_adif(path, columns, rows):
+    names = {col: ADIF_NAMES.get(col) or _app_name(col) for col in columns}
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Talasnik ADIF export\n<ADIF_VER:5>3.1.4 <PROGRAMID:8>Talasnik <EOH>\n")
+        for row in rows:
+            fields = []
+            for col in columns:
+                value = _adif_value(col, str(row.get(col, "") or ""))
+                if value:
+                    fields.append(f"<{names[col]}:{len(value)}>{value}")
+            f.write(" ".join(fields) + " <EOR>\n")
+            count += 1
+    return count
+
+
+def write_log(path, columns, rows):
+    """Stream row dicts to a log file; returns the number of rows written."""
+    fmt = log_format(path)
+    if fmt == "xlsx":
+        return _write_xlsx(path, columns, rows)
+    if fmt == "adif":
+        return _write_adif(path, columns, rows)
+    return _write_json(path, columns, rows, lines=fmt == "jsonl")
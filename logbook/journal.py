@@ -0,0 +1,221 @@
+"""Append-only, crash-safe journal of logbook mutations.
+
+Every change to a LogStore is written as one compact JSON line, so the cost
+of saving is proportional to the change rather than to the size of the log.
+Lines are flushed to the OS right away and fsync'd in groups. On startup the
+journal is replayed to recover the log, then compacted into a single
+snapshot record; ``compact()`` does the same while running, once the
+records appended outgrow the snapshot. A store transaction is written as
+one "batch" line, so it is replayed whole or not at all.
+
+A process that writes the journal holds an exclusive lock on a ``.lock``
+file next to it, so the GUI and a CLI import never write it at once;
+read-only users replay it without the lock and never rewrite it.
+"""
+import json
+import os
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JOURNAL_FILE = "talasnik_journal.jsonl"
+GROUP_SIZE = 32
+COMPACT_RATIO = 4  # checkpoint once the appended records are this many snapshots long
+COMPACT_MIN_BYTES = 1024 * 1024  # but never for less than this
+
+
+class JournalLockedError(OSError):
+    """The journal is being written by another process."""
+
+
+def encode_snapshot(store):
+    """Serialize the whole store, dead rows included as null to keep the rids."""
+    snap = store.snapshot()
+    live = set(snap["order"])
+    data = [snap["data"][col] for col in snap["columns"]]
+    rows = [[values[rid] for values in data] if rid in live else None for rid in range(snap["size"])]
+    return {"op": "snap", "columns": snap["columns"], "order": snap["order"], "rows": rows}
+
+
+def decode_snapshot(record):
+    columns = record["columns"]
+    data = {col: [] for col in columns}
+    for row in record["rows"]:
+        row = row or [""] * len(columns)
+        for col, value in zip(columns, row):
+            data[col].append(value)
+    return {"columns": columns, "data": data, "size": len(record["rows"]), "order": record["order"]}
+
+
+def apply_record(store, record):
+    """Replay one journal record against a store."""
+    op = record["op"]
+    if op == "ins":
+        store.insert_rows(record["pos"], record["rows"])
+    elif op == "set":
+        store.set(record["rid"], record["col"], record["val"])
+    elif op == "del":
+        store.remove(record["rids"])
+    elif op == "res":
+        store.restore(record["rids"], record["pos"])
+    elif op == "col":
+        store.add_column(record["name"])
+    elif op == "sort":
+        store.sort(record["keys"])
+    elif op == "order":
+        store.reorder(record["order"])
+    elif op == "snap":
+        store.load_snapshot(decode_snapshot(record))
+    elif op == "batch":
+        with store.transaction():
+            for part in record["ops"]:
+                apply_record(store, part)
+    else:
+        raise ValueError(f"Unknown journal record: {op}")
+
+
+class Journal:
+    """Journal file attached to a LogStore as a listener."""
+
+    def __init__(self, path=JOURNAL_FILE, group=GROUP_SIZE):
+        self.path = path
+        self.group = group
+        self.store = None
+        self._file = None
+        self._lock = None
+        self._pending = 0
+        self._batch = None  # records of the open transaction
+        self._snapshot_bytes = 0
+        self._appended_bytes = 0
+
+    def lock(self):
+        """Take the journal's lock, or raise JournalLockedError; released by close()."""
+        if self._lock is not None:
+            return
+        f = open(self.path + ".lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            raise JournalLockedError(f"{self.path} is open in another Talasnik window or command")
+        self._lock = f
+
+    def recover(self, store, checkpoint=True):
+        """Replay the journal into ``store``, compact it and start journaling.
+
+        A torn last line (a crash in the middle of a write) is dropped. With
+        ``checkpoint=False`` the journal is only read: it is not locked,
+        compacted or written. Returns the number of records replayed.
+        """
+        if checkpoint:
+            self.lock()
+        replayed = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    apply_record(store, record)
+                    replayed += 1
+        self.store = store
+        if checkpoint:
+            self.checkpoint()
+            store.add_listener(self)
+        return replayed
+
+    def checkpoint(self):
+        """Atomically rewrite the journal as a single snapshot of the store."""
+        self._close_file()
+        tmp = self.path + ".tmp"
+        line = json.dumps(encode_snapshot(self.store), separators=(",", ":")) + "\n"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._snapshot_bytes = len(line)
+        self._appended_bytes = 0
+
+    def compact(self):
+        """Checkpoint when the journal has grown COMPACT_RATIO times past its snapshot."""
+        if self._file is not None and self._appended_bytes > max(COMPACT_RATIO * self._snapshot_bytes, COMPACT_MIN_BYTES):
+            self.checkpoint()
+
+    def append(self, record):
+        if self._file is None:
+            return
+        if self._batch is not None:
+            self._batch.append(record)
+            return
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self._appended_bytes += len(line)
+        self._pending += 1
+        if self._pending >= self.group:
+            self.sync()
+
+    def sync(self):
+        """fsync everything written so far."""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def _close_file(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_file()
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    # --- LogStore listener ---
+
+    def on_begin(self, undoable=True):
+        self._batch = []
+
+    def on_end(self):
+        batch, self._batch = self._batch, None
+        if batch:
+            self.append(batch[0] if len(batch) == 1 else {"op": "batch", "ops": batch})
+
+    def on_insert(self, pos, rids):
+        columns = self.store.columns
+        rows = [[self.store.get(rid, col) for col in columns] for rid in rids]
+        self.append({"op": "ins", "pos": pos, "rows": rows})
+
+    def on_update(self, rid, column, old):
+        self.append({"op": "set", "rid": rid, "col": column, "val": self.store.get(rid, column)})
+
+    def on_remove(self, rids, positions):
+        self.append({"op": "del", "rids": rids})
+
+    def on_restore(self, rids, positions):
+        self.append({"op": "res", "rids": rids, "pos": positions})
+
+    def on_add_column(self, name):
+        self.append({"op": "col", "name": name})
+
+    def on_reorder(self, keys):
+        if keys is None:
+            self.append({"op": "order", "order": list(self.store.order)})
+        else:
+            self.append({"op": "sort", "keys": keys})
+
+    def on_reset(self):
+        self.append(encode_snapshot(self.store))
@@ -0,0 +1,164 @@
+"""Maidenhead grid locators, great-circle distance and a worked-grid index.
+
+All conversions take and return whole NumPy columns, so a log is located
+in a handful of array operations instead of a Python loop per QSO.
+"""
+import re
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+GRID_COLUMN = "Grid"
+LOCATOR_RE = re.compile(r"^[A-R]{2}(?:\d\d(?:[A-X]{2}(?:\d\d)?)?)?$")
+
+# Degrees of longitude/latitude per character pair: field, square, subsquare, extended square
+LON_STEPS = (20.0, 2.0, 2.0 / 24, 2.0 / 240)
+LAT_STEPS = (10.0, 1.0, 1.0 / 24, 1.0 / 240)
+PAIR_BASES = (18, 10, 24, 10)
+PAIR_ALPHABETS = ("A", "0", "A", "0")
+
+
+def normalize_locator(text):
+    """Uppercase a locator and drop anything past the 8th character."""
+    return str(text or "").strip().upper()[:8]
+
+
+def is_locator(text):
+    return bool(LOCATOR_RE.match(normalize_locator(text)))
+
+
+def to_locators(lat, lon, length=6):
+    """Locators of ``length`` 4, 6 or 8 characters for arrays of lat/lon degrees.
+
+    Invalid positions give "".
+    """
+    lat = np.atleast_1d(np.asarray(lat, dtype=float))
+    lon = np.atleast_1d(np.asarray(lon, dtype=float))
+    valid = ~(np.isnan(lat) | np.isnan(lon)) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    x = np.clip(np.nan_to_num(lon) + 180.0, 0, 360 - 1e-9)
+    y = np.clip(np.nan_to_num(lat) + 90.0, 0, 180 - 1e-9)
+    out = np.full(len(lat), "", dtype=object)
+    pairs = []
+    for i in range(length // 2):
+        lon_digit = np.minimum((x // LON_STEPS[i]).astype(np.int64), PAIR_BASES[i] - 1)
+        lat_digit = np.minimum((y // LAT_STEPS[i]).astype(np.int64), PAIR_BASES[i] - 1)
+        x = x - lon_digit * LON_STEPS[i]
+        y = y - lat_digit * LAT_STEPS[i]
+        base = ord(PAIR_ALPHABETS[i])
+        symbols = np.array([chr(base + d) for d in range(PAIR_BASES[i])])
+        pairs.append(np.char.add(symbols[lon_digit], symbols[lat_digit]))
+    text = pairs[0]
+    for pair in pairs[1:]:
+        text = np.char.add(text, pair)
+    out[valid] = text[valid]
+    return out
+
+
+def _from_locators(locators):
+    """(lat, lon) of the centre of each locator, NaN where invalid."""
+    n = len(locators)
+    lat, lon = np.full(n, np.nan), np.full(n, np.nan)
+    text = pd.Series(locators, dtype=object).fillna("").astype(str).str.strip().str.upper().str[:8]
+    valid = text.str.match(LOCATOR_RE).to_numpy(dtype=bool) & (text != "").to_numpy()
+    if not valid.any():
+        return lat, lon
+    text = text[valid]
+    lengths = text.str.len().to_numpy()
+    padded = np.array(text.str.pad(8, side="right", fillchar="\0").tolist(), dtype="U8")
+    chars = padded.view(np.uint32).reshape(-1, 8).astype(np.int64)
+    la = np.full(len(text), -90.0)
+    lo = np.full(len(text), -180.0)
+    for i in range(4):
+        present = lengths > 2 * i
+        base = ord(PAIR_ALPHABETS[i])
+        lo += np.where(present, (chars[:, 2 * i] - base) * LON_STEPS[i], 0)
+        la += np.where(present, (chars[:, 2 * i + 1] - base) * LAT_STEPS[i], 0)
+    # Centre of the smallest square given
+    last = lengths // 2 - 1
+    lo += np.array(LON_STEPS)[last] / 2
+    la += np.array(LAT_STEPS)[last] / 2
+    lat[valid], lon[valid] = la, lo
+    return lat, lon
+
+
+def from_locators(locators):
+    """Centre (lat, lon) arrays for a column of 2/4/6/8-character locators, NaN where invalid."""
+    codes, uniques = pd.factorize(pd.Series(locators, dtype=object).fillna(""))
+    lat, lon = _from_locators(list(uniques) + [""])
+    return lat[codes], lon[codes]
+
+
+def distance_bearing(lat1, lon1, lat2, lon2):
+    """Great-circle distance (km) and initial bearing (degrees) from point 1 to point 2."""
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    dl = np.radians(np.asarray(lon2, dtype=float) - lon1)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    bearing = np.degrees(np.arctan2(np.sin(dl) * np.cos(p2), np.cos(p1) * np.sin(p2) - np.sin(p1) * np.cos(p2) * np.cos(dl)))
+    return distance, np.mod(bearing, 360)
+
+
+def locate_from(qth, locators):
+    """Distance (km) and bearing (degrees) from a QTH locator to a column of locators."""
+    (qlat,), (qlon,) = from_locators([qth])
+    lat, lon = from_locators(locators)
+    return distance_bearing(qlat, qlon, lat, lon)
+
+
+class GridIndex:
+    """Worked 4-character grid squares of the log, kept current as a store listener.
+
+    ``squares`` counts QSOs per square.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.squares = Counter()
+        self._grids = {}  # rid -> square
+        store.add_listener(self)
+        self.on_reset()
+
+    def __len__(self):
+        return len(self.squares)
+
+    def _square(self, rid):
+        locator = normalize_locator(self.store.get(rid, GRID_COLUMN))
+        return locator[:4] if len(locator) >= 4 and LOCATOR_RE.match(locator) else ""
+
+    def _set(self, rid, square):
+        old = self._grids.pop(rid, "")
+        if old:
+            self.squares[old] -= 1
+            if not self.squares[old]:
+                del self.squares[old]
+        if square:
+            self._grids[rid] = square
+            self.squares[square] += 1
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._set(rid, self._square(rid))
+
+    def on_update(self, rid, column, old):
+        if column == GRID_COLUMN:
+            self._set(rid, self._square(rid))
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self._set(rid, "")
+
+    def on_restore(self, rids, positions):
+        self.on_insert(None, rids)
+
+    def on_reset(self):
+        # Bulk path: validate the whole column at once
+        self._grids = {}
+        rids = list(self.store.order)
+        text = pd.Series([self.store.get(rid, GRID_COLUMN) for rid in rids], dtype=object).astype(str).str.strip().str.upper()
+        ok = text.str.match(LOCATOR_RE).to_numpy(dtype=bool) & (text.str.len() >= 4).to_numpy()
+        squares = text.str[:4].to_numpy(dtype=object)
+        self._grids = {rid: square for rid, square, good in zip(rids, squares, ok) if good}
+        self.squares = Counter(self._grids.values())
@@ -0,0 +1,156 @@
+"""Merge any number of logs with a chunked external sort by QSO time.
+
+Each input is read a chunk at a time, validated, tagged with where it came
+from, sorted by timestamp and spilled to a temporary run file. The runs
+are then k-way merged into one time-ordered stream, duplicates are dropped
+on the way and the result is streamed to the output file, so memory use
+is bounded by the chunk size rather than by the size of the logs. At most
+MERGE_FAN_IN runs are open at once: with more, groups of them are first
+merged into longer runs, pass by pass.
+"""
+import heapq
+import math
+import os
+import pickle
+import tempfile
+from collections import deque, namedtuple
+import numpy as np
+from .dupes import DUPE_WINDOW, row_band
+from .fields import normalize_callsign, parse_dates, parse_times
+from .io import CHUNK_ROWS, PROVENANCE_COLUMNS, read_chunks, write_log
+from .store import COLUMNS
+from .validate import validate_frame
+
+RUN_BLOCK = 1000
+MERGE_FAN_IN = 64  # runs open at once while merging
+
+MergeResult = namedtuple("MergeResult", "written duplicates rejected")
+
+
+def _timestamps(rows):
+    """Epoch minutes per row; undated QSOs count from day 0, untimed sort last."""
+    minutes = parse_times([row.get("Time", "") for row in rows])
+    days = np.nan_to_num(parse_dates([row.get("Date", "") for row in rows]))
+    return np.where(np.isnan(minutes), math.inf, days * 1440 + minutes)
+
+
+def _spill(pairs, tmpdir):
+    """Write (key, row) pairs, already in order, as pickled blocks to a run file."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        block = []
+        for pair in pairs:
+            block.append(pair)
+            if len(block) == RUN_BLOCK:
+                pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _write_run(rows, keys, tmpdir):
+    """Sort one chunk by key and spill it as a run."""
+    order = np.argsort(keys, kind="stable")
+    return _spill(((keys[i], rows[i]) for i in order), tmpdir)
+
+
+def _read_run(path, tiebreak):
+    with open(path, "rb") as f:
+        seq = 0
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            for key, row in block:
+                yield key, tiebreak, seq, row
+                seq += 1
+
+
+def _merge_runs(runs):
+    """One time-ordered stream of (key, run, seq, row); ties keep the run order."""
+    return heapq.merge(*(_read_run(path, n) for n, path in enumerate(runs)))
+
+
+def _reduce_runs(runs, tmpdir, fan_in=MERGE_FAN_IN):
+    """Merge consecutive groups of runs until at most ``fan_in`` are left."""
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            merged.append(_spill(((key, row) for key, _, _, row in _merge_runs(group)), tmpdir))
+            for path in group:
+                os.remove(path)
+        runs = merged
+    return runs
+
+
+def _dedupe(entries, window):
+    """Drop QSOs within ``window`` minutes of a kept QSO with the same call and band.
+
+    The band is the Band label or else the one Freq falls in, as in the store.
+
+    The stream is in time order, so only the last kept time per (call, band)
+    is needed, and entries older than the window are evicted as we go.
+    """
+    last = {}
+    recent = deque()
+    for key, _, _, row in entries:
+        call = normalize_callsign(row.get("Callsign"))
+        if not call or key == math.inf:
+            yield True, row
+            continue
+        while recent and recent[0][0] < key - window:
+            old, pair = recent.popleft()
+            if last.get(pair) == old:
+                del last[pair]
+        pair = (call, row_band(row))
+        logged = last.get(pair)
+        if logged is not None and key - logged <= window:
+            yield False, row
+            continue
+        last[pair] = key
+        recent.append((key, pair))
+        yield True, row
+
+
+def merge_logs(paths, out_path, chunk_rows=CHUNK_ROWS, window=DUPE_WINDOW, tmpdir=None, fan_in=MERGE_FAN_IN):
+    """Merge xlsx/JSON/ADIF logs into one time-ordered, deduplicated log.
+
+    Every output row gets the provenance columns: "Source" (the input file
+    name) and "Source Row" (its data row number there). Rows failing
+    validation are left out. Returns ``MergeResult(written, duplicates, rejected)``.
+    """
+    columns = list(COLUMNS)
+    runs = []
+    rejected = 0
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        for path in paths:
+            source = os.path.basename(path)
+            offset = 0
+            for chunk in read_chunks(path, chunk_rows):
+                rows, report = validate_frame(chunk, number_column="Source Row", start=offset + 1)
+                rejected += report["Row"].nunique()
+                for row in rows:
+                    row["Source"] = source
+                columns += [col for col in chunk.columns.astype(str) if col not in columns]
+                offset += len(chunk)
+                if rows:
+                    runs.append(_write_run(rows, _timestamps(rows), workdir))
+        columns += [col for col in PROVENANCE_COLUMNS if col not in columns]
+        merged = _merge_runs(_reduce_runs(runs, workdir, fan_in))
+        counts = {"duplicates": 0}
+
+        def unique():
+            for keep, row in _dedupe(merged, window):
+                if keep:
+                    yield row
+                else:
+                    counts["duplicates"] += 1
+
+        written = write_log(out_path, columns, unique())
+    return MergeResult(written, counts["duplicates"], rejected)
@@ -0,0 +1,182 @@
+"""Super check partial: find callsigns containing a typed fragment.
+
+Calls come from a MASTER.SCP style file (one active call per line, "#"
+comments) and from the calls already in the log. Both are indexed by
+their 2- and 3-character grams, so a fragment is answered by intersecting
+a few posting sets and checking the survivors, never by scanning every
+call.
+"""
+import heapq
+import json
+import os
+from .fields import normalize_callsign
+
+CACHE_VERSION = 2
+MIN_FRAGMENT = 2
+SUGGESTIONS = 20
+
+
+def grams(text):
+    """The 2- and 3-character substrings of ``text``."""
+    return {text[i:i + n] for n in (2, 3) for i in range(len(text) - n + 1)}
+
+
+def read_scp(path):
+    with open(path, "r", encoding="ascii", errors="ignore") as f:
+        return sorted({line.strip().upper() for line in f if line.strip() and not line.startswith("#")})
+
+
+class NgramIndex:
+    """Gram -> set of keys, answering "key contains fragment" queries."""
+
+    def __init__(self, keys=()):
+        self._postings = {}
+        self._counts = {}
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def add(self, key):
+        """Add one occurrence of ``key``; keys are counted so the log can repeat calls."""
+        if key in self._counts:
+            self._counts[key] += 1
+            return
+        self._counts[key] = 1
+        for gram in grams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def discard(self, key):
+        count = self._counts.get(key)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[key] = count - 1
+            return
+        del self._counts[key]
+        for gram in grams(key):
+            postings = self._postings[gram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[gram]
+
+    def to_dict(self):
+        """JSON-ready form: the keys with their counts, postings as key indexes."""
+        keys = list(self._counts)
+        number = {key: n for n, key in enumerate(keys)}
+        return {
+            "keys": keys,
+            "counts": [self._counts[key] for key in keys],
+            "postings": {gram: [number[key] for key in postings] for gram, postings in self._postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        keys = data["keys"]
+        index._counts = dict(zip(keys, data["counts"]))
+        index._postings = {gram: {keys[n] for n in numbers} for gram, numbers in data["postings"].items()}
+        return index
+
+    def search(self, fragment):
+        """Return the set of keys containing ``fragment`` (at least 2 characters)."""
+        if len(fragment) < MIN_FRAGMENT:
+            return set()
+        postings = [self._postings.get(gram) for gram in grams(fragment) if len(gram) == min(3, len(fragment))]
+        if not postings or None in postings:
+            return set()
+        postings.sort(key=len)
+        found = postings[0]
+        for other in postings[1:]:
+            found = found & other
+            if not found:
+                return found
+        if len(fragment) <= 3:
+            return set(found)
+        return {key for key in found if fragment in key}
+
+
+def load_master(path, cache_path=None):
+    """Index a MASTER.SCP file, through a JSON cache of the prebuilt index."""
+    cache_path = cache_path or path + ".cache"
+    stat = os.stat(path)
+    stamp = [CACHE_VERSION, stat.st_size, stat.st_mtime_ns]
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["stamp"] == stamp:
+            return NgramIndex.from_dict(cached["index"])
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        pass
+    index = NgramIndex(read_scp(path))
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"stamp": stamp, "index": index.to_dict()}, f, separators=(",", ":"))
+    except OSError:
+        pass
+    return index
+
+
+class SuperCheckPartial:
+    """Callsign suggestions from a master call list plus the live log.
+
+    Registered as a LogStore listener it follows the log's Callsign column,
+    so a call is suggested as soon as it has been logged once.
+    """
+
+    def __init__(self, master=(), store=None):
+        self.master = master if isinstance(master, NgramIndex) else NgramIndex(master)
+        self.logged = NgramIndex()
+        self.store = store
+        self._calls = {}  # rid -> normalized call
+        if store is not None:
+            store.add_listener(self)
+            self.on_reset()
+
+    def search(self, fragment, limit=SUGGESTIONS):
+        """Calls containing ``fragment``: logged calls first, then the master list.
+
+        Within each group calls starting with the fragment come first, then
+        shorter calls, then alphabetical order.
+        """
+        fragment = str(fragment or "").strip().upper()
+        logged = self.logged.search(fragment)
+        master = self.master.search(fragment) - logged
+        rank = lambda call: (not call.startswith(fragment), len(call), call)
+        found = heapq.nsmallest(limit, logged, key=rank)
+        return found + heapq.nsmallest(limit - len(found), master, key=rank)
+
+    def _set(self, rid, call):
+        old = self._calls.pop(rid, None)
+        if old:
+            self.logged.discard(old)
+        if call:
+            self._calls[rid] = call
+            self.logged.add(call)
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._set(rid, normalize_callsign(self.store.get(rid, "Callsign")))
+
+    def on_update(self, rid, column, old):
+        if column == "Callsign":
+            self._set(rid, normalize_callsign(self.store.get(rid, "Callsign")))
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self._set(rid, "")
+
+    def on_restore(self, rids, positions):
+        self.on_insert(None, rids)
+
+    def on_reset(self):
+        self._calls = {}
+        self.logged = NgramIndex()
+        for rid in self.store.order:
+            self._set(rid, normalize_callsign(self.store.get(rid, "Callsign")))
@@ -0,0 +1,216 @@
+"""Incremental search indexes over the logbook."""
+import re
+from bisect import bisect_left, insort
+from .fields import normalize_callsign
+
+TOKEN_RE = re.compile(r"\w+")
+NGRAM = 3  # longest gram indexed for substring queries
+WORD_COLUMNS = ("Name", "Place")
+FIELDS = {"call": "Callsign", "name": "Name", "place": "Place"}
+
+
+def tokenize(text):
+    return set(TOKEN_RE.findall(str(text or "").lower()))
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class PrefixIndex:
+    """Maps keys to rid postings and answers "key starts with" queries.
+
+    The keys are kept in a sorted array, so a prefix query is a bisect to the
+    first matching key followed by a walk over the matching range: the same
+    lookup a character trie gives, at a fraction of the memory per key.
+
+    With ``substrings`` it also keeps every 1- to NGRAM-character gram of
+    each key, so "key contains" is an intersection of gram sets plus a
+    check of the few keys left.
+    """
+
+    def __init__(self, substrings=False):
+        self._keys = []
+        self._postings = {}
+        self._grams = {} if substrings else None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, rid):
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = set()
+            insort(self._keys, key)
+            self._add_grams(key)
+        postings.add(rid)
+
+    def discard(self, key, rid):
+        postings = self._postings.get(key)
+        if postings is None:
+            return
+        postings.discard(rid)
+        if not postings:
+            del self._postings[key]
+            del self._keys[bisect_left(self._keys, key)]
+            if self._grams is not None:
+                for n in range(1, NGRAM + 1):
+                    for gram in ngrams(key, n):
+                        keys = self._grams[gram]
+                        keys.discard(key)
+                        if not keys:
+                            del self._grams[gram]
+
+    def _add_grams(self, key):
+        if self._grams is not None:
+            for n in range(1, NGRAM + 1):
+                for gram in ngrams(key, n):
+                    self._grams.setdefault(gram, set()).add(key)
+
+    def rebuild(self, pairs):
+        """Bulk load (key, rid) pairs, replacing the index."""
+        self._postings = {}
+        for key, rid in pairs:
+            self._postings.setdefault(key, set()).add(rid)
+        self._keys = sorted(self._postings)
+        if self._grams is not None:
+            self._grams = {}
+            for key in self._keys:
+                self._add_grams(key)
+
+    def keys_with_prefix(self, prefix):
+        keys = self._keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def prefix(self, prefix):
+        """Return the rids of every key starting with ``prefix``."""
+        found = set()
+        for key in self.keys_with_prefix(prefix):
+            found |= self._postings[key]
+        return found
+
+    def contains(self, text):
+        """Return the rids of every key containing ``text``; needs ``substrings``."""
+        if not text:
+            return self.prefix("")
+        grams = sorted((self._grams.get(gram, set()) for gram in ngrams(text, min(NGRAM, len(text)))), key=len)
+        keys = set.intersection(*grams) if grams else set()
+        found = set()
+        for key in keys:
+            if text in key:
+                found |= self._postings[key]
+        return found
+
+
+class SearchIndex:
+    """Callsign prefix index plus an inverted word index over Name and Place.
+
+    Registered as a LogStore listener, it follows every edit, so a query
+    costs time proportional to its matches rather than to the log size.
+
+    Queries are whitespace separated terms that must all match. ``call:YU``,
+    ``name:pera`` and ``place:beog`` search one column: callsigns by prefix,
+    Name/Place by word prefix. A bare term matches a callsign containing it
+    or a Name/Place word starting with it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.calls = PrefixIndex(substrings=True)
+        self.words = {col: PrefixIndex() for col in WORD_COLUMNS}
+        self._indexed = {}  # rid -> (call, {column: tokens})
+        store.add_listener(self)
+        self.on_reset()
+
+    def query(self, text):
+        """Return the set of rids matching every term of ``text``."""
+        result = None
+        for term in str(text or "").split():
+            field, _, value = term.rpartition(":")
+            if not value:
+                continue
+            column = FIELDS.get(field.lower())
+            if column == "Callsign":
+                matches = self.calls.prefix(normalize_callsign(value))
+            elif column in self.words:
+                matches = self._word_matches(column, value)
+            else:
+                matches = self.calls.contains(normalize_callsign(value))
+                for col in WORD_COLUMNS:
+                    matches |= self._word_matches(col, value)
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result if result is not None else set(self.store.order)
+
+    def _word_matches(self, column, value):
+        found = None
+        for word in tokenize(value) or {""}:
+            matches = self.words[column].prefix(word)
+            found = matches if found is None else found & matches
+        return found
+
+    def _entry(self, rid):
+        call = normalize_callsign(self.store.get(rid, "Callsign"))
+        return call, {col: tokenize(self.store.get(rid, col)) for col in WORD_COLUMNS}
+
+    def _add(self, rid):
+        call, words = self._indexed[rid] = self._entry(rid)
+        if call:
+            self.calls.add(call, rid)
+        for col, tokens in words.items():
+            for token in tokens:
+                self.words[col].add(token, rid)
+
+    def _discard(self, rid):
+        entry = self._indexed.pop(rid, None)
+        if entry is None:
+            return
+        call, words = entry
+        if call:
+            self.calls.discard(call, rid)
+        for col, tokens in words.items():
+            for token in tokens:
+                self.words[col].discard(token, rid)
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._add(rid)
+
+    def on_update(self, rid, column, old):
+        if column == "Callsign" or column in WORD_COLUMNS:
+            self._discard(rid)
+            self._add(rid)
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self._discard(rid)
+
+    def on_restore(self, rids, positions):
+        for rid in rids:
+            self._add(rid)
+
+    def on_reset(self):
+        # Bulk path: logs repeat the same names and places, tokenize each once
+        cache = {}
+        get = self.store.get
+        self._indexed = {}
+        for rid in self.store.order:
+            words = {}
+            for col in WORD_COLUMNS:
+                text = get(rid, col)
+                tokens = cache.get(text)
+                if tokens is None:
+                    tokens = cache[text] = tokenize(text)
+                words[col] = tokens
+            self._indexed[rid] = (normalize_callsign(get(rid, "Callsign")), words)
+        self.calls.rebuild((call, rid) for rid, (call, _) in self._indexed.items() if call)
+        for col in WORD_COLUMNS:
+            self.words[col].rebuild(
+                (token, rid) for rid, (_, words) in self._indexed.items() for token in words[col]
+            )
@@ -0,0 +1,147 @@
+"""Live logbook statistics, maintained incrementally as the log changes."""
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+import numpy as np
+from .fields import BANDS, NO_BAND, normalize_callsign
+from .typed import NO_TIME, TYPED_COLUMNS
+
+STATS_COLUMNS = ("Callsign",) + TYPED_COLUMNS
+RATE_WINDOWS = (10, 60)
+
+
+class LogStats:
+    """QSO counts per band, UTC hour and DXCC entity, unique calls and rate.
+
+    Registered as a LogStore listener, each insert, edit or delete moves one
+    row's contribution between counters, so reading the totals never scans
+    the log. Band and time come from the store's typed columns; the entity
+    from an optional DxccResolver. Rows without a callsign are not QSOs.
+    """
+
+    def __init__(self, store, resolver=None):
+        self.store = store
+        self.resolver = resolver
+        self.version = 0
+        store.add_listener(self)
+        self.on_reset()
+
+    def _clear(self):
+        self.bands = Counter()
+        self.hours = Counter()
+        self.entities = Counter()
+        self.calls = Counter()
+        self._stamps = []  # sorted QSO timestamps, epoch seconds
+        self._entries = {}  # rid -> (call, band, hour, entity, ts)
+
+    @property
+    def total(self):
+        return len(self._entries)
+
+    @property
+    def unique_calls(self):
+        return len(self.calls)
+
+    def rate(self, minutes, now=None):
+        """Number of QSOs logged in the last ``minutes`` (UTC) before ``now``."""
+        now = time.time() if now is None else now
+        return bisect_right(self._stamps, now) - bisect_right(self._stamps, now - minutes * 60)
+
+    def band_label(self, code):
+        return BANDS[code][0] if code != NO_BAND else ""
+
+    def set_resolver(self, resolver):
+        self.resolver = resolver
+        self.on_reset()
+
+    def _entity(self, call):
+        if self.resolver is None:
+            return ""
+        entity = self.resolver.resolve(call)
+        return entity.name if entity is not None else ""
+
+    def _entry(self, rid):
+        call = normalize_callsign(self.store.get(rid, "Callsign"))
+        if not call:
+            return None
+        typed = self.store.typed
+        ts = int(typed.ts[rid])
+        hour = (ts // 3600) % 24 if ts != NO_TIME else None
+        return call, self.band_label(int(typed.band[rid])), hour, self._entity(call), ts
+
+    def _add(self, rid):
+        entry = self._entry(rid)
+        if entry is None:
+            return
+        self._entries[rid] = entry
+        call, band, hour, entity, ts = entry
+        self.calls[call] += 1
+        self.bands[band] += 1
+        if hour is not None:
+            self.hours[hour] += 1
+            insort(self._stamps, ts)
+        self.entities[entity] += 1
+        self.version += 1
+
+    def _discard(self, rid):
+        entry = self._entries.pop(rid, None)
+        if entry is None:
+            return
+        call, band, hour, entity, ts = entry
+        for counter, key in ((self.calls, call), (self.bands, band), (self.entities, entity)):
+            counter[key] -= 1
+            if not counter[key]:
+                del counter[key]
+        if hour is not None:
+            self.hours[hour] -= 1
+            if not self.hours[hour]:
+                del self.hours[hour]
+            del self._stamps[bisect_left(self._stamps, ts)]
+        self.version += 1
+
+    # --- LogStore listener ---
+
+    def on_insert(self, pos, rids):
+        for rid in rids:
+            self._add(rid)
+
+    def on_update(self, rid, column, old):
+        if column in STATS_COLUMNS:
+            self._discard(rid)
+            self._add(rid)
+
+    def on_remove(self, rids, positions):
+        for rid in rids:
+            self._discard(rid)
+
+    def on_restore(self, rids, positions):
+        for rid in rids:
+            self._add(rid)
+
+    def on_reset(self):
+        # Bulk path: count the typed columns with NumPy, resolve each call once
+        self._clear()
+        get = self.store.get
+        rids, calls = [], []
+        for rid in self.store.order:
+            call = normalize_callsign(get(rid, "Callsign"))
+            if call:
+                rids.append(rid)
+                calls.append(call)
+        typed = self.store.typed
+        idx = np.array(rids, dtype=np.int64)
+        ts = typed.ts[idx]
+        bands = typed.band[idx]
+        dated = ts != NO_TIME
+        hours = np.where(dated, (ts // 3600) % 24, -1)
+        entity_of = {call: self._entity(call) for call in set(calls)}
+        for rid, call, band, hour, stamp in zip(rids, calls, bands.tolist(), hours.tolist(), ts.tolist()):
+            self._entries[rid] = (call, self.band_label(band), hour if hour >= 0 else None, entity_of[call], stamp)
+        self.calls.update(calls)
+        self.entities.update(entity_of[call] for call in calls)
+        codes, counts = np.unique(bands, return_counts=True)
+        self.bands.update({self.band_label(int(c)): int(n) for c, n in zip(codes, counts)})
+        codes, counts = np.unique(hours[dated], return_counts=True)
+        self.hours.update({int(c): int(n) for c, n in zip(codes, counts)})
+        self._stamps = np.sort(ts[dated]).tolist()
+        self.version += 1
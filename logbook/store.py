@@ -0,0 +1,255 @@
+"""Headless QSO storage shared by the GUI logbook and the command line tools."""
+from contextlib import contextmanager
+import numpy as np
+from .typed import TypedColumns, TYPED_COLUMNS
+
+COLUMNS = ["Name", "Date", "Time", "Callsign", "Place", "Freq", "Band", "Grid"]
+
+
+class LogStore:
+    """Columnar QSO table addressed by stable record ids.
+
+    A record id (rid) is assigned when a row is inserted and is never changed
+    or reused, so indexes built on top of the store can follow a QSO across
+    sorts and edits. ``order`` holds the live rids in display order.
+
+    Listeners are notified after every mutation through any of
+    ``on_insert(pos, rids)``, ``on_update(rid, column, old)``,
+    ``on_remove(rids, positions)``, ``on_restore(rids, positions)``,
+    ``on_add_column(name)``, ``on_reorder(keys)`` and
+    ``on_reset()`` they define; ``on_before_reset()`` and
+    ``on_before_reorder()`` run while the old table or order is still in
+    place. ``keys`` is None when an explicit order was put back. Removed rows
+    stay readable so listeners can unindex them, and so a delete can be
+    undone without copying the row. Mutations made inside ``transaction()``
+    are bracketed by ``on_begin(undoable)`` and ``on_end()`` so they can be
+    treated as one change.
+    """
+
+    def __init__(self, columns=None, rows=0):
+        self.columns = list(columns or COLUMNS)
+        self._data = {col: [] for col in self.columns}
+        self._size = 0
+        self.order = []
+        self.listeners = []
+        self._positions = None
+        self.typed = TypedColumns()
+        self._depth = 0
+        if rows:
+            self.extend([{}] * rows)
+
+    def __len__(self):
+        return len(self.order)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in list(self.listeners):
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(*args)
+
+    @contextmanager
+    def transaction(self, undoable=True):
+        """Group the mutations of a block into one change (one undo step).
+
+        With ``undoable=False`` the change is kept out of the undo history,
+        e.g. for blank rows padded in by the GUI.
+        """
+        self._depth += 1
+        if self._depth == 1:
+            self._notify("on_begin", undoable)
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._notify("on_end")
+
+    def positions(self):
+        """Map rid -> display position, rebuilt lazily after bulk changes."""
+        if self._positions is None:
+            self._positions = {rid: pos for pos, rid in enumerate(self.order)}
+        return self._positions
+
+    def _shift(self, start):
+        """Renumber cached positions from ``start`` on; appending costs only the new rows."""
+        if self._positions is not None:
+            order = self.order
+            for pos in range(start, len(order)):
+                self._positions[order[pos]] = pos
+
+    def column_index(self, name):
+        return self.columns.index(name) if name in self.columns else -1
+
+    def add_column(self, name):
+        if name in self._data:
+            return
+        self.columns.append(name)
+        self._data[name] = [""] * self._size
+        self._notify("on_add_column", name)
+
+    def get(self, rid, column):
+        values = self._data.get(column)
+        return values[rid] if values is not None else ""
+
+    def record(self, rid):
+        return {col: self._data[col][rid] for col in self.columns}
+
+    def is_blank(self, rid):
+        return not any(self._data[col][rid] for col in self.columns)
+
+    def records(self):
+        """Yield (rid, record) pairs in display order."""
+        for rid in self.order:
+            yield rid, self.record(rid)
+
+    def rows(self):
+        """Return every live row as a list of values in column order."""
+        data = [self._data[col] for col in self.columns]
+        return [[values[rid] for values in data] for rid in self.order]
+
+    def _alloc(self, values):
+        rid = self._size
+        self._size += 1
+        if isinstance(values, dict):
+            for col in self.columns:
+                self._data[col].append(values.get(col, ""))
+        else:
+            values = list(values or ())
+            values += [""] * (len(self.columns) - len(values))
+            for col, value in zip(self.columns, values):
+                self._data[col].append(value)
+        return rid
+
+    def insert_rows(self, pos, rows):
+        """Insert rows (dicts or value lists) at a display position, return their rids."""
+        rids = [self._alloc(values) for values in rows]
+        if rids:
+            self.typed.reserve(self._size)
+            for rid in rids:
+                self.typed.update(rid, self.get)
+            self.order[pos:pos] = rids
+            self._shift(pos)
+            self._notify("on_insert", pos, rids)
+        return rids
+
+    def insert(self, pos, values=None):
+        return self.insert_rows(pos, [values])[0]
+
+    def extend(self, rows):
+        return self.insert_rows(len(self.order), rows)
+
+    def set(self, rid, column, value, typed=None):
+        """Set one cell. ``typed`` is the parsed value of a typed column, if known."""
+        if column not in self._data:
+            self.add_column(column)
+        old = self._data[column][rid]
+        if old == value:
+            return
+        self._data[column][rid] = value
+        if column in TYPED_COLUMNS:
+            self.typed.update(rid, self.get, column, typed)
+        self._notify("on_update", rid, column, old)
+
+    def remove(self, rids):
+        rids = list(rids)
+        if not rids:
+            return
+        if len(rids) == 1:
+            positions = [self.order.index(rids[0])]
+            del self.order[positions[0]]
+            if self._positions is not None:
+                del self._positions[rids[0]]
+                self._shift(positions[0])
+        else:
+            dropped = set(rids)
+            positions = [pos for pos, rid in enumerate(self.order) if rid in dropped]
+            rids = [self.order[pos] for pos in positions]
+            self.order = [rid for rid in self.order if rid not in dropped]
+            self._positions = None
+        self._notify("on_remove", rids, positions)
+
+    def restore(self, rids, positions):
+        """Put removed rows back at their old display positions."""
+        for rid, pos in sorted(zip(rids, positions), key=lambda pair: pair[1]):
+            self.order.insert(pos, rid)
+        self._positions = None
+        self._notify("on_restore", list(rids), list(positions))
+
+    def sort(self, keys):
+        """Stable multi-column sort of the display order, done in bulk.
+
+        ``keys`` is a list of (column, descending) pairs, most significant
+        first. Typed columns use their precomputed arrays, text columns are
+        ranked once, and the whole order comes out of a single lexsort.
+        """
+        keys = [(column, bool(descending)) for column, descending in keys if column in self._data]
+        if not keys or not self.order:
+            return
+        order = np.asarray(self.order, dtype=np.int64)
+        arrays = [self._sort_key(column, order, descending) for column, descending in reversed(keys)]
+        self._notify("on_before_reorder")
+        self.order = order[np.lexsort(arrays)].tolist()
+        self._positions = None
+        self._notify("on_reorder", keys)
+
+    def reorder(self, order):
+        """Put the live rows back in a given display order, e.g. to undo a sort.
+
+        Rows missing from ``order`` (added since, like padding kept out of
+        the undo history) stay at the end; rows no longer live are dropped.
+        """
+        live = set(self.order)
+        order = [rid for rid in order if rid in live]
+        placed = set(order)
+        order += [rid for rid in self.order if rid not in placed]
+        self._notify("on_before_reorder")
+        self.order = order
+        self._positions = None
+        self._notify("on_reorder", None)
+
+    def _sort_key(self, column, order, descending):
+        if column in TYPED_COLUMNS:
+            return self.typed.sort_key(column, order, descending)
+        values = self._data[column]
+        text = np.array([str(values[rid]) for rid in order.tolist()])
+        _, ranks = np.unique(text, return_inverse=True)
+        return -ranks if descending else ranks
+
+    def reset(self, rows=(), columns=None):
+        """Replace the whole table, e.g. after importing a log."""
+        self._notify("on_before_reset")
+        if columns is not None:
+            self.columns = list(columns)
+        self._data = {col: [] for col in self.columns}
+        self._size = 0
+        self.order = [self._alloc(values) for values in rows]
+        self._positions = None
+        self.typed.load(self._data, self._size)
+        self._notify("on_reset")
+
+    def snapshot(self):
+        """Return the table state, rids included. Valid until the next mutation."""
+        return {
+            "columns": list(self.columns),
+            "data": self._data,
+            "size": self._size,
+            "order": list(self.order),
+        }
+
+    def load_snapshot(self, snapshot):
+        """Replace the whole table with a snapshot, keeping its rids."""
+        self._notify("on_before_reset")
+        self.columns = list(snapshot["columns"])
+        self._data = {col: list(snapshot["data"][col]) for col in self.columns}
+        self._size = snapshot["size"]
+        self.order = list(snapshot["order"])
+        self._positions = None
+        self.typed.load(self._data, self._size)
+        self._notify("on_reset")
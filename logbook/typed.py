@@ -0,0 +1,74 @@
+"""Typed NumPy mirrors of logbook columns, used as precomputed sort keys."""
+import numpy as np
+from .fields import (
+    NO_BAND, parse_time, parse_date, parse_freq, band_code,
+    parse_times, parse_dates, parse_freqs, band_codes,
+)
+
+NO_TIME = np.iinfo(np.int64).max
+TYPED_COLUMNS = ("Date", "Time", "Freq", "Band")
+MISSING_LAST = np.iinfo(np.int16).max
+
+
+class TypedColumns:
+    """Per-rid UTC timestamp (int64 s), frequency (float64 MHz) and band code (int8).
+
+    The text columns stay the source of truth; these arrays are kept in step
+    with them so sorting never has to parse or compare strings. A QSO without
+    a date gets a time-of-day timestamp, a missing time is NO_TIME and a band
+    is derived from the frequency when its label is blank.
+    """
+
+    def __init__(self, capacity=1024):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.ts = np.full(capacity, NO_TIME, dtype=np.int64)
+        self.freq = np.full(capacity, np.nan)
+        self.band = np.full(capacity, NO_BAND, dtype=np.int8)
+
+    def reserve(self, size):
+        capacity = len(self.ts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self.ts)
+        self.ts = np.concatenate([self.ts, np.full(extra, NO_TIME, dtype=np.int64)])
+        self.freq = np.concatenate([self.freq, np.full(extra, np.nan)])
+        self.band = np.concatenate([self.band, np.full(extra, NO_BAND, dtype=np.int8)])
+
+    def update(self, rid, get, column=None, typed=None):
+        """Recompute one row from its text, ``typed`` short-cuts parsing ``column``."""
+        if column in (None, "Date", "Time"):
+            minutes = typed if column == "Time" and typed is not None else parse_time(get(rid, "Time"))
+            days = parse_date(get(rid, "Date")) or 0
+            self.ts[rid] = NO_TIME if minutes is None else (days * 1440 + minutes) * 60
+        if column in (None, "Freq", "Band"):
+            freq = typed if column == "Freq" and typed is not None else parse_freq(get(rid, "Freq"))
+            self.freq[rid] = np.nan if freq is None else freq
+            self.band[rid] = band_code(get(rid, "Band"), freq)
+
+    def load(self, data, size):
+        """Rebuild every array from whole text columns at once."""
+        self._allocate(max(size, 1024))
+        blank = [""] * size
+        minutes = parse_times(data.get("Time", blank))
+        days = np.nan_to_num(parse_dates(data.get("Date", blank)))
+        valid = ~np.isnan(minutes)
+        self.ts[:size][valid] = ((days[valid] * 1440 + minutes[valid]) * 60).astype(np.int64)
+        freqs = parse_freqs(data.get("Freq", blank))
+        self.freq[:size] = freqs
+        self.band[:size] = band_codes(data.get("Band", blank), freqs)
+
+    def sort_key(self, column, rids, descending=False):
+        """Sort key array for ``rids``; missing values sort last either way."""
+        if column in ("Date", "Time"):
+            key = self.ts[rids]
+            return np.where(key == NO_TIME, NO_TIME, -key) if descending else key
+        if column == "Freq":
+            key = self.freq[rids]
+            return -key if descending else key
+        key = self.band[rids].astype(np.int16)
+        key = -key if descending else key
+        return np.where(self.band[rids] == NO_BAND, MISSING_LAST, key)
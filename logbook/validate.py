@@ -0,0 +1,136 @@
+"""Column-at-a-time validation and normalization of imported logs."""
+import re
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from .fields import BAND_CODES, parse_times, parse_dates, parse_freqs
+from .maidenhead import LOCATOR_RE
+
+CALL_RE = re.compile(r"^(?=[A-Z0-9/]*\d)(?=[A-Z0-9/]*[A-Z])[A-Z0-9]+(?:/[A-Z0-9]+)*$")
+TIME_LABELS = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)], dtype=object)
+REPORT_COLUMNS = ["Row", "Column", "Value", "Error"]
+
+Validation = namedtuple("Validation", "rows report")
+
+
+def _text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d" if value == value.normalize() else "%Y-%m-%d %H:%M")
+    return str(value).strip()
+
+
+def _column(series):
+    """Factorize a column into (codes, distinct values as text).
+
+    Every check below runs over the distinct values only and is broadcast
+    back through the codes, so a column of repeated times, bands and calls
+    costs one pass per distinct value. Missing cells (NaN, None) are "".
+    """
+    codes, uniques = pd.factorize(series)
+    texts = [_text(value) for value in uniques] + [""]
+    return np.where(codes < 0, len(texts) - 1, codes), pd.Series(texts, dtype=object)
+
+
+def _calls(text):
+    text = text.str.upper()
+    return text.to_numpy(), ~text.str.match(CALL_RE).to_numpy(dtype=bool)
+
+
+def _dates(text):
+    days = parse_dates(text)
+    valid = ~np.isnan(days)
+    out = text.to_numpy().copy()
+    out[valid] = pd.to_datetime(days[valid], unit="D").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    return out, ~valid
+
+
+def _times(text):
+    minutes = parse_times(text)
+    valid = ~np.isnan(minutes)
+    out = text.to_numpy().copy()
+    out[valid] = TIME_LABELS[minutes[valid].astype(int)]
+    return out, ~valid
+
+
+def _freqs(text):
+    text = text.str.replace(",", ".", regex=False)
+    return text.to_numpy(), np.isnan(parse_freqs(text))
+
+
+def _bands(text):
+    text = text.str.lower().str.replace(" ", "", regex=False)
+    return text.to_numpy(), ~text.isin(list(BAND_CODES)).to_numpy()
+
+
+def _grids(text):
+    text = text.str.upper()
+    return text.to_numpy(), ~text.str.match(LOCATOR_RE).to_numpy(dtype=bool)
+
+
+# column -> (normalizer, error message); "" is never an error here
+CHECKS = {
+    "Callsign": (_calls, "invalid callsign"),
+    "Date": (_dates, "invalid date"),
+    "Time": (_times, "invalid time"),
+    "Freq": (_freqs, "invalid frequency"),
+    "Band": (_bands, "unknown band"),
+    "Grid": (_grids, "invalid locator"),
+}
+
+
+def validate_frame(df, number_column=None, start=1):
+    """Normalize a whole log DataFrame and flag the rows that fail validation.
+
+    Callsigns are uppercased, times become "HH:MM", dates "YYYY-MM-DD",
+    bands lowercase labels and frequencies use a decimal point. Fully blank
+    rows are dropped. Returns ``Validation(rows, report)``: the valid rows as
+    dicts of text, and a DataFrame with one line per rejected row, ``Row``
+    counting data rows from ``start``. Only the first problem of each row is
+    reported. ``number_column`` adds that row number to every valid row.
+    """
+    columns = [str(col) for col in df.columns]
+    n = len(df)
+    text = {}
+    blank = np.ones(n, dtype=bool)
+    bad = np.zeros(n, dtype=bool)
+    report = []
+    for col, (_, series) in zip(columns, df.items()):
+        codes, uniques = _column(series)
+        empty = (uniques == "").to_numpy()
+        blank &= empty[codes]
+        check = CHECKS.get(col)
+        if check is None:
+            text[col] = uniques.to_numpy()[codes]
+            continue
+        normalize, error = check
+        values, invalid = normalize(uniques)
+        text[col] = values[codes]
+        failed = (invalid & ~empty)[codes] & ~bad
+        if failed.any():
+            report.append(pd.DataFrame({"Row": np.flatnonzero(failed) + start, "Column": col,
+                                        "Value": uniques.to_numpy()[codes[failed]], "Error": error}))
+            bad |= failed
+    if "Callsign" in text:
+        missing = (text["Callsign"] == "") & ~blank & ~bad
+        if missing.any():
+            report.append(pd.DataFrame({"Row": np.flatnonzero(missing) + start, "Column": "Callsign",
+                                        "Value": "", "Error": "missing callsign"}))
+            bad |= missing
+    keep = np.flatnonzero(~(bad | blank))
+    if number_column is not None:
+        columns = columns + [number_column]
+        text[number_column] = (np.arange(n) + start).astype(str).astype(object)
+    arrays = [text[col][keep] for col in columns]
+    rows = [dict(zip(columns, values)) for values in zip(*arrays)]
+    report = pd.concat(report).sort_values("Row", kind="stable") if report else pd.DataFrame(columns=REPORT_COLUMNS)
+    return Validation(rows, report.reset_index(drop=True))
+
+
+def format_report(report, limit=None):
+    """Render a bad-row report as text, one rejected row per line."""
+    lines = [f"Row {r.Row}: {r.Error} in {r.Column} ({r.Value!r})" for r in report.itertuples(index=False)]
+    if limit is not None and len(lines) > limit:
+        lines = lines[:limit] + [f"... and {len(lines) - limit} more"]
+    return "\n".join(lines)
@@ -0,0 +1,139 @@
+"""Live spots from an RBN / DX-cluster telnet feed.
+
+ClusterClient reads the feed on its own thread, splits it into lines as
+bytes arrive and hands each parsed Spot to a callback; a SpotStore
+(propagation.spots) keeps them for the map.
+"""
+import re
+import socket
+import threading
+import time
+from collections import namedtuple
+from logbook.fields import band_for_freq
+
+CLUSTER_HOST = "telnet.reversebeacon.net"
+CLUSTER_PORT = 7000
+RECONNECT_DELAYS = (2, 5, 15, 30, 60)  # seconds
+READ_TIMEOUT = 300  # seconds without a byte before the link counts as dead
+LOGIN_PROMPTS = (b"call:", b"login:", b"callsign:")
+SPOT_RE = re.compile(
+    r"^DX de ([A-Z0-9/]+)(?:-[#\d]+)?:?\s+(\d+(?:\.\d+)?)\s+([A-Z0-9/]+)\s+(.*?)\s*"
+    r"(?:(\d{4})Z(?:\s+([A-R]{2}\d{2}(?:[A-X]{2})?))?)?\s*$",
+    re.IGNORECASE,
+)
+MODE_RE = re.compile(r"\b(CW|RTTY|FT8|FT4|PSK31|SSB|USB|LSB|FM|AM)\b", re.IGNORECASE)
+SNR_RE = re.compile(r"(-?\d+)\s*dB", re.IGNORECASE)
+
+# lat/lon: where the spot is drawn, filled in by whoever locates the spotter;
+# grid: the spotter's locator, when the node appends it after the time
+Spot = namedtuple("Spot", "time spotter dx freq band mode snr lat lon grid", defaults=(None, None, ""))
+
+
+def parse_spot(line, now=None):
+    """Parse a "DX de ..." cluster line into a Spot, or None for any other line.
+
+    ``freq`` is in kHz as the cluster sends it; ``time`` is when the spot
+    was received (epoch seconds).
+    """
+    match = SPOT_RE.match(line.strip())
+    if not match:
+        return None
+    spotter, freq, dx, comment, _, grid = match.groups()
+    freq = float(freq)
+    mode = MODE_RE.search(comment)
+    snr = SNR_RE.search(comment)
+    return Spot(
+        time.time() if now is None else now,
+        spotter.upper(),
+        dx.upper(),
+        freq,
+        band_for_freq(freq / 1000),
+        mode.group(1).upper() if mode else "",
+        int(snr.group(1)) if snr else None,
+        grid=(grid or "").upper(),
+    )
+
+
+class ClusterClient:
+    """Telnet cluster connection on a daemon thread, reconnecting until stopped.
+
+    ``on_spot(spot)`` and ``on_status(text)`` are called on that thread. A
+    link silent for ``read_timeout`` seconds is dropped and dialled again,
+    so a half-open connection cannot stall the feed forever.
+    """
+
+    def __init__(self, callsign, host=CLUSTER_HOST, port=CLUSTER_PORT, on_spot=None, on_status=None, timeout=30,
+                 read_timeout=READ_TIMEOUT):
+        self.callsign = callsign.strip().upper()
+        self.host = host
+        self.port = port
+        self.on_spot = on_spot or (lambda spot: None)
+        self.on_status = on_status or (lambda text: None)
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self._stop = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="talasnik-cluster", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Disconnect without waiting; the thread ends on its own."""
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                self._session()
+                attempt = 0
+            except OSError as e:
+                if self._stop.is_set():
+                    break
+                self.on_status(f"Cluster connection lost: {e}")
+            delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+            attempt += 1
+            self._stop.wait(delay)
+
+    def _session(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            self._sock = sock
+            try:
+                # A timeout is an OSError, so _run reports it and reconnects
+                sock.settimeout(self.read_timeout)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                self.on_status(f"Connected to {self.host}:{self.port}")
+                self._read(sock)
+            finally:
+                self._sock = None
+
+    def _read(self, sock):
+        buffer = b""
+        logged_in = False
+        while not self._stop.is_set():
+            data = sock.recv(4096)
+            if not data:
+                return
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                spot = parse_spot(line.decode("ascii", errors="replace"))
+                if spot is not None:
+                    self.on_spot(spot)
+            # The login prompt has no newline after it
+            if not logged_in and buffer.rstrip().lower().endswith(LOGIN_PROMPTS):
+                sock.sendall(self.callsign.encode("ascii") + b"\r\n")
+                logged_in = True
+                buffer = b""
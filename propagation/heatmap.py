@@ -0,0 +1,64 @@
+"""Aggregate spots into Maidenhead grid squares for map layers.
+
+Binning is one vectorized locator conversion plus np.unique, so the size
+of the layers drawn from it depends on the number of occupied squares
+(at most 32400 four-character squares), not on the number of spots.
+"""
+import numpy as np
+from logbook.maidenhead import LAT_STEPS, LON_STEPS, from_locators, to_locators
+
+GRID_LENGTH = 4  # 2: fields (20x10 degrees), 4: squares (2x1 degrees)
+MAX_CELLS = 3000  # past this many occupied squares, bin by field instead
+LEVELS = 5  # count levels, so the layer needs at most this many styles
+
+
+def grid_bins(lat, lon, length=GRID_LENGTH):
+    """Spot counts per grid square: (locators, counts, centre lat, centre lon)."""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    ok = ~(np.isnan(lat) | np.isnan(lon))
+    locators = to_locators(lat[ok], lon[ok], length)
+    if not len(locators):
+        empty = np.array([], dtype=float)
+        return np.array([], dtype=object), np.array([], dtype=np.int64), empty, empty
+    squares, counts = np.unique(locators.astype(str), return_counts=True)
+    placed = squares != ""
+    squares, counts = squares[placed], counts[placed]
+    centre_lat, centre_lon = from_locators(squares)
+    return squares.astype(object), counts, centre_lat, centre_lon
+
+
+def heat_points(lat, lon, length=GRID_LENGTH):
+    """[lat, lon, weight] per occupied square, weights scaled to 0..1."""
+    _, counts, centre_lat, centre_lon = grid_bins(lat, lon, length)
+    if not len(counts):
+        return []
+    weights = counts / counts.max()
+    return np.column_stack([centre_lat, centre_lon, weights]).round(4).tolist()
+
+
+def grid_geojson(lat, lon, length=GRID_LENGTH, max_cells=MAX_CELLS):
+    """GeoJSON FeatureCollection with one rectangle per occupied square.
+
+    Each feature carries its square, spot count and a 1..LEVELS level of
+    the count relative to the busiest square, for styling.
+    """
+    squares, counts, centre_lat, centre_lon = grid_bins(lat, lon, length)
+    if len(squares) > max_cells and length > 2:
+        length = 2
+        squares, counts, centre_lat, centre_lon = grid_bins(lat, lon, length)
+    levels = np.ceil(LEVELS * counts / counts.max()).astype(int) if len(counts) else counts
+    half_lat = LAT_STEPS[length // 2 - 1] / 2
+    half_lon = LON_STEPS[length // 2 - 1] / 2
+    features = []
+    for square, count, level, clat, clon in zip(squares.tolist(), counts.tolist(), levels.tolist(),
+                                                centre_lat.tolist(), centre_lon.tolist()):
+        south, north, west, east = clat - half_lat, clat + half_lat, clon - half_lon, clon + half_lon
+        features.append({
+            "type": "Feature",
+            "properties": {"square": square, "count": count, "level": level},
+            "geometry": {"type": "Polygon", "coordinates": [[
+                [west, south], [east, south], [east, north], [west, north], [west, south],
+            ]]},
+        })
+    return {"type": "FeatureCollection", "features": features}
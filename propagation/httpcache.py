@@ -0,0 +1,169 @@
+"""Shared HTTP cache for the propagation and price feeds.
+
+Each URL has a time to live. A fresh entry is served with no network
+round trip; a stale one is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged feed costs a 304 with no body. For a
+grace period past the TTL the stale entry is served at once and
+revalidated in the background (stale-while-revalidate), and on a network
+error any stored entry beats no data at all. Entries persist on disk as
+the raw body plus a small JSON metadata file per URL, so a restart still
+opens instantly.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+CACHE_DIR = "talasnik_http_cache"
+CACHE_VERSION = 2
+DEFAULT_TTL = 300  # seconds
+STALE_TTL = 3600  # seconds past the TTL a stale entry may still be served while revalidating
+# Per-URL time to live in seconds, matched by URL prefix
+TTLS = {
+    "https://www.hamqsl.com/solarjson.php": 3600,
+    "https://reversebeacon.net/spots.php": 60,
+    "https://metals-api.com/": 86400,
+}
+
+Entry = namedtuple("Entry", "url status body etag last_modified fetched")
+
+
+class HttpCache:
+    """TTL + ETag cache in memory and on disk; safe to share between threads."""
+
+    def __init__(self, directory=CACHE_DIR, ttls=None, default_ttl=DEFAULT_TTL, stale_ttl=STALE_TTL,
+                 session=None, clock=time.time):
+        self.directory = directory
+        self.ttls = TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.session = session or requests.Session()
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._revalidating = {}  # url -> future
+        self._pool = None
+
+    def ttl(self, url):
+        best = None
+        for prefix, ttl in self.ttls.items():
+            if url.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.ttls[best] if best is not None else self.default_ttl
+
+    def _path(self, url):
+        """Path stem of the ``.body`` and ``.json`` files of ``url``."""
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+
+    def peek(self, url):
+        """The stored entry for ``url``, however old, without touching the network."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+        path = self._path(url)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.pop("version") != CACHE_VERSION or meta["url"] != url:
+                return None
+            size = meta.pop("size")
+            with open(path + ".body", "rb") as f:
+                body = f.read()
+            entry = Entry(body=body, **meta)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+        if len(body) != size:
+            return None  # the body was replaced after this metadata was written
+        with self._lock:
+            self._entries.setdefault(url, entry)
+        return entry
+
+    def _store(self, entry):
+        with self._lock:
+            self._entries[entry.url] = entry
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(entry.url)
+            meta = {**entry._asdict(), "version": CACHE_VERSION, "size": len(entry.body)}
+            del meta["body"]
+            with open(path + ".body.tmp", "wb") as f:
+                f.write(entry.body)
+            with open(path + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(path + ".body.tmp", path + ".body")
+            os.replace(path + ".json.tmp", path + ".json")
+        except OSError:
+            pass  # the memory copy still serves this session
+
+    def _fetch(self, url, entry, timeout):
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        r = self.session.get(url, headers=headers, timeout=timeout)
+        now = self.clock()
+        if r.status_code == 304 and entry is not None:
+            entry = entry._replace(fetched=now)
+        elif r.status_code == 200:
+            entry = Entry(url, r.status_code, r.content, r.headers.get("ETag"), r.headers.get("Last-Modified"), now)
+        else:
+            raise requests.HTTPError(f"HTTP {r.status_code} for {url}")
+        self._store(entry)
+        return entry
+
+    def _revalidate(self, url, entry, timeout):
+        with self._lock:
+            if url in self._revalidating:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="talasnik-http")
+            future = self._pool.submit(self._fetch, url, entry, timeout)
+            self._revalidating[url] = future
+        future.add_done_callback(lambda f: self._revalidating.pop(url, None))
+
+    def get(self, url, timeout=10):
+        """Return the Entry for ``url``, from cache when the TTL allows."""
+        entry = self.peek(url)
+        if entry is not None:
+            age = self.clock() - entry.fetched
+            ttl = self.ttl(url)
+            if age < ttl:
+                return entry
+            if age < ttl + self.stale_ttl:
+                self._revalidate(url, entry, timeout)
+                return entry
+        try:
+            return self._fetch(url, entry, timeout)
+        except (requests.RequestException, OSError):
+            if entry is not None:
+                return entry
+            raise
+
+    def get_json(self, url, timeout=10):
+        entry = self.get(url, timeout)
+        if not entry.body.strip():
+            raise ValueError(f"Empty response from {url}")
+        return json.loads(entry.body)
+
+    def wait(self):
+        """Block until background revalidations finish."""
+        for future in list(self._revalidating.values()):
+            future.exception()
+
+
+_shared = None
+
+
+def http_cache():
+    """The process-wide cache the dialogs share."""
+    global _shared
+    if _shared is None:
+        _shared = HttpCache()
+    return _shared
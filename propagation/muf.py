@@ -0,0 +1,149 @@
+"""Offline HF path prediction from the QTH to a world grid.
+
+A deliberately simple F2-layer model: the critical frequency foF2 at a
+path's control points follows the sunspot number (derived from SFI) and
+the solar zenith angle, and is depressed at high latitudes when K is
+raised. The MUF is foF2 times an obliquity factor for the hop length; the
+LUF rises with daytime D-layer absorption. Every grid point is computed
+at once with NumPy, and predictions are cached per hour and band.
+"""
+from collections import namedtuple
+import numpy as np
+from logbook.fields import BANDS
+from logbook.maidenhead import EARTH_RADIUS_KM, distance_bearing
+from .sun import cos_zenith, subsolar_point
+
+GRID_STEP = 2.0  # degrees between grid points
+MAX_HOP_KM = 4000
+CONTROL_KM = 2000  # control points this far from each end on multi-hop paths
+M3000 = 3.0  # MUF / foF2 for a 3000 km hop
+FOF2_DAY = (6.0, 0.04)  # noon foF2 in MHz: base + per sunspot
+FOF2_NIGHT = (2.5, 0.015)
+STORM_DEPRESSION = 0.08  # foF2 lost per K step above 3, at high latitudes
+LUF_NIGHT = 1.0  # MHz
+LUF_DAY = 8.0  # MHz added with the sun overhead at a control point
+FOT_RATIO = 0.85  # below this share of the MUF a band counts as open, not marginal
+CLOSED, MARGINAL, OPEN = 0, 1, 2
+STATE_NAMES = {MARGINAL: "marginal", OPEN: "open"}
+CACHE_SIZE = 48  # predictions kept, one per hour/band/conditions
+
+Prediction = namedtuple("Prediction", "hour band freq lat lon muf luf state")
+
+_cache = {}
+
+
+def sunspot_number(sfi):
+    """Sunspot number from the 10.7 cm flux, inverting SFI = 63.7 + 0.728 R + 0.00089 R^2."""
+    a, b, c = 0.00089, 0.728, 63.7 - float(sfi)
+    return max(0.0, (-b + np.sqrt(max(b * b - 4 * a * c, 0.0))) / (2 * a))
+
+
+def band_freq(band):
+    """Centre frequency in MHz of a band label."""
+    for label, lower, upper in BANDS:
+        if label == band:
+            return (lower + upper) / 2
+    raise ValueError(f"Unknown band {band!r}")
+
+
+def world_grid(step=GRID_STEP):
+    """(lat, lon) 2-D arrays of cell centres, rows south to north."""
+    lat = np.arange(-90 + step / 2, 90, step)
+    lon = np.arange(-180 + step / 2, 180, step)
+    return np.meshgrid(lat, lon, indexing="ij")
+
+
+def along_path(lat1, lon1, bearing, km):
+    """Points ``km`` along great circles leaving (lat1, lon1) on ``bearing``."""
+    p1, l1, b = np.radians(lat1), np.radians(lon1), np.radians(bearing)
+    a = np.asarray(km) / EARTH_RADIUS_KM
+    p2 = np.arcsin(np.sin(p1) * np.cos(a) + np.cos(p1) * np.sin(a) * np.cos(b))
+    l2 = l1 + np.arctan2(np.sin(b) * np.sin(a) * np.cos(p1), np.cos(a) - np.sin(p1) * np.sin(p2))
+    return np.degrees(p2), (np.degrees(l2) + 180) % 360 - 180
+
+
+def fof2(lat, cos_chi, ssn, k):
+    """F2 critical frequency (MHz) at points with the given solar zenith cosines."""
+    day = FOF2_DAY[0] + FOF2_DAY[1] * ssn
+    night = FOF2_NIGHT[0] + FOF2_NIGHT[1] * ssn
+    f = night + (day - night) * np.sqrt(np.clip(cos_chi, 0, 1))
+    storm = 1 - STORM_DEPRESSION * max(k - 3, 0) * np.clip((np.abs(lat) - 45) / 30, 0, 1)
+    return f * np.clip(storm, 0.3, 1)
+
+
+def path_muf(qth_lat, qth_lon, lat, lon, sun, ssn, k):
+    """(MUF, LUF) in MHz from the QTH to each point, for ``sun`` from subsolar_point()."""
+    distance, bearing = distance_bearing(qth_lat, qth_lon, lat, lon)
+    hops = np.maximum(1, np.ceil(distance / MAX_HOP_KM))
+    obliquity = 1 + (M3000 - 1) * np.minimum(distance / hops, MAX_HOP_KM) / 3000
+    # One control point mid-path, or one 2000 km from each end on longer paths
+    single = distance <= MAX_HOP_KM
+    near = np.where(single, distance / 2, CONTROL_KM)
+    far = np.where(single, distance / 2, distance - CONTROL_KM)
+    worst_f, worst_cos = None, None
+    for km in (near, far):
+        clat, clon = along_path(qth_lat, qth_lon, bearing, km)
+        cos_chi = cos_zenith(clat, clon, sun)
+        f = fof2(clat, cos_chi, ssn, k)
+        worst_f = f if worst_f is None else np.minimum(worst_f, f)
+        worst_cos = cos_chi if worst_cos is None else np.maximum(worst_cos, cos_chi)
+    muf = worst_f * obliquity
+    luf = LUF_NIGHT + LUF_DAY * np.clip(worst_cos, 0, 1)
+    return muf, luf
+
+
+def band_state(muf, luf, freq):
+    """OPEN below the optimum working frequency, MARGINAL up to the MUF, else CLOSED."""
+    state = np.where(freq <= FOT_RATIO * muf, OPEN, np.where(freq <= muf, MARGINAL, CLOSED))
+    return np.where(freq < luf, CLOSED, state).astype(np.int8)
+
+
+def predict(qth_lat, qth_lon, sfi, k, band, when, step=GRID_STEP):
+    """Prediction for the hour containing ``when`` (epoch seconds), cached per hour and band."""
+    hour = int(when // 3600)
+    key = (round(qth_lat, 2), round(qth_lon, 2), float(sfi), float(k), band, hour, step)
+    prediction = _cache.get(key)
+    if prediction is None:
+        freq = band_freq(band)
+        lat, lon = world_grid(step)
+        sun = subsolar_point(hour * 3600 + 1800)  # mid-hour
+        muf, luf = path_muf(qth_lat, qth_lon, lat, lon, sun, sunspot_number(sfi), float(k))
+        prediction = Prediction(hour, band, freq, lat, lon, muf, luf, band_state(muf, luf, freq))
+        if len(_cache) >= CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+        _cache[key] = prediction
+    return prediction
+
+
+def openings_geojson(prediction):
+    """GeoJSON with one MultiPolygon per open/marginal state.
+
+    Equal neighbouring cells of each grid row are merged into one
+    rectangle, so the layer stays small however fine the grid.
+    """
+    state = prediction.state
+    rows, cols = state.shape
+    step = 180.0 / rows
+    change = np.ones(state.shape, dtype=bool)
+    change[:, 1:] = state[:, 1:] != state[:, :-1]
+    starts = np.flatnonzero(change)  # each row starts a run, so runs never span rows
+    ends = np.append(starts[1:], state.size)
+    values = state.ravel()[starts]
+    row = starts // cols
+    south = -90 + row * step
+    west = -180 + (starts % cols) * step
+    east = -180 + ((ends - 1) % cols + 1) * step
+    features = []
+    for value, name in STATE_NAMES.items():
+        keep = values == value
+        polygons = [
+            [[[w, s], [e, s], [e, s + step], [w, s + step], [w, s]]]
+            for s, w, e in zip(south[keep].tolist(), west[keep].tolist(), east[keep].tolist())
+        ]
+        if polygons:
+            features.append({
+                "type": "Feature",
+                "properties": {"state": name},
+                "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+            })
+    return {"type": "FeatureCollection", "features": features}
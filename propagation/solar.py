@@ -0,0 +1,165 @@
+"""Local history of the solar indices (SFI, A, K).
+
+Each fetched hamqsl ``solar`` sample is appended as one fixed-size binary
+record. Min/max/mean rollups per hour and per day are kept in their own
+record files and updated as samples arrive, so months of history load with
+one np.fromfile per resolution and nothing is parsed or fetched again.
+"""
+import calendar
+import os
+import time
+import numpy as np
+
+HISTORY_DIR = "talasnik_solar_history"
+# Feed key -> short name, in record order
+FIELDS = {"solarflux": "SFI", "aindex": "A", "kindex": "K"}
+PERIODS = {"hour": 3600, "day": 86400}  # seconds
+SAMPLE_DTYPE = np.dtype([("time", "<f8"), ("value", "<f4", (len(FIELDS),))])
+ROLLUP_DTYPE = np.dtype([
+    ("time", "<f8"),  # start of the period
+    ("count", "<u4", (len(FIELDS),)),
+    ("min", "<f4", (len(FIELDS),)),
+    ("max", "<f4", (len(FIELDS),)),
+    ("sum", "<f8", (len(FIELDS),)),
+])
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def sample_time(data):
+    """Epoch seconds of a sample from its "updated" field, e.g. "19 Oct 2026 1147 GMT"; None if unreadable."""
+    try:
+        return float(calendar.timegm(time.strptime(str(data.get("updated", "")).strip(), "%d %b %Y %H%M %Z")))
+    except ValueError:
+        return None
+
+
+def sample_values(data):
+    values = []
+    for key in FIELDS:
+        try:
+            values.append(float(data.get(key)))
+        except (TypeError, ValueError):
+            values.append(np.nan)
+    return values
+
+
+def rollup(samples, period):
+    """Rollup records of ``samples`` (SAMPLE_DTYPE, time ordered) per ``period`` seconds."""
+    starts = samples["time"] // period * period
+    buckets, first = np.unique(starts, return_index=True)
+    out = np.zeros(len(buckets), dtype=ROLLUP_DTYPE)
+    out["time"] = buckets
+    if not len(buckets):
+        return out
+    values = samples["value"].astype(float)
+    valid = ~np.isnan(values)
+    out["count"] = np.add.reduceat(valid.astype(np.uint32), first)
+    out["sum"] = np.add.reduceat(np.where(valid, values, 0), first)
+    out["min"] = np.fmin.reduceat(values, first)
+    out["max"] = np.fmax.reduceat(values, first)
+    return out
+
+
+def sparkline(values):
+    """One block character per value, scaled between the min and max; gaps are spaces."""
+    values = np.asarray(values, dtype=float)
+    if not len(values) or np.isnan(values).all():
+        return ""
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    levels = np.zeros(len(values), dtype=int) if hi == lo else (values - lo) / (hi - lo) * (len(SPARK_CHARS) - 1)
+    return "".join(" " if np.isnan(v) else SPARK_CHARS[int(round(level))] for v, level in zip(values, levels))
+
+
+class SolarHistory:
+    """Raw samples plus hour and day rollups, in memory and on disk."""
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.samples = self._read("samples", SAMPLE_DTYPE)
+        self.rollups = {}
+        valid = (~np.isnan(self.samples["value"])).sum(axis=0)
+        for name, period in PERIODS.items():
+            records = self._read(name, ROLLUP_DTYPE)
+            last = self.samples["time"][-1] // period * period if len(self.samples) else None
+            newest = records["time"][-1] if len(records) else None
+            if newest != last or not np.array_equal(records["count"].sum(axis=0), valid):
+                # Missing, behind or ahead of the samples: rebuild once from the raw records
+                records = rollup(self.samples, period)
+                self._write(name, records)
+            self.rollups[name] = records
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".bin")
+
+    def _read(self, name, dtype):
+        try:
+            return np.fromfile(self._path(name), dtype=dtype)
+        except (OSError, ValueError):
+            return np.zeros(0, dtype=dtype)
+
+    def _write(self, name, records, offset=None):
+        """Write ``records`` at record ``offset``, or replace the file when None."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(name)
+            mode = "wb" if offset is None else ("r+b" if os.path.exists(path) else "wb")
+            with open(path, mode) as f:
+                if offset is not None:
+                    f.seek(offset * records.dtype.itemsize)
+                f.write(records.tobytes())
+        except OSError:
+            pass  # the memory copy still serves this session
+
+    def add(self, data):
+        """Record a hamqsl ``solar`` dict; False when it is undated or not newer than the last sample."""
+        stamp = sample_time(data)
+        if stamp is None or (len(self.samples) and stamp <= self.samples["time"][-1]):
+            return False
+        sample = np.array([(stamp, sample_values(data))], dtype=SAMPLE_DTYPE)
+        self._write("samples", sample, len(self.samples))
+        self.samples = np.concatenate([self.samples, sample])
+        for name, period in PERIODS.items():
+            records = self.rollups[name]
+            bucket = rollup(sample, period)
+            if len(records) and records["time"][-1] == bucket["time"][0]:
+                last = records[-1:].copy()
+                last["count"] += bucket["count"]
+                last["sum"] += bucket["sum"]
+                last["min"] = np.fmin(last["min"], bucket["min"])
+                last["max"] = np.fmax(last["max"], bucket["max"])
+                records[-1] = last[0]
+                self._write(name, last, len(records) - 1)
+            else:
+                self._write(name, bucket, len(records))
+                self.rollups[name] = np.concatenate([records, bucket])
+        return True
+
+    def series(self, field, resolution, count, now=None):
+        """(min, max, mean) arrays of ``field`` over the last ``count`` periods, NaN where no data."""
+        period = PERIODS[resolution]
+        records = self.rollups[resolution]
+        column = list(FIELDS.values()).index(field)
+        end = (time.time() if now is None else now) // period * period
+        starts = end - period * np.arange(count - 1, -1, -1)
+        out = np.full((3, count), np.nan)
+        pos = np.minimum(np.searchsorted(records["time"], starts), max(len(records) - 1, 0))
+        found = records["time"][pos] == starts if len(records) else np.zeros(count, dtype=bool)
+        hit = records[pos[found]]
+        counts = hit["count"][:, column]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(counts > 0, hit["sum"][:, column] / counts, np.nan)
+        out[0, found] = np.where(counts > 0, hit["min"][:, column], np.nan)
+        out[1, found] = np.where(counts > 0, hit["max"][:, column], np.nan)
+        out[2, found] = mean
+        return out[0], out[1], out[2]
+
+
+_shared = None
+
+
+def solar_history():
+    """The process-wide history the dialogs share."""
+    global _shared
+    if _shared is None:
+        _shared = SolarHistory()
+    return _shared
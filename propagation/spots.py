@@ -0,0 +1,154 @@
+"""Bounded, column-oriented store for propagation spots.
+
+Spots live in preallocated NumPy ring buffers, so memory is fixed by
+``capacity`` however long the app runs. Every spot gets a sequence
+number; its slot is ``seq % capacity``. Arrival times only go forward,
+so "the last N minutes" is a binary search over sequence numbers, and
+each band keeps a deque of its sequence numbers, so a band switch reads
+only that band's spots.
+"""
+from bisect import bisect_left
+from collections import deque
+import numpy as np
+from logbook.fields import BANDS, BAND_CODES, NO_BAND
+
+SPOT_CAPACITY = 50000
+SPOT_WINDOW = 15 * 60  # seconds
+NO_SNR = np.iinfo(np.int16).min
+
+
+class SpotStore:
+    """Ring buffers of spot time, position, frequency, band, SNR and interned calls."""
+
+    def __init__(self, capacity=SPOT_CAPACITY, window=SPOT_WINDOW):
+        self.capacity = capacity
+        self.window = window
+        self.time = np.zeros(capacity)
+        self.lat = np.full(capacity, np.nan, dtype=np.float32)
+        self.lon = np.full(capacity, np.nan, dtype=np.float32)
+        self.freq = np.zeros(capacity, dtype=np.float32)
+        self.band = np.full(capacity, NO_BAND, dtype=np.int8)
+        self.snr = np.full(capacity, NO_SNR, dtype=np.int16)
+        self.spotter = np.zeros(capacity, dtype=np.int32)
+        self.dx = np.zeros(capacity, dtype=np.int32)
+        self.calls = []  # code -> call
+        self._codes = {}  # call -> code
+        self._bands = {}  # band code -> deque of seqs, oldest first
+        self.head = 0  # seq of the next spot
+        self._expired = 0  # first seq not yet reported by expire()
+
+    @classmethod
+    def from_spots(cls, spots, capacity=SPOT_CAPACITY, window=SPOT_WINDOW):
+        store = cls(max(capacity, len(spots)), window)
+        for spot in spots:
+            store.add(spot)
+        return store
+
+    def __len__(self):
+        return self.head - self.first()
+
+    def first(self, now=None):
+        """Oldest seq still stored and, with ``now``, inside the window."""
+        first = max(0, self.head - self.capacity)
+        if now is not None:
+            first = self.since_seq(now - self.window, first)
+        return first
+
+    def since_seq(self, since, lo=None):
+        """First seq received at or after ``since`` (epoch seconds)."""
+        lo = max(0, self.head - self.capacity) if lo is None else lo
+        return bisect_left(range(lo, self.head), since, key=lambda seq: self.time[seq % self.capacity]) + lo
+
+    def intern(self, call):
+        code = self._codes.get(call)
+        if code is None:
+            if len(self.calls) >= 4 * self.capacity:
+                self._compact()
+            code = self._codes[call] = len(self.calls)
+            self.calls.append(call)
+        return code
+
+    def _compact(self):
+        # Keep only calls still referenced, so the table is bounded too
+        slots = self.slots(self.first(), self.head)
+        live, inverse = np.unique(np.concatenate([self.spotter[slots], self.dx[slots]]), return_inverse=True)
+        self.calls = [self.calls[code] for code in live.tolist()]
+        self._codes = {call: code for code, call in enumerate(self.calls)}
+        self.spotter[slots], self.dx[slots] = inverse[:len(slots)], inverse[len(slots):]
+
+    def add(self, spot):
+        """Store a Spot (see propagation.cluster); returns its seq."""
+        seq = self.head
+        slot = seq % self.capacity
+        if seq >= self.capacity:
+            # The slot's previous spot is the oldest of its band
+            old = self._bands.get(int(self.band[slot]))
+            if old and old[0] == seq - self.capacity:
+                old.popleft()
+        previous = self.time[(seq - 1) % self.capacity] if seq else -np.inf
+        self.time[slot] = max(spot.time, previous)
+        self.lat[slot] = np.nan if spot.lat is None else spot.lat
+        self.lon[slot] = np.nan if spot.lon is None else spot.lon
+        self.freq[slot] = spot.freq
+        code = BAND_CODES.get(spot.band, NO_BAND)
+        self.band[slot] = code
+        self.snr[slot] = NO_SNR if spot.snr is None else spot.snr
+        self.spotter[slot] = self.intern(spot.spotter)
+        self.dx[slot] = self.intern(spot.dx)
+        self._bands.setdefault(code, deque()).append(seq)
+        self.head = seq + 1
+        return seq
+
+    def slots(self, lo, hi):
+        return np.arange(lo, hi, dtype=np.int64) % self.capacity
+
+    def select(self, band=None, since=None):
+        """Seqs of the stored spots, oldest first, for a band label and/or from ``since``."""
+        lo = self.first() if since is None else self.since_seq(since)
+        if band is None:
+            return np.arange(lo, self.head, dtype=np.int64)
+        seqs = self._bands.get(BAND_CODES.get(band, NO_BAND))
+        if not seqs:
+            return np.array([], dtype=np.int64)
+        seqs = np.fromiter(seqs, dtype=np.int64, count=len(seqs))
+        return seqs[np.searchsorted(seqs, lo):]
+
+    def rows(self, seqs):
+        """(seq, lat, lon, spotter, dx, freq) rows for drawing the given spots."""
+        slots = np.asarray(seqs, dtype=np.int64) % self.capacity
+        calls = self.calls
+        return [
+            [seq, lat, lon, calls[spotter], calls[dx], freq]
+            for seq, lat, lon, spotter, dx, freq in zip(
+                np.asarray(seqs).tolist(), self.lat[slots].tolist(), self.lon[slots].tolist(),
+                self.spotter[slots].tolist(), self.dx[slots].tolist(), self.freq[slots].tolist())
+        ]
+
+    def positions(self, seqs):
+        """(lat, lon) arrays of the given spots."""
+        slots = np.asarray(seqs, dtype=np.int64) % self.capacity
+        return self.lat[slots], self.lon[slots]
+
+    def spotter_positions(self):
+        """Latest (lat, lon) of every spotter with a known position, by call."""
+        slots = self.slots(self.first(), self.head)[::-1]
+        slots = slots[~np.isnan(self.lat[slots])]
+        codes, newest = np.unique(self.spotter[slots], return_index=True)
+        slots = slots[newest]
+        return {
+            self.calls[code]: (lat, lon)
+            for code, lat, lon in zip(codes.tolist(), self.lat[slots].tolist(), self.lon[slots].tolist())
+        }
+
+    def band_counts(self, since=None):
+        """Spots per band label from ``since``."""
+        slots = self.slots(self.first() if since is None else self.since_seq(since), self.head)
+        counts = np.bincount(self.band[slots] + 1, minlength=len(BANDS) + 1)
+        return {BANDS[code - 1][0] if code else "": int(n) for code, n in enumerate(counts.tolist()) if n}
+
+    def expire(self, now):
+        """Seqs that left the window (or were overwritten) since the last call."""
+        first = self.first(now)
+        expired = range(self._expired, max(self._expired, first))
+        self._expired = max(self._expired, first)
+        return expired
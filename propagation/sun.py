@@ -0,0 +1,85 @@
+"""Solar geometry for the propagation overlays.
+
+Accurate to a few hundredths of a degree, far finer than the prediction
+grid, from the low-precision solar coordinates of the Astronomical
+Almanac. The grayline overlay is recomputed at most once a minute.
+"""
+import numpy as np
+
+J2000 = 946728000.0  # 2000-01-01 12:00 UTC, epoch seconds
+GRAYLINE_ALTITUDE = -6.0  # grayline: civil twilight, the sun up to 6 degrees below the horizon
+LON_STEP = 1.0  # degrees between boundary points
+LAT_SAMPLES = 721  # latitudes sampled per meridian (0.25 degrees)
+
+_grayline = {}  # minute -> GeoJSON, the current minute only
+
+
+def subsolar_point(when):
+    """(lat, lon) in degrees of the point with the sun overhead at ``when`` (epoch seconds)."""
+    d = (when - J2000) / 86400
+    g = np.radians(357.529 + 0.98560028 * d)  # mean anomaly
+    q = 280.459 + 0.98564736 * d  # mean longitude
+    ecliptic = np.radians(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g))
+    obliquity = np.radians(23.439 - 0.00000036 * d)
+    declination = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(ecliptic)))
+    right_ascension = np.degrees(np.arctan2(np.cos(obliquity) * np.sin(ecliptic), np.cos(ecliptic)))
+    equation_of_time = (q - right_ascension + 180) % 360 - 180  # degrees
+    ut = (when % 86400) / 240  # degrees of rotation since midnight UTC
+    lon = (-ut - equation_of_time) % 360 - 180  # 180 - ut - equation_of_time, wrapped
+    return float(declination), float(lon)
+
+
+def cos_zenith(lat, lon, sun):
+    """Cosine of the solar zenith angle at each point, for ``sun`` from subsolar_point()."""
+    sun_lat, sun_lon = np.radians(sun[0]), np.radians(sun[1])
+    lat = np.radians(lat)
+    hour_angle = np.radians(lon) - sun_lon
+    return np.sin(lat) * np.sin(sun_lat) + np.cos(lat) * np.cos(sun_lat) * np.cos(hour_angle)
+
+
+def dark_bounds(sun, altitude, lon_step=LON_STEP, lat_samples=LAT_SAMPLES):
+    """(lon, south, north) arrays bounding where the sun is below ``altitude``.
+
+    For altitudes at or below the horizon the dark part of each meridian
+    is one latitude interval (at most one pole is that dark), so the
+    whole region is the polygon between the two curves. Meridians
+    without darkness collapse to their darkest latitude.
+    """
+    lon = np.arange(-180, 180 + lon_step / 2, lon_step)
+    lat = np.linspace(-90, 90, lat_samples)
+    elevation = cos_zenith(lat[:, None], lon[None, :], sun)
+    dark = elevation < np.sin(np.radians(altitude))
+    darkest = lat[np.argmin(elevation, axis=0)]
+    south = np.where(dark.any(axis=0), lat[np.argmax(dark, axis=0)], darkest)
+    north = np.where(dark.any(axis=0), lat[::-1][np.argmax(dark[::-1], axis=0)], darkest)
+    return lon, south, north
+
+
+def dark_polygon(sun, altitude):
+    """GeoJSON Polygon of where the sun is below ``altitude``."""
+    lon, south, north = dark_bounds(sun, altitude)
+    ring = np.concatenate([np.column_stack([lon, north]), np.column_stack([lon, south])[::-1]])
+    ring = np.vstack([ring, ring[:1]]).round(3)
+    return {"type": "Polygon", "coordinates": [ring.tolist()]}
+
+
+def grayline_geojson(when):
+    """Night, grayline and subsolar point for the minute containing ``when``.
+
+    The "twilight" feature covers everywhere the sun is down and the
+    "night" feature everywhere past civil twilight; the grayline is the
+    band one covers and the other does not.
+    """
+    minute = int(when // 60)
+    data = _grayline.get(minute)
+    if data is None:
+        sun = subsolar_point(minute * 60)
+        data = {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": {"kind": "twilight"}, "geometry": dark_polygon(sun, 0.0)},
+            {"type": "Feature", "properties": {"kind": "night"}, "geometry": dark_polygon(sun, GRAYLINE_ALTITUDE)},
+            {"type": "Feature", "properties": {"kind": "sun"},
+             "geometry": {"type": "Point", "coordinates": [round(sun[1], 3), round(sun[0], 3)]}},
+        ]}
+        _grayline.clear()
+        _grayline[minute] = data
+    return data
@@ -11,6 +11,14 @@ print("\nRunning RadioImage tests...\n")
 import test_radio_image
 test_radio_image.run_all()
 
+print("\nRunning logbook tests...\n")
+import test_logbook
+test_logbook.run_all()
+
+print("\nRunning propagation tests...\n")
+import test_propagation
+test_propagation.run_all()
+
 print("\n✅ All tests passed.\n")
 
 def encode_bcd_freq_le(freq):
@@ -0,0 +1,453 @@
+import sys
+import os
+import tempfile
+import json
+from logbook.store import LogStore
+from logbook.dupes import DupeIndex, unique_rows
+from logbook.journal import Journal, JournalLockedError
+from logbook.history import UndoStack
+from logbook.search import SearchIndex
+from logbook.dxcc import DxccResolver, parse_cty
+from logbook.validate import validate_frame
+from logbook.stats import LogStats
+from logbook.io import write_log, read_frame
+from logbook.merge import merge_logs
+from logbook.archive import write_archive, LogArchive
+from logbook import commands
+from logbook.scp import SuperCheckPartial, load_master
+from logbook.confirm import apply_matches, confirm_log, match_files, store_columns
+from logbook.contest import Contest, write_cabrillo
+from logbook.maidenhead import to_locators, from_locators, locate_from, GridIndex
+
+def assert_equal(a, b, msg):
+    if a != b:
+        print(f"❌ FAIL: {msg} ({a!r} != {b!r})")
+        sys.exit(1)
+    else:
+        print(f"✅ PASS: {msg}")
+
+def test_dupe_flagged_on_insert():
+    store = LogStore()
+    dupes = DupeIndex(store)
+    first = store.insert(0, {"Callsign": "YU1ABC", "Time": "12:00"})
+    second = store.extend([{"Callsign": "yu1abc/p", "Time": "12:05"}])[0]
+    assert_equal(dupes.is_dupe(first) and dupes.is_dupe(second), True, "Same call within window is flagged on both rows")
+    third = store.extend([{"Callsign": "YU1ABC", "Time": "12:30"}])[0]
+    assert_equal(dupes.is_dupe(third), False, "Same call outside the window is not a dupe")
+    late, early = store.extend([{"Callsign": "YU7XX", "Time": "23:58"}, {"Callsign": "YU7XX", "Time": "00:03"}])
+    assert_equal((dupes.is_dupe(late), dupes.is_dupe(early)), (True, True), "Undated window wraps at midnight")
+    forty, twenty, labelled = store.extend([
+        {"Callsign": "DL1AA", "Time": "09:00", "Freq": "7.010"},
+        {"Callsign": "DL1AA", "Time": "09:02", "Freq": "14.020"},
+        {"Callsign": "DL1AA", "Time": "09:04", "Band": "20m"},
+    ])
+    assert_equal([dupes.is_dupe(rid) for rid in (forty, twenty, labelled)], [False, True, True],
+                 "Band comes from the frequency when it is blank")
+    store.set(forty, "Freq", "14.030")
+    assert_equal(dupes.is_dupe(forty), True, "Editing the frequency re-keys the QSO")
+
+def test_dupe_follows_edits_and_deletes():
+    store = LogStore()
+    flagged = []
+    dupes = DupeIndex(store, on_flag=flagged.append)
+    a, b = store.extend([
+        {"Callsign": "YT2AAA", "Time": "08:00"},
+        {"Callsign": "YT2AAB", "Time": "08:01"},
+    ])
+    assert_equal(dupes.is_dupe(a), False, "Different calls are not dupes")
+    store.set(b, "Callsign", "YT2AAA")
+    assert_equal((dupes.is_dupe(a), dupes.is_dupe(b)), (True, True), "Editing a callsign flags the dupe")
+    assert_equal(set(flagged), {a, b}, "Flag callback reports both rows")
+    store.remove([b])
+    assert_equal(dupes.is_dupe(a), False, "Deleting the dupe clears the flag")
+
+def test_unique_rows():
+    rows = [
+        {"Callsign": "YU1ABC", "Time": "10:00"},
+        {"Callsign": "YU1ABC", "Time": "10:02"},
+        {"Callsign": "", "Time": ""},
+        {"Callsign": "", "Time": ""},
+        {"Callsign": "YU1ABC", "Time": "11:00"},
+    ]
+    assert_equal(len(list(unique_rows(rows))), 4, "Batch import drops only the duplicate QSO")
+
+def test_undo_redo():
+    store = LogStore(rows=2)
+    undo = UndoStack(store)
+    rid = store.order[0]
+    store.set(rid, "Callsign", "YU1ABC")
+    store.remove([store.order[1]])
+    store.reset([{"Callsign": "YT1X"}])
+    undo.undo()
+    assert_equal(store.get(rid, "Callsign"), "YU1ABC", "Undo restores the log replaced by an import")
+    undo.undo()
+    assert_equal(len(store), 2, "Undo restores a deleted row")
+    undo.undo()
+    assert_equal(store.get(rid, "Callsign"), "", "Undo reverts a cell edit")
+    undo.redo()
+    undo.redo()
+    assert_equal((store.get(rid, "Callsign"), len(store)), ("YU1ABC", 1), "Redo reapplies edit and delete")
+
+def test_journal_recovery():
+    path = os.path.join(tempfile.mkdtemp(), "journal.jsonl")
+    store = LogStore(rows=3)
+    journal = Journal(path, group=2)
+    journal.recover(store)
+    undo = UndoStack(store)
+    store.set(store.order[1], "Callsign", "YU1ABC")
+    store.insert(0, {"Callsign": "YT2AA", "Time": "10:00"})
+    store.remove([store.order[2]])
+    undo.undo()
+    store.sort([("Callsign", False)])
+    sorted_order = list(store.order)
+    undo.undo()
+    assert_equal(store.order != sorted_order, True, "Undo puts back the order before a sort")
+    undo.redo()
+    assert_equal(store.order, sorted_order, "Redo sorts again")
+    with store.transaction(undoable=False):
+        padding = store.extend([{}] * 2)
+    undo.undo()
+    assert_equal(store.order[-2:], padding, "Rows added outside the undo history stay when a sort is undone")
+    undo.redo()
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"op":"set","rid"')  # torn write
+    recovered = LogStore()
+    journal = Journal(path)
+    journal.recover(recovered)
+    assert_equal(recovered.rows(), store.rows(), "Replaying the journal recovers the log")
+    with open(path) as f:
+        assert_equal(len(f.readlines()), 1, "Recovery compacts the journal to one snapshot")
+    journal.compact()
+    for n in range(4000):
+        recovered.set(recovered.order[0], "Name", "x" * 300 + str(n))
+    journal.compact()
+    with open(path) as f:
+        assert_equal(len(f.readlines()), 1, "A grown journal is compacted while running")
+    journal.close()
+
+def test_search_index():
+    store = LogStore()
+    search = SearchIndex(store)
+    a, b, c = store.extend([
+        {"Callsign": "YU1ABC", "Name": "Pera", "Place": "Novi Beograd"},
+        {"Callsign": "YT2XY", "Name": "Mika", "Place": "Nis"},
+        {"Callsign": "YU7QQ", "Name": "Laza", "Place": "Beograd"},
+    ])
+    assert_equal(search.query("call:YU"), {a, c}, "Callsign prefix query")
+    assert_equal(search.query("place:beog"), {a, c}, "Place word prefix query")
+    assert_equal(search.query("yu place:novi"), {a}, "Terms are combined")
+    store.set(c, "Callsign", "E71A")
+    assert_equal(search.query("call:YU"), {a}, "Index follows callsign edits")
+    assert_equal((search.query("abc"), search.query("71"), search.query("call:71"), search.query("call:e7")),
+                 ({a}, {c}, set(), {c}), "Bare terms match anywhere in the call, call: by prefix")
+    store.remove([a])
+    assert_equal(search.query("beograd"), {c}, "Index follows deletes")
+
+def test_typed_multi_column_sort():
+    store = LogStore()
+    store.extend([
+        {"Callsign": "A", "Date": "2024-05-02", "Time": "09:00", "Freq": "7.050"},
+        {"Callsign": "B", "Date": "2024-05-01", "Time": "23:30", "Band": "20m"},
+        {"Callsign": "C", "Date": "2024-05-02", "Time": "09:00", "Freq": "14.074"},
+        {"Callsign": "D", "Time": ""},
+    ])
+    store.sort([("Time", False)])
+    assert_equal([store.get(r, "Callsign") for r in store.order], ["B", "A", "C", "D"], "Sort by UTC timestamp, missing last")
+    store.sort([("Band", True), ("Time", False)])
+    assert_equal([store.get(r, "Callsign") for r in store.order], ["B", "C", "A", "D"], "Stable multi-column sort, band from frequency")
+    rid = store.order[0]
+    store.set(rid, "Time", "00:10", typed=10)
+    store.sort([("Time", True)])
+    assert_equal([store.get(r, "Callsign") for r in store.order], ["C", "A", "B", "D"], "Typed value from the editor feeds the sort key")
+
+CTY = """Serbia:                   15:  28:  EU:   44.00:   -21.00:    -1.0:  YU:
+    4N,4O,YT,YU,=YU1XYZ(16);
+Fed. Rep. of Germany:     14:  28:  EU:   51.00:   -10.00:    -1.0:  DL:
+    DA,DB,DC,DD,DE,DF,DG,DH,DI,DJ,DK,DL,DM,DN,DO,DP,DQ,DR,
+    DL8(15)[29]<50.0/-9.0>;
+"""
+
+def test_dxcc_resolver():
+    resolver = DxccResolver(*parse_cty(CTY))
+    assert_equal(resolver.resolve("yu1abc").name, "Serbia", "Prefix match")
+    assert_equal(resolver.resolve("DL8ZZ").cq, 15, "Longest prefix wins with its overrides")
+    assert_equal(resolver.resolve("DL1AA").cq, 14, "Shorter prefix keeps entity zones")
+    assert_equal(resolver.resolve("YU1XYZ").cq, 16, "Exact callsign entry")
+    assert_equal(resolver.resolve("DL/YU1ABC").name, "Fed. Rep. of Germany", "Portable prefix decides the entity")
+    assert_equal(resolver.resolve("K1ABC"), None, "Unknown prefix")
+    record = resolver.enrich({"Callsign": "YT2A", "Place": ""})
+    assert_equal((record["Place"], record["Continent"], record["Lon"]), ("Serbia", "EU", "21.00"), "Record enriched")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cty.dat")
+        with open(path, "w") as f:
+            f.write(CTY)
+        fresh = DxccResolver.load(path)
+        with open(path + ".cache") as f:
+            assert_equal(json.load(f)["stamp"][0], 2, "Cache written as JSON")
+        cached = DxccResolver.load(path)
+        assert_equal(cached.resolve("4N7A").name, "Serbia", "Resolver loaded from the cache")
+        assert_equal((cached.prefixes, cached.exact), (fresh.prefixes, fresh.exact), "Cache keeps the tables")
+    store = LogStore()
+    store.extend([{"Callsign": ""}])
+    undo = UndoStack(store)
+    with store.transaction():
+        store.set(store.order[0], "Callsign", "YU1ABC")
+        store.set(store.order[0], "Place", "Serbia")
+    undo.undo()
+    assert_equal(store.record(store.order[0])["Place"], "", "Transaction undone as one step")
+
+def test_validate_frame():
+    import numpy as np
+    import pandas as pd
+    df = pd.DataFrame({
+        "Name": ["Pera", np.nan, None, "Mika"],
+        "Callsign": ["yu1abc", "dl1aa", None, "!!"],
+        "Time": [1200.0, "25:00", np.nan, "0930"],
+        "Freq": ["14,074", 7.05, np.nan, np.nan],
+        "Band": ["20M", "40m", np.nan, ""],
+    })
+    rows, report = validate_frame(df)
+    assert_equal(rows, [{"Name": "Pera", "Callsign": "YU1ABC", "Time": "12:00", "Freq": "14.074", "Band": "20m"}],
+                 "Valid row normalized, NaN is blank, blank row dropped")
+    assert_equal(list(zip(report["Row"], report["Error"])), [(2, "invalid time"), (4, "invalid callsign")],
+                 "Bad rows reported by row number")
+
+def test_incremental_stats():
+    store = LogStore()
+    stats = LogStats(store)
+    store.extend([
+        {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:00", "Band": "20m"},
+        {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:55", "Freq": "7.050"},
+        {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:05", "Band": "20m"},
+        {"Callsign": ""},
+    ])
+    now = 1714568700  # 2024-05-01 13:05 UTC
+    assert_equal((stats.total, stats.unique_calls), (3, 2), "Blank rows are not QSOs")
+    assert_equal((stats.rate(10, now), stats.rate(60, now)), (1, 2), "Rate over the last 10/60 minutes")
+    store.set(store.order[2], "Band", "40m")
+    store.remove([store.order[0]])
+    assert_equal((dict(stats.bands), dict(stats.hours)), ({"40m": 2}, {12: 1, 13: 1}), "Counters follow edits and deletes")
+    incremental = (dict(stats.bands), dict(stats.hours), dict(stats.calls))
+    stats.on_reset()
+    assert_equal((dict(stats.bands), dict(stats.hours), dict(stats.calls)), incremental, "Incremental counts match a full rebuild")
+
+def test_merge_logs():
+    columns = ["Callsign", "Date", "Time", "Band"]
+    with tempfile.TemporaryDirectory() as tmp:
+        a, b, out = (os.path.join(tmp, name) for name in ("a.jsonl", "b.adi", "merged.json"))
+        write_log(a, columns, [
+            {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:30", "Band": "20m"},
+            {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "10:00", "Band": "40m"},
+            {"Callsign": "K1ABC", "Date": "2024-04-30", "Time": "23:59", "Band": "20m"},
+        ])
+        write_log(b, columns, [
+            {"Callsign": "yu1abc", "Date": "2024-05-01", "Time": "12:35", "Band": "20m"},
+            {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "11:00", "Band": "20m"},
+            {"Callsign": "bad!", "Date": "2024-05-01", "Time": "11:00", "Band": "20m"},
+        ])
+        result = merge_logs([a, b], out, chunk_rows=2)
+        merged = read_frame(out)
+        assert_equal(tuple(result), (4, 1, 1), "Written, duplicates and rejected counts")
+        assert_equal(list(merged["Callsign"]), ["K1ABC", "DL1AA", "YU1ABC", "YU1ABC"], "Merged in time order")
+        assert_equal(list(zip(merged["Source"], merged["Source Row"])),
+                     [("a.jsonl", "3"), ("a.jsonl", "2"), ("b.adi", "2"), ("a.jsonl", "1")], "Provenance columns")
+        assert_equal(tuple(merge_logs([a, b], out, chunk_rows=1, fan_in=2)), (4, 1, 1), "Runs merged in passes")
+        assert_equal(read_frame(out).equals(merged), True, "Passes give the same log")
+        c = os.path.join(tmp, "c.jsonl")
+        write_log(c, columns + ["Freq"], [
+            {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "10:03", "Freq": "7.020"},
+            {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "10:05", "Freq": "14.020"},
+        ])
+        assert_equal(merge_logs([a, c], out).duplicates, 1, "A blank band is taken from the frequency")
+
+def test_archive_roundtrip():
+    store = LogStore(rows=1)
+    store.extend([
+        {"Callsign": "YU1ABC", "Date": "2024-05-02", "Time": "09:00", "Place": "Novi Sad", "Freq": "14.074"},
+        {"Callsign": "YT2A", "Date": "2024-05-01", "Time": "12:00", "Place": "Beograd"},
+        {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:00", "Place": "Berlin", "Band": "40m"},
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "log.tla")
+        assert_equal(write_archive(path, store), 3, "Blank rows are not archived")
+        archive = LogArchive(path)
+        assert_equal([archive.get(row, "Callsign") for row in range(len(archive))], ["YT2A", "DL1AA", "YU1ABC"], "Rows stored in time order")
+        assert_equal(archive.record(2)["Place"], "Novi Sad", "Dictionary decoded on access")
+        assert_equal(list(archive.query("Y place:novi")), [2], "Prefix and word query")
+        rows = archive.query("")
+        assert_equal(list(rows[archive.sort_key("Callsign", rows).argsort()]), [1, 0, 2], "Codes sort like their strings")
+        live = SearchIndex(store)
+        for text in ("1a", "call:YU", "call:1a", "place:novi", "be"):
+            archived = {archive.get(row, "Callsign") for row in archive.query(text)}
+            assert_equal(archived, {store.get(rid, "Callsign") for rid in live.query(text)},
+                         "Archive and live log agree on " + text)
+        archive.close()
+        try:
+            archive.get(0, "Callsign")
+            closed = "no error"
+        except ValueError:
+            closed = "ValueError"
+        assert_equal(closed, "ValueError", "Reading a closed archive raises")
+
+def test_headless_commands():
+    columns = ["Callsign", "Date", "Time", "Band"]
+    with tempfile.TemporaryDirectory() as tmp:
+        src, log = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "journal.jsonl")
+        write_log(src, columns, [
+            {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:00", "Band": "20m"},
+            {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:00", "Band": "40m"},
+        ])
+        store, journal = commands.open_log(log)
+        store.extend([{}] * 3)
+        result = commands.import_log(store, src)
+        store.extend([{"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:04", "Band": "20m"}])
+        journal.close()
+        assert_equal(tuple(result), (2, 0, 0), "Imported QSOs")
+        store, journal = commands.open_log(log)
+        assert_equal([store.get(rid, "Callsign") for rid in store.order][:2], ["YU1ABC", "DL1AA"], "Import lands before the blank rows and is journaled")
+        assert_equal(tuple(commands.import_log(store, src)), (0, 2, 0), "Re-import skips QSOs already logged")
+        since = commands.parse_when("2024-05-01 12:30")
+        assert_equal([store.get(rid, "Callsign") for rid in commands.iter_qsos(store, since=since)], ["DL1AA"], "Time filter")
+        assert_equal([store.get(rid, "Time") for rid in commands.find_duplicates(store)], ["12:04"], "Duplicate found")
+        store.extend([{"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:06", "Freq": "14.025"}])
+        on_20m = [store.get(rid, "Time") for rid in commands.iter_qsos(store, band="20m")]
+        dupes = [store.get(rid, "Time") for rid in commands.find_duplicates(store)]
+        assert_equal((on_20m, dupes), (["12:00", "12:04", "12:06"], ["12:04", "12:06"]), "Bands agree between filters and dupes")
+        freq_src = os.path.join(tmp, "freq.jsonl")
+        write_log(freq_src, ["Callsign", "Date", "Time", "Freq"], [{"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:03", "Freq": "7.010"}])
+        assert_equal(tuple(commands.import_log(store, freq_src)), (0, 1, 0), "Import dupe check uses the band from Freq")
+        try:
+            commands.open_log(log)
+            locked = "opened twice"
+        except JournalLockedError:
+            locked = "locked"
+        assert_equal(locked, "locked", "A second writer is refused")
+        with open(log, "rb") as f:
+            before = f.read()
+        reader, _ = commands.open_log(log, read_only=True)
+        with open(log, "rb") as f:
+            assert_equal((len(reader), f.read() == before), (len(store), True), "Read-only open leaves the journal alone")
+        journal.close()
+
+def test_super_check_partial():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "MASTER.SCP")
+        with open(path, "w") as f:
+            f.write("# comment\nYU1ABC\nYU1AB\nK1ABC\nDL1ABD\n")
+        fresh = load_master(path)
+        master = load_master(path)
+        with open(path + ".cache") as f:
+            assert_equal(json.load(f)["stamp"][0], 2, "Call list cached as JSON")
+    assert_equal((master._counts, master._postings), (fresh._counts, fresh._postings), "Cache keeps the index")
+    store = LogStore()
+    scp = SuperCheckPartial(master, store)
+    assert_equal(scp.search("u1ab"), ["YU1AB", "YU1ABC"], "Fragment matches anywhere in the call")
+    assert_equal(scp.search("1AB"), ["K1ABC", "YU1AB", "DL1ABD", "YU1ABC"], "Prefix matches first, then shorter calls")
+    store.extend([{"Callsign": "ZZ1ABX"}])
+    assert_equal(scp.search("1AB")[0], "ZZ1ABX", "Logged calls are suggested first")
+    store.set(store.order[0], "Callsign", "ZZ9Z")
+    assert_equal(scp.search("Z1A"), [], "Edited calls leave the index")
+
+def test_confirm_log():
+    store = LogStore(columns=["Callsign", "Date", "Time", "Band", "Mode"])
+    store.extend([
+        {"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:00", "Band": "20m", "Mode": "CW"},
+        {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:00", "Band": "40m"},
+        {"Callsign": "K1ABC", "Date": "2024-05-01", "Time": "14:00", "Band": "20m"},
+        {"Callsign": "K1ABC", "Date": "2024-05-01", "Time": "15:00", "Band": "20m", "Mode": "SSB"},
+        {"Callsign": "E71A", "Time": "10:00"},
+        {},
+    ])
+    undo = UndoStack(store)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(os.path.join(tmp, "journal.jsonl"))
+        journal.recover(store)
+        path = os.path.join(tmp, "qsl.adi")
+        write_log(path, ["Callsign", "Date", "Time", "Band", "Mode"], [
+            {"Callsign": "yu1abc", "Date": "2024-05-01", "Time": "12:09", "Band": "20m", "Mode": "CW"},
+            {"Callsign": "DL1AA", "Date": "2024-05-01", "Time": "13:40", "Band": "40m"},
+            {"Callsign": "K1ABC", "Date": "2024-05-01", "Time": "14:02", "Band": "40m"},
+            {"Callsign": "K1ABC", "Date": "2024-05-01", "Time": "15:01", "Band": "20m", "Mode": "CW"},
+            {"Callsign": "E71A", "Time": "10:05"},
+        ])
+        assert_equal(confirm_log(store, [path]), (2, 5), "Only the call/time/band/mode match confirms")
+        journal.close()
+        with open(journal.path) as f:
+            lines = f.readlines()
+        assert_equal((len(lines), json.loads(lines[-1])["op"]), (2, "batch"), "Statuses journaled as one record")
+    assert_equal([store.get(rid, "QSL") for rid in store.order], ["Y", "N", "N", "N", "Y", ""],
+                 "Status written back, undated QSOs matched by time of day")
+    undo.undo()
+    assert_equal([store.get(rid, "QSL") for rid in store.order], [""] * 6, "Status undone as one step")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "qsl.adi")
+        write_log(path, ["Callsign", "Date", "Time"], [{"Callsign": "YU1ABC", "Date": "2024-05-01", "Time": "12:05"}])
+        rids = store.order[:2]
+        matches = match_files(store_columns(store, rids), [path])
+        store.remove([rids[1]])
+        assert_equal(apply_matches(store, rids, matches), (1, 1), "Rows removed while matching are skipped")
+
+def test_maidenhead():
+    locators = to_locators([44.8, 51.5, -33.9, 91], [20.45, -0.12, 151.2, 0], 8)
+    assert_equal(list(locators), ["KN04FT32", "IO91WM50", "QF56OC34", ""], "Positions to 8-character locators")
+    assert_equal(list(to_locators([44.8], [20.45], 4)), ["KN04"], "Positions to 4-character locators")
+    lat, lon = from_locators(["kn04ft", "bad", ""])
+    assert_equal((round(lat[0], 4), round(lon[0], 4)), (44.8125, 20.4583), "Locator to its centre")
+    assert_equal(list(map(bool, lat != lat)), [False, True, True], "Invalid locators are NaN")
+    distance, bearing = locate_from("KN04FT", ["IO91WM"])
+    assert_equal((round(distance[0] / 10), round(bearing[0])), (169, 304), "Distance and bearing from the QTH")
+    store = LogStore()
+    store.extend([{"Grid": "KN04FT"}, {"Grid": "kn04"}, {"Grid": "JN95"}, {"Grid": "bad"}])
+    grids = GridIndex(store)
+    assert_equal(dict(grids.squares), {"KN04": 2, "JN95": 1}, "Worked squares counted")
+    store.set(store.order[2], "Grid", "KN05AA")
+    store.remove([store.order[0]])
+    assert_equal(dict(grids.squares), {"KN04": 1, "KN05": 1}, "Index follows edits and deletes")
+
+def test_contest():
+    store = LogStore(columns=["Callsign", "Date", "Time", "Freq", "Band", "Mode", "Sent", "Rcvd"])
+    contest = Contest(store, "yu1xx", "CQ-WPX-CW")
+    for call, band in [("K1ABC", "20m"), ("K1XYZ", "20m"), ("K1ABC", "20m"), ("K1ABC", "40m"), ("DL1AA", "20m")]:
+        store.extend([{"Callsign": call, "Date": "2024-05-01", "Time": "12:00", "Band": band, "Mode": "CW",
+                       "Sent": f"{contest.next_serial():03d}", "Rcvd": "001"}])
+    assert_equal((contest.points, len(contest.mults), contest.score), (4, 3, 12), "Points exclude dupes, mults per band")
+    assert_equal([contest.is_dupe(rid) for rid in store.order], [False, False, True, False, False], "Dupes per band")
+    assert_equal(contest.check("DL1AA", "40m"), "new mult", "New multiplier flagged")
+    store.remove([store.order[0]])
+    assert_equal((contest.is_dupe(store.order[1]), contest.score), (False, 12), "Later QSO scores once the first is gone")
+    store.insert(0, {"Callsign": "K1ABC", "Band": "40m"})
+    assert_equal(store.positions(), {rid: pos for pos, rid in enumerate(store.order)}, "Positions follow inserts")
+    assert_equal((contest.is_dupe(store.order[0]), contest.is_dupe(store.order[3])), (False, True), "Earliest in log order scores")
+    store.remove([store.order[0]])
+    store.set(store.order[1], "Rcvd", "")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "contest.log")
+        assert_equal(write_cabrillo(path, contest), 4, "Every QSO exported")
+        with open(path, newline="") as f:
+            lines = f.read().split("\r\n")
+    assert_equal(lines[5], "CREATED-BY: Talasnik", "Cabrillo header")
+    assert_equal(lines[6].split(), ["QSO:", "14000", "CW", "2024-05-01", "1200", "YU1XX", "599", "002", "K1XYZ", "599", "001"], "Cabrillo QSO line")
+    assert_equal(lines[7].split()[-2:], ["K1ABC", "599"], "A blank received serial stays blank")
+
+def run_all():
+    test_dupe_flagged_on_insert()
+    test_dupe_follows_edits_and_deletes()
+    test_unique_rows()
+    test_undo_redo()
+    test_journal_recovery()
+    test_search_index()
+    test_typed_multi_column_sort()
+    test_dxcc_resolver()
+    test_validate_frame()
+    test_incremental_stats()
+    test_merge_logs()
+    test_archive_roundtrip()
+    test_headless_commands()
+    test_super_check_partial()
+    test_confirm_log()
+    test_maidenhead()
+    test_contest()
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,209 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from propagation.httpcache import HttpCache
+from propagation.cluster import ClusterClient, parse_spot
+from propagation.spots import SpotStore
+from propagation.heatmap import grid_bins, grid_geojson
+from propagation.solar import SolarHistory, sparkline, ROLLUP_DTYPE
+from propagation.sun import dark_bounds, grayline_geojson, subsolar_point
+from propagation.muf import CLOSED, OPEN, openings_geojson, predict, sunspot_number
+
+def assert_equal(a, b, msg):
+    if a != b:
+        print(f"❌ FAIL: {msg} ({a!r} != {b!r})")
+        sys.exit(1)
+    else:
+        print(f"✅ PASS: {msg}")
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Stand-in feed: serves ``body`` with an ETag and answers 304 when it matches."""
+    body = b'{"solar": {"solarflux": "150"}}'
+    hits = []
+
+    def do_GET(self):
+        etag = '"%d"' % hash(self.body)
+        conditional = self.headers.get("If-None-Match") == etag
+        self.hits.append(304 if conditional else 200)
+        self.send_response(304 if conditional else 200)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if not conditional:
+            self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+def test_http_cache():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/solarjson.php"
+    now = [1000.0]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HttpCache(tmp, ttls={url: 60}, stale_ttl=600, clock=lambda: now[0])
+            assert_equal(cache.get_json(url)["solar"]["solarflux"], "150", "First get fetches")
+            cache.get_json(url)
+            assert_equal(FeedHandler.hits, [200], "Fresh entry costs no round trip")
+            reopened = HttpCache(tmp, ttls={url: 60}, clock=lambda: now[0])
+            reopened.get_json(url)
+            assert_equal(FeedHandler.hits, [200], "Entry persists on disk")
+            assert_equal(sorted(os.path.splitext(name)[1] for name in os.listdir(tmp)), [".body", ".json"],
+                         "Stored as the raw body plus JSON metadata")
+            now[0] += 120
+            assert_equal(cache.get_json(url)["solar"]["solarflux"], "150", "Stale entry served at once")
+            cache.wait()
+            assert_equal(FeedHandler.hits, [200, 304], "Revalidated in the background with the ETag")
+            cache.get_json(url)
+            assert_equal(FeedHandler.hits, [200, 304], "Revalidation renews the TTL")
+            FeedHandler.body = b'{"solar": {"solarflux": "160"}}'
+            now[0] += 2000
+            assert_equal(cache.get_json(url)["solar"]["solarflux"], "160", "Expired past the grace period fetches in line")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_cluster_feed():
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    logins = []
+
+    def fake_cluster():
+        # Stand-in RBN node: prompt for a call, then stream spots in split packets
+        conn, _ = listener.accept()
+        with conn:
+            conn.sendall(b"Welcome to the fake cluster\r\nPlease enter your call: ")
+            logins.append(conn.recv(64))
+            conn.sendall(b"DX de EA5WU-#:     7018.5  DL1ABC       CW    24 dB  22 WPM  CQ      1234Z\r\nDX de K1TT")
+            conn.sendall(b"T-#:    14074.0  JA1XYZ       FT8   -12 dB  CQ      1235Z\r\nTo ALL de X: hi\r\n")
+            conn.recv(64)
+
+    threading.Thread(target=fake_cluster, daemon=True).start()
+    spots = []
+    got_two = threading.Event()
+    def on_spot(spot):
+        spots.append(spot)
+        if len(spots) == 2:
+            got_two.set()
+    client = ClusterClient("yu1xx", "127.0.0.1", port, on_spot=on_spot)
+    client.start()
+    got_two.wait(5)
+    client.stop()
+    client.join(5)
+    listener.close()
+    assert_equal(logins, [b"YU1XX\r\n"], "Logs in at the call prompt")
+    assert_equal([(s.spotter, s.dx, s.band, s.mode, s.snr) for s in spots],
+                 [("EA5WU", "DL1ABC", "40m", "CW", 24), ("K1TTT", "JA1XYZ", "20m", "FT8", -12)],
+                 "Spots parsed across packet boundaries")
+    # A node that goes silent is dropped after the read timeout
+    listener = socket.create_server(("127.0.0.1", 0))
+    statuses = []
+    lost = threading.Event()
+    def on_status(text):
+        statuses.append(text)
+        if "lost" in text:
+            lost.set()
+    client = ClusterClient("yu1xx", "127.0.0.1", listener.getsockname()[1], on_status=on_status, read_timeout=0.2)
+    client.start()
+    lost.wait(5)
+    client.stop()
+    client.join(5)
+    listener.close()
+    assert_equal(lost.is_set(), True, "Silent link counts as a disconnect")
+
+def test_spot_store():
+    store = SpotStore(capacity=4, window=60)
+    lines = [
+        "DX de W3LPL:  28400.0 ZS6ABC  59 1200Z",
+        "DX de K1TTT:  14025.0 DL1ABC  CW 12 dB 1200Z",
+        "DX de W3LPL:  28410.0 ZS6XYZ  59 1201Z",
+        "DX de W3LPL:  14030.0 JA1XYZ  CW 20 dB 1201Z",
+    ]
+    for now, line in zip((1000, 1010, 1050, 1060), lines):
+        store.add(parse_spot(line, now=now))
+    assert_equal(store.select("10m").tolist(), [0, 2], "Band index")
+    assert_equal(store.select(since=1040).tolist(), [2, 3], "Time index")
+    assert_equal(store.band_counts(), {"10m": 2, "20m": 2}, "Per-band aggregate")
+    assert_equal([row[3:5] for row in store.rows([1])], [["K1TTT", "DL1ABC"]], "Calls interned")
+    store.add(parse_spot("DX de K1TTT:  14040.0 VK2ABC  CW 1202Z", now=1070))
+    assert_equal((len(store), store.select("10m").tolist()), (4, [2]), "Capacity bounds the store")
+    assert_equal(list(store.expire(now=1100)), [0, 1], "Overwritten and old spots expire")
+    store.add(parse_spot("DX de K1TTT:  14040.0 VK2ABC  CW 1203Z", now=1080)._replace(lat=42.5, lon=-72.5))
+    assert_equal(store.spotter_positions(), {"K1TTT": (42.5, -72.5)}, "Skimmer positions from located spots")
+    spot = parse_spot("DX de DK8NE-#:  7010.0 YU1ABC  CW 8 dB 1204Z jo31")
+    assert_equal((spot.dx, spot.grid, spot.lat), ("YU1ABC", "JO31", None), "Spotter grid after the time")
+
+def test_grid_heatmap():
+    lat = [44.8, 44.9, 44.2, 51.5, float("nan")]
+    lon = [20.4, 20.5, 21.9, -0.1, 0.0]
+    squares, counts, centre_lat, centre_lon = grid_bins(lat, lon)
+    assert_equal((squares.tolist(), counts.tolist()), (["IO91", "KN04"], [1, 3]), "Spots binned per square")
+    assert_equal((centre_lat.tolist(), centre_lon.tolist()), ([51.5, 44.5], [-1.0, 21.0]), "Square centres")
+    features = grid_geojson(lat, lon)["features"]
+    assert_equal([f["properties"]["level"] for f in features], [2, 5], "Count levels relative to the busiest square")
+    fields = grid_geojson(lat, lon, max_cells=1)["features"]
+    assert_equal([f["properties"]["square"] for f in fields], ["IO", "KN"], "Too many squares falls back to fields")
+
+def test_solar_history():
+    day = 86400
+    updated = lambda when: time.strftime("%d %b %Y %H%M GMT", time.gmtime(when))
+    with tempfile.TemporaryDirectory() as tmp:
+        history = SolarHistory(tmp)
+        for hour, (sfi, k) in enumerate([(150, "2"), (160, "4"), (170, "")]):
+            history.add({"solarflux": str(sfi), "aindex": "8", "kindex": k, "updated": updated(day + hour * 3600)})
+        history.add({"solarflux": "100", "updated": "1 Jan 1970 0000 GMT"})
+        assert_equal(len(history.samples), 3, "Samples older than the last are skipped")
+        assert_equal(history.add({"solarflux": "100", "updated": "soon"}), False, "Samples with no readable time are skipped")
+        history.add({"solarflux": "120", "kindex": "6", "updated": updated(2 * day)})
+        # A rollup written in the same period as the last sample, but short of it
+        hours = np.fromfile(os.path.join(tmp, "hour.bin"), dtype=ROLLUP_DTYPE)
+        hours[-1]["count"] = 0
+        hours.tofile(os.path.join(tmp, "hour.bin"))
+        reopened = SolarHistory(tmp)
+        assert_equal(reopened.rollups["hour"]["count"].sum(), 10, "Rollups short of the samples are rebuilt")
+        lows, highs, means = reopened.series("SFI", "day", 2, now=2 * day)
+        assert_equal((lows.tolist(), highs.tolist(), means.tolist()), ([150, 120], [170, 120], [160, 120]), "Day rollups persist")
+        lows, highs, means = reopened.series("K", "hour", 4, now=day + 3 * 3600)
+        assert_equal([str(v) for v in highs], ["2.0", "4.0", "nan", "nan"], "Hours without a value stay empty")
+        assert_equal(sparkline([1, float("nan"), 8]), "▁ █", "Sparkline")
+
+def test_muf_prediction():
+    lat, lon = subsolar_point(1718971200)  # 2024-06-21 12:00 UTC
+    assert_equal((round(lat, 1), round(lon)), (23.4, 0), "Sun overhead at the tropic at noon UTC")
+    assert_equal(round(sunspot_number(63.7)), 0, "No sunspots at the flux floor")
+    when = 1729346400  # 2024-10-19 14:00 UTC
+    prediction = predict(44.8, 20.4, 150, 2, "20m", when)
+    assert_equal(prediction.state.shape, (90, 180), "Whole world grid")
+    assert_equal(predict(44.8, 20.4, 150, 2, "20m", when + 1200) is prediction, True, "Cached per hour and band")
+    assert_equal((int(prediction.state[66, 88]), int(prediction.state[67, 100])), (OPEN, CLOSED),
+                 "20m open to Spain by day, skip zone around the QTH")
+    assert_equal(int((predict(44.8, 20.4, 70, 5, "6m", when).state != CLOSED).sum()), 0, "6m closed at a low flux")
+    features = openings_geojson(prediction)["features"]
+    runs = sum(len(f["geometry"]["coordinates"]) for f in features)
+    assert_equal(runs < int((prediction.state != CLOSED).sum()) // 10, True, "Equal cells merged into runs")
+
+def test_grayline():
+    sun = subsolar_point(1718971200)  # June solstice, noon UTC
+    lon, south, north = dark_bounds(sun, -6.0)
+    assert_equal((float(south[0]), float(north[0])), (-90.0, 60.5), "No civil night north of 60.5N at midnight")
+    assert_equal((float(south[180]), float(north[180])), (-90.0, -72.75), "Only the polar night is dark at noon")
+    data = grayline_geojson(1718971210)
+    assert_equal(grayline_geojson(1718971250) is data, True, "Cached per minute")
+    assert_equal([f["properties"]["kind"] for f in data["features"]], ["twilight", "night", "sun"], "Terminator, grayline and sun")
+
+def run_all():
+    test_http_cache()
+    test_cluster_feed()
+    test_spot_store()
+    test_grid_heatmap()
+    test_solar_history()
+    test_muf_prediction()
+    test_grayline()
+
+if __name__ == "__main__":
+    run_all()